@@ -21,11 +21,14 @@ class JobSerializer(BaseModelSerializer):
     object_type = ContentTypeField(
         read_only=True
     )
+    progress = serializers.JSONField(
+        read_only=True
+    )
 
     class Meta:
         model = Job
         fields = [
             'id', 'url', 'display', 'object_type', 'object_id', 'name', 'status', 'created', 'scheduled', 'interval',
-            'started', 'completed', 'user', 'data', 'error', 'job_id',
+            'started', 'completed', 'user', 'progress', 'data', 'error', 'job_id',
         ]
         brief_fields = ('url', 'created', 'completed', 'user', 'status')
@@ -150,6 +150,19 @@ class Job(models.Model):
 
         return f"{int(minutes)} minutes, {seconds:.2f} seconds"
 
+    @property
+    def progress(self):
+        """
+        Return the progress reported by the background task while it is running (if any), as a dictionary indicating
+        the number of items processed and the total number of items.
+        """
+        if self.status != JobStatusChoices.STATUS_RUNNING:
+            return None
+
+        queue = django_rq.get_queue(get_queue_for_model(self.object_type.model))
+        if rq_job := queue.fetch_job(str(self.job_id)):
+            return rq_job.meta.get('progress')
+
     def delete(self, *args, **kwargs):
         super().delete(*args, **kwargs)
 
@@ -204,7 +217,7 @@ class Job(models.Model):
 
         Args:
             func: The callable object to be enqueued for execution
-            instance: The NetBox object to which this job pertains
+            instance: The NetBox object to which this job pertains, or the model of the objects to which it pertains
             name: Name for the job (optional)
             user: The user responsible for running the job
             schedule_at: Schedule the job to be executed at the passed date and time
@@ -216,7 +229,7 @@ class Job(models.Model):
         status = JobStatusChoices.STATUS_SCHEDULED if schedule_at else JobStatusChoices.STATUS_PENDING
         job = Job.objects.create(
             object_type=object_type,
-            object_id=instance.pk,
+            object_id=instance.pk if isinstance(instance, models.Model) else None,
             name=name,
             status=status,
             scheduled=schedule_at,
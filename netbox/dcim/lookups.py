@@ -1,10 +1,32 @@
-from django.contrib.postgres.fields.array import ArrayContains
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Lookup
 
-from dcim.utils import object_to_path_node
 
-
-class PathContains(ArrayContains):
+class PathContains(Lookup):
+    """
+    Match CablePaths which traverse the given object. Rather than scanning the `_nodes` array of every path, this
+    performs an indexed lookup against the CablePathNode reverse index.
+    """
+    lookup_name = 'contains'
 
     def get_prep_lookup(self):
-        self.rhs = [object_to_path_node(self.rhs)]
-        return super().get_prep_lookup()
+        return self.rhs
+
+    def as_sql(self, qn, connection):
+        from dcim.models import CablePathNode
+
+        object_type = ContentType.objects.get_for_model(self.rhs)
+        quote_name = connection.ops.quote_name
+        meta = CablePathNode._meta
+        pk_column = '%s.%s' % (
+            qn.quote_name_unless_alias(self.lhs.alias),
+            quote_name(self.lhs.target.model._meta.pk.column)
+        )
+        sql = '%s IN (SELECT %s FROM %s WHERE %s = %%s AND %s = %%s)' % (
+            pk_column,
+            quote_name(meta.get_field('path').column),
+            quote_name(meta.db_table),
+            quote_name(meta.get_field('object_type').column),
+            quote_name(meta.get_field('object_id').column),
+        )
+        return sql, [object_type.pk, self.rhs.pk]
@@ -1,10 +1,17 @@
-from django.core.management.base import BaseCommand
+import multiprocessing
+import os
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
 from django.core.management.color import no_style
-from django.db import connection
+from django.db import connection, connections, transaction
 from django.db.models import Q
 
-from dcim.models import CablePath, ConsolePort, ConsoleServerPort, Interface, PowerFeed, PowerOutlet, PowerPort
-from dcim.signals import create_cablepath
+from dcim.models import (
+    CablePath, CablePathNode, ConsolePort, ConsoleServerPort, Interface, PowerFeed, PowerOutlet, PowerPort,
+)
+from dcim.tracing import CablePathTracer
 
 ENDPOINT_MODELS = (
     ConsolePort,
@@ -15,6 +22,128 @@ ENDPOINT_MODELS = (
     PowerPort
 )
 
+# Fields by which origins of each model can be partitioned across workers
+PARTITION_FIELDS = {
+    'device': {
+        PowerFeed: 'power_panel',
+    },
+    'site': {
+        PowerFeed: 'power_panel__site',
+    },
+}
+DEFAULT_PARTITION_FIELDS = {
+    'device': 'device',
+    'site': 'device__site',
+}
+
+# Number of origins to trace per CablePathTracer pass
+TRACE_BATCH_SIZE = 500
+
+
+def get_origins(model):
+    """
+    Return all cabled (or wirelessly linked) origins of the given model which have no CablePath.
+    """
+    params = Q(cable__isnull=False)
+    if hasattr(model, 'wireless_link'):
+        params |= Q(wireless_link__isnull=False)
+    return model.objects.filter(params, _path__isnull=True)
+
+
+def get_partition_field(model, partition_by):
+    return PARTITION_FIELDS[partition_by].get(model, DEFAULT_PARTITION_FIELDS[partition_by])
+
+
+def trace_origins(origins, progress=None):
+    """
+    Create CablePaths for the given origins, tracing them in batches. Returns the number of origins traced.
+
+    :param origins: QuerySet of origin objects
+    :param progress: Optional callable, invoked with the running count after each batch is saved
+    """
+    count = 0
+    batch = []
+    for origin in origins.iterator(chunk_size=TRACE_BATCH_SIZE):
+        batch.append([origin])
+        if len(batch) >= TRACE_BATCH_SIZE:
+            with transaction.atomic():
+                CablePathTracer().create(batch)
+            count += len(batch)
+            batch = []
+            if progress:
+                progress(count)
+    if batch:
+        with transaction.atomic():
+            CablePathTracer().create(batch)
+        count += len(batch)
+
+    return count
+
+
+def trace_partition(task):
+    """
+    Worker entrypoint: trace all missing paths for origins of a model within a single partition.
+
+    :param task: A tuple of (model label, partition field, partition ID)
+    """
+    model_label, partition_field, partition_id = task
+    model = apps.get_model(model_label)
+    origins = get_origins(model).filter(**{partition_field: partition_id})
+    return model_label, partition_id, trace_origins(origins)
+
+
+def init_worker():
+    """
+    Discard any database connections inherited from the parent process, so that each worker opens its own.
+    """
+    connections.close_all()
+
+
+class Checkpoint:
+    """
+    Records the models and partitions which have been traced completely, so that an interrupted run can be resumed.
+    Each completed partition is appended to the checkpoint file as a single "<model>:<partition ID>" line, and each
+    completed model as a single "<model>" line.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.completed = set()
+
+    @property
+    def exists(self):
+        return bool(self.path) and os.path.exists(self.path)
+
+    def load(self):
+        if self.exists:
+            with open(self.path) as f:
+                self.completed = {line.strip() for line in f if line.strip()}
+        return self.completed
+
+    def start(self):
+        if self.path:
+            self._file = open(self.path, 'a')
+
+    @staticmethod
+    def get_key(model_label, partition_id=None):
+        if partition_id is None:
+            return model_label
+        return f'{model_label}:{partition_id}'
+
+    def record(self, model_label, partition_id=None):
+        key = self.get_key(model_label, partition_id)
+        self.completed.add(key)
+        if self.path:
+            self._file.write(f'{key}\n')
+            self._file.flush()
+
+    def is_completed(self, model_label, partition_id=None):
+        return self.get_key(model_label, partition_id) in self.completed
+
+    def finish(self):
+        if self.path:
+            self._file.close()
+            os.remove(self.path)
+
 
 class Command(BaseCommand):
     help = "Generate any missing cable paths among all cable termination objects in NetBox"
@@ -28,6 +157,18 @@ class Command(BaseCommand):
             "--no-input", action='store_true', dest='no_input',
             help="Do not prompt user for any input/confirmation"
         )
+        parser.add_argument(
+            "--workers", type=int, default=1, dest='workers',
+            help="Number of worker processes across which to trace paths (default: 1)"
+        )
+        parser.add_argument(
+            "--partition-by", choices=('device', 'site'), default='device', dest='partition_by',
+            help="Partition origins among workers by parent device or site (default: device)"
+        )
+        parser.add_argument(
+            "--checkpoint", dest='checkpoint', metavar='FILE',
+            help="Record progress to the specified file. If the file exists, resume the interrupted run it records."
+        )
 
     def draw_progress_bar(self, percentage):
         """
@@ -36,55 +177,130 @@ class Command(BaseCommand):
         bar_size = int(percentage / 5)
         self.stdout.write(f"\r  [{'#' * bar_size}{' ' * (20 - bar_size)}] {int(percentage)}%", ending='')
 
+    def delete_paths(self, no_input):
+        """
+        Delete all existing CablePaths and reset the model's PK sequence.
+        """
+        cable_paths = CablePath.objects.all()
+        paths_count = cable_paths.count()
+
+        # Prompt the user to confirm recalculation of all paths
+        if paths_count and not no_input:
+            self.stdout.write(self.style.ERROR("WARNING: Forcing recalculation of all cable paths."))
+            self.stdout.write(
+                f"This will delete and recalculate all {paths_count} existing cable paths. Are you sure?"
+            )
+            confirmation = input("Type yes to confirm: ")
+            if confirmation != 'yes':
+                self.stdout.write(self.style.SUCCESS("Aborting"))
+                return False
+
+        # Delete all existing CablePath instances (clearing the reverse node index directly)
+        self.stdout.write(f"Deleting {paths_count} existing cable paths...")
+        CablePathNode.objects.all()._raw_delete(using=CablePathNode.objects.db)
+        deleted_count, _ = CablePath.objects.all().delete()
+        self.stdout.write((self.style.SUCCESS(f'  Deleted {deleted_count} paths')))
+
+        # Reinitialize the model's PK sequence
+        self.stdout.write(f'Resetting database sequence for CablePath model')
+        sequence_sql = connection.ops.sequence_reset_sql(no_style(), [CablePath])
+        with connection.cursor() as cursor:
+            for sql in sequence_sql:
+                cursor.execute(sql)
+
+        return True
+
+    def report_throughput(self, model, count, elapsed):
+        rate = count / elapsed if elapsed else count
+        self.stdout.write(self.style.SUCCESS(
+            f'\n  Retraced {count} {model._meta.verbose_name_plural} in {elapsed:.2f}s ({rate:.1f} paths/s)'
+        ))
+
+    def trace_serial(self, model, checkpoint):
+        """
+        Trace all missing paths for the given model in the current process.
+        """
+        model_label = model._meta.label_lower
+        if checkpoint.is_completed(model_label):
+            self.stdout.write(f'Already retraced all {model._meta.verbose_name_plural}; skipping')
+            return
+        origins = get_origins(model)
+        origins_count = origins.count()
+        if not origins_count:
+            self.stdout.write(f'Found no missing {model._meta.verbose_name} paths; skipping')
+            checkpoint.record(model_label)
+            return
+        self.stdout.write(f'Retracing {origins_count} cabled {model._meta.verbose_name_plural}...')
+
+        start = time.monotonic()
+        count = trace_origins(origins, progress=lambda i: self.draw_progress_bar(i * 100 / origins_count))
+        self.draw_progress_bar(100)
+        checkpoint.record(model_label)
+        self.report_throughput(model, count, time.monotonic() - start)
+
+    def trace_parallel(self, model, pool, partition_by, checkpoint):
+        """
+        Trace all missing paths for the given model, distributing partitions of its origins across the worker pool.
+        """
+        model_label = model._meta.label_lower
+        if checkpoint.is_completed(model_label):
+            self.stdout.write(f'Already retraced all {model._meta.verbose_name_plural}; skipping')
+            return
+        partition_field = get_partition_field(model, partition_by)
+        origins = get_origins(model)
+        partition_ids = [
+            partition_id for partition_id in origins.order_by().values_list(partition_field, flat=True).distinct()
+            if not checkpoint.is_completed(model_label, partition_id)
+        ]
+        if not partition_ids:
+            self.stdout.write(f'Found no missing {model._meta.verbose_name} paths; skipping')
+            checkpoint.record(model_label)
+            return
+        self.stdout.write(
+            f'Retracing cabled {model._meta.verbose_name_plural} across {len(partition_ids)} '
+            f'{partition_by} partitions...'
+        )
+
+        start = time.monotonic()
+        count = 0
+        tasks = [(model_label, partition_field, partition_id) for partition_id in partition_ids]
+        for i, (_, partition_id, traced) in enumerate(pool.imap_unordered(trace_partition, tasks), start=1):
+            checkpoint.record(model_label, partition_id)
+            count += traced
+            self.draw_progress_bar(i * 100 / len(tasks))
+        checkpoint.record(model_label)
+        self.report_throughput(model, count, time.monotonic() - start)
+
     def handle(self, *model_names, **options):
+        if options['workers'] < 1:
+            raise CommandError("The number of workers must be at least 1.")
+        checkpoint = Checkpoint(options['checkpoint'])
+        resuming = checkpoint.exists
+
+        if resuming:
+            completed = checkpoint.load()
+            self.stdout.write(
+                f'Resuming from checkpoint {checkpoint.path} ({len(completed)} models/partitions completed)'
+            )
+
+        # If --force was passed, first delete all existing CablePaths (unless resuming an interrupted run, in which
+        # case only the origins without a path remain to be traced)
+        elif options['force']:
+            if not self.delete_paths(options['no_input']):
+                return
 
-        # If --force was passed, first delete all existing CablePaths
-        if options['force']:
-            cable_paths = CablePath.objects.all()
-            paths_count = cable_paths.count()
-
-            # Prompt the user to confirm recalculation of all paths
-            if paths_count and not options['no_input']:
-                self.stdout.write(self.style.ERROR("WARNING: Forcing recalculation of all cable paths."))
-                self.stdout.write(
-                    f"This will delete and recalculate all {paths_count} existing cable paths. Are you sure?"
-                )
-                confirmation = input("Type yes to confirm: ")
-                if confirmation != 'yes':
-                    self.stdout.write(self.style.SUCCESS("Aborting"))
-                    return
-
-            # Delete all existing CablePath instances
-            self.stdout.write(f"Deleting {paths_count} existing cable paths...")
-            deleted_count, _ = CablePath.objects.all().delete()
-            self.stdout.write((self.style.SUCCESS(f'  Deleted {deleted_count} paths')))
-
-            # Reinitialize the model's PK sequence
-            self.stdout.write(f'Resetting database sequence for CablePath model')
-            sequence_sql = connection.ops.sequence_reset_sql(no_style(), [CablePath])
-            with connection.cursor() as cursor:
-                for sql in sequence_sql:
-                    cursor.execute(sql)
+        checkpoint.start()
 
         # Retrace paths
-        for model in ENDPOINT_MODELS:
-            params = Q(cable__isnull=False)
-            if hasattr(model, 'wireless_link'):
-                params |= Q(wireless_link__isnull=False)
-            origins = model.objects.filter(params)
-            if not options['force']:
-                origins = origins.filter(_path__isnull=True)
-            origins_count = origins.count()
-            if not origins_count:
-                self.stdout.write(f'Found no missing {model._meta.verbose_name} paths; skipping')
-                continue
-            self.stdout.write(f'Retracing {origins_count} cabled {model._meta.verbose_name_plural}...')
-            i = 0
-            for i, obj in enumerate(origins, start=1):
-                create_cablepath([obj])
-                if not i % 100:
-                    self.draw_progress_bar(i * 100 / origins_count)
-            self.draw_progress_bar(100)
-            self.stdout.write(self.style.SUCCESS(f'\n  Retraced {i} {model._meta.verbose_name_plural}'))
+        if options['workers'] == 1:
+            for model in ENDPOINT_MODELS:
+                self.trace_serial(model, checkpoint)
+        else:
+            # Close the parent's connections so that none are shared with forked workers
+            connections.close_all()
+            with multiprocessing.get_context('fork').Pool(options['workers'], initializer=init_worker) as pool:
+                for model in ENDPOINT_MODELS:
+                    self.trace_parallel(model, pool, options['partition_by'], checkpoint)
 
+        checkpoint.finish()
         self.stdout.write(self.style.SUCCESS('Finished.'))
@@ -0,0 +1,52 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('dcim', '0187_alter_device_vc_position'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CablePathNode',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('object_type', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='+',
+                    to='contenttypes.contenttype'
+                )),
+                ('path', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='+',
+                    to='dcim.cablepath'
+                )),
+            ],
+            options={
+                'verbose_name': 'cable path node',
+                'verbose_name_plural': 'cable path nodes',
+                'indexes': [models.Index(fields=['object_type', 'object_id'], name='dcim_cablepathnode_object')],
+                'constraints': [
+                    models.UniqueConstraint(
+                        fields=('path', 'object_type', 'object_id'),
+                        name='dcim_cablepathnode_unique_path_object'
+                    )
+                ],
+            },
+        ),
+
+        # Populate the reverse index from the nodes of existing CablePaths
+        migrations.RunSQL(
+            sql=(
+                "INSERT INTO dcim_cablepathnode (path_id, object_type_id, object_id) "
+                "SELECT DISTINCT cp.id, ct.id, split_part(node, ':', 2)::bigint "
+                "FROM dcim_cablepath cp CROSS JOIN unnest(cp._nodes) AS node "
+                "INNER JOIN django_content_type ct ON ct.id = split_part(node, ':', 1)::integer"
+            ),
+            reverse_sql=migrations.RunSQL.noop
+        ),
+    ]
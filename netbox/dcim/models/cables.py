@@ -13,20 +13,23 @@ from core.models import ObjectType
 from dcim.choices import *
 from dcim.constants import *
 from dcim.fields import PathField
-from dcim.utils import decompile_path_node, object_to_path_node
+from dcim.utils import decompile_path_node
 from netbox.models import ChangeLoggedModel, PrimaryModel
 from utilities.conversion import to_meters
 from utilities.fields import ColorField
 from utilities.querysets import RestrictedQuerySet
-from wireless.models import WirelessLink
-from .device_components import FrontPort, RearPort, PathEndpoint
+from .device_components import FrontPort, RearPort
 
 __all__ = (
     'Cable',
     'CablePath',
+    'CablePathNode',
     'CableTermination',
 )
 
+# Maximum number of CablePathNodes to create per query
+NODE_INDEX_BATCH_SIZE = 1000
+
 
 trace_paths = Signal()
 
@@ -436,7 +439,8 @@ class CablePath(models.Model):
     if the instance represents a complete end-to-end path from origin(s) to destination(s). `is_split` is True if the
     path diverges across multiple cables.
 
-    `_nodes` retains a flattened list of all nodes within the path to enable simple filtering.
+    `_nodes` retains a flattened list of all nodes within the path. Each node is also recorded as a CablePathNode, which
+    serves as an indexed reverse lookup of the paths traversing a given object.
     """
     path = models.JSONField(
         verbose_name=_('path'),
@@ -472,11 +476,37 @@ class CablePath(models.Model):
 
         super().save(*args, **kwargs)
 
+        # Update the reverse node index
+        self.update_node_index([self])
+
         # Record a direct reference to this CablePath on its originating object(s)
         origin_model = self.origin_type.model_class()
         origin_ids = [decompile_path_node(node)[1] for node in self.path[0]]
         origin_model.objects.filter(pk__in=origin_ids).update(_path=self.pk)
 
+    def delete(self, *args, **kwargs):
+
+        # Remove the path from the reverse node index without first loading its nodes into memory
+        CablePathNode.objects.filter(path=self)._raw_delete(using=CablePathNode.objects.db)
+
+        return super().delete(*args, **kwargs)
+
+    @classmethod
+    def update_node_index(cls, cable_paths):
+        """
+        Synchronize the CablePathNode reverse index with the current nodes of the given (saved) CablePaths.
+        """
+        path_ids = [cp.pk for cp in cable_paths]
+        CablePathNode.objects.filter(path__in=path_ids)._raw_delete(using=CablePathNode.objects.db)
+
+        path_nodes = []
+        for cp in cable_paths:
+            # A node may appear more than once within a path; index it only once
+            for node in dict.fromkeys(cp._nodes):
+                ct_id, object_id = decompile_path_node(node)
+                path_nodes.append(CablePathNode(path_id=cp.pk, object_type_id=ct_id, object_id=object_id))
+        CablePathNode.objects.bulk_create(path_nodes, batch_size=NODE_INDEX_BATCH_SIZE)
+
     @property
     def origin_type(self):
         if self.path:
@@ -524,214 +554,20 @@ class CablePath(models.Model):
         Create a new CablePath instance as traced from the given termination objects. These can be any object to which a
         Cable or WirelessLink connects (interfaces, console ports, circuit termination, etc.). All terminations must be
         of the same type and must belong to the same parent object.
-        """
-        from circuits.models import CircuitTermination
-
-        if not terminations:
-            return None
-
-        # Ensure all originating terminations are attached to the same link
-        if len(terminations) > 1:
-            assert all(t.link == terminations[0].link for t in terminations[1:])
-
-        path = []
-        position_stack = []
-        is_complete = False
-        is_active = True
-        is_split = False
-
-        while terminations:
-
-            # Terminations must all be of the same type
-            assert all(isinstance(t, type(terminations[0])) for t in terminations[1:])
-
-            # All mid-span terminations must all be attached to the same device
-            if not isinstance(terminations[0], PathEndpoint):
-                assert all(isinstance(t, type(terminations[0])) for t in terminations[1:])
-                assert all(t.parent_object == terminations[0].parent_object for t in terminations[1:])
-
-            # Check for a split path (e.g. rear port fanning out to multiple front ports with
-            # different cables attached)
-            if len(set(t.link for t in terminations)) > 1 and (
-                    position_stack and len(terminations) != len(position_stack[-1])
-            ):
-                is_split = True
-                break
-
-            # Step 1: Record the near-end termination object(s)
-            path.append([
-                object_to_path_node(t) for t in terminations
-            ])
-
-            # Step 2: Determine the attached links (Cable or WirelessLink), if any
-            links = [termination.link for termination in terminations if termination.link is not None]
-            if len(links) == 0:
-                if len(path) == 1:
-                    # If this is the start of the path and no link exists, return None
-                    return None
-                # Otherwise, halt the trace if no link exists
-                break
-            assert all(type(link) in (Cable, WirelessLink) for link in links)
-            assert all(isinstance(link, type(links[0])) for link in links)
-
-            # Step 3: Record asymmetric paths as split
-            not_connected_terminations = [termination.link for termination in terminations if termination.link is None]
-            if len(not_connected_terminations) > 0:
-                is_complete = False
-                is_split = True
-
-            # Step 4: Record the links, keeping cables in order to allow for SVG rendering
-            cables = []
-            for link in links:
-                if object_to_path_node(link) not in cables:
-                    cables.append(object_to_path_node(link))
-            path.append(cables)
-
-            # Step 5: Update the path status if a link is not connected
-            links_status = [link.status for link in links if link.status != LinkStatusChoices.STATUS_CONNECTED]
-            if any([status != LinkStatusChoices.STATUS_CONNECTED for status in links_status]):
-                is_active = False
-
-            # Step 6: Determine the far-end terminations
-            if isinstance(links[0], Cable):
-                termination_type = ObjectType.objects.get_for_model(terminations[0])
-                local_cable_terminations = CableTermination.objects.filter(
-                    termination_type=termination_type,
-                    termination_id__in=[t.pk for t in terminations]
-                )
 
-                q_filter = Q()
-                for lct in local_cable_terminations:
-                    cable_end = 'A' if lct.cable_end == 'B' else 'B'
-                    q_filter |= Q(cable=lct.cable, cable_end=cable_end)
-
-                remote_cable_terminations = CableTermination.objects.filter(q_filter)
-                remote_terminations = [ct.termination for ct in remote_cable_terminations]
-            else:
-                # WirelessLink
-                remote_terminations = [
-                    link.interface_b if link.interface_a is terminations[0] else link.interface_a for link in links
-                ]
-
-            # Remote Terminations must all be of the same type, otherwise return a split path
-            if not all(isinstance(t, type(remote_terminations[0])) for t in remote_terminations[1:]):
-                is_complete = False
-                is_split = True
-                break
-
-            # Step 7: Record the far-end termination object(s)
-            path.append([
-                object_to_path_node(t) for t in remote_terminations if t is not None
-            ])
-
-            # Step 8: Determine the "next hop" terminations, if applicable
-            if not remote_terminations:
-                break
-
-            if isinstance(remote_terminations[0], FrontPort):
-                # Follow FrontPorts to their corresponding RearPorts
-                rear_ports = RearPort.objects.filter(
-                    pk__in=[t.rear_port_id for t in remote_terminations]
-                )
-                if len(rear_ports) > 1 or rear_ports[0].positions > 1:
-                    position_stack.append([fp.rear_port_position for fp in remote_terminations])
-
-                terminations = rear_ports
+        To trace many paths at once, use CablePathTracer directly.
+        """
+        from dcim.tracing import CablePathTracer
 
-            elif isinstance(remote_terminations[0], RearPort):
-                if len(remote_terminations) == 1 and remote_terminations[0].positions == 1:
-                    front_ports = FrontPort.objects.filter(
-                        rear_port_id__in=[rp.pk for rp in remote_terminations],
-                        rear_port_position=1
-                    )
-                # Obtain the individual front ports based on the termination and all positions
-                elif len(remote_terminations) > 1 and position_stack:
-                    positions = position_stack.pop()
-
-                    # Ensure we have a number of positions equal to the amount of remote terminations
-                    assert len(remote_terminations) == len(positions)
-
-                    # Get our front ports
-                    q_filter = Q()
-                    for rt in remote_terminations:
-                        position = positions.pop()
-                        q_filter |= Q(rear_port_id=rt.pk, rear_port_position=position)
-                    assert q_filter is not Q()
-                    front_ports = FrontPort.objects.filter(q_filter)
-                # Obtain the individual front ports based on the termination and position
-                elif position_stack:
-                    front_ports = FrontPort.objects.filter(
-                        rear_port_id=remote_terminations[0].pk,
-                        rear_port_position__in=position_stack.pop()
-                    )
-                else:
-                    # No position indicated: path has split, so we stop at the RearPorts
-                    is_split = True
-                    break
-
-                terminations = front_ports
-
-            elif isinstance(remote_terminations[0], CircuitTermination):
-                # Follow a CircuitTermination to its corresponding CircuitTermination (A to Z or vice versa)
-                if len(remote_terminations) > 1:
-                    is_split = True
-                    break
-                circuit_termination = CircuitTermination.objects.filter(
-                    circuit=remote_terminations[0].circuit,
-                    term_side='Z' if remote_terminations[0].term_side == 'A' else 'A'
-                ).first()
-                if circuit_termination is None:
-                    break
-                elif circuit_termination.provider_network:
-                    # Circuit terminates to a ProviderNetwork
-                    path.extend([
-                        [object_to_path_node(circuit_termination)],
-                        [object_to_path_node(circuit_termination.provider_network)],
-                    ])
-                    is_complete = True
-                    break
-                elif circuit_termination.site and not circuit_termination.cable:
-                    # Circuit terminates to a Site
-                    path.extend([
-                        [object_to_path_node(circuit_termination)],
-                        [object_to_path_node(circuit_termination.site)],
-                    ])
-                    break
-
-                terminations = [circuit_termination]
-
-            else:
-                # Check for non-symmetric path
-                if all(isinstance(t, type(remote_terminations[0])) for t in remote_terminations[1:]):
-                    is_complete = True
-                elif len(remote_terminations) == 0:
-                    is_complete = False
-                else:
-                    # Unsupported topology, mark as split and exit
-                    is_complete = False
-                    is_split = True
-                break
-
-        return cls(
-            path=path,
-            is_complete=is_complete,
-            is_active=is_active,
-            is_split=is_split
-        )
+        return CablePathTracer().trace([terminations])[0]
 
     def retrace(self):
         """
         Retrace the path from the currently-defined originating termination(s)
         """
-        _new = self.from_origin(self.origins)
-        if _new:
-            self.path = _new.path
-            self.is_complete = _new.is_complete
-            self.is_active = _new.is_active
-            self.is_split = _new.is_split
-            self.save()
-        else:
-            self.delete()
+        from dcim.tracing import CablePathTracer
+
+        CablePathTracer().retrace([self])
     retrace.alters_data = True
 
     def _get_path(self):
@@ -827,3 +663,41 @@ class CablePath(models.Model):
                 asymmetric_nodes.extend([node for node in nodes if node.link is None])
 
         return asymmetric_nodes
+
+
+class CablePathNode(models.Model):
+    """
+    A reverse index of CablePath membership: each instance records that a CablePath traverses a particular object
+    (e.g. an interface, front port, or cable). This enables the efficient retrieval of all paths traversing an
+    object via an indexed equality lookup, rather than by scanning the `_nodes` array of every CablePath. Instances
+    are maintained automatically when a CablePath is saved or deleted.
+    """
+    path = models.ForeignKey(
+        to='dcim.CablePath',
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    object_type = models.ForeignKey(
+        to='contenttypes.ContentType',
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    object_id = models.PositiveBigIntegerField()
+
+    _netbox_private = True
+
+    class Meta:
+        indexes = (
+            models.Index(fields=('object_type', 'object_id'), name='dcim_cablepathnode_object'),
+        )
+        constraints = (
+            models.UniqueConstraint(
+                fields=('path', 'object_type', 'object_id'),
+                name='%(app_label)s_%(class)s_unique_path_object'
+            ),
+        )
+        verbose_name = _('cable path node')
+        verbose_name_plural = _('cable path nodes')
+
+    def __str__(self):
+        return f'Path #{self.path_id}: {self.object_type_id}:{self.object_id}'
@@ -8,7 +8,7 @@ from .models import (
     Cable, CablePath, CableTermination, Device, FrontPort, PathEndpoint, PowerPanel, Rack, Location, VirtualChassis,
 )
 from .models.cables import trace_paths
-from .utils import create_cablepath, rebuild_paths
+from .utils import compile_path_node, create_cablepath, rebuild_paths, retrace_paths
 
 
 #
@@ -112,8 +112,7 @@ def retrace_cable_paths(instance, **kwargs):
     """
     When a Cable is deleted, check for and update its connected endpoints
     """
-    for cablepath in CablePath.objects.filter(_nodes__contains=instance):
-        cablepath.retrace()
+    retrace_paths(CablePath.objects.filter(_nodes__contains=instance))
 
 
 @receiver(post_delete, sender=CableTermination)
@@ -124,11 +123,9 @@ def nullify_connected_endpoints(instance, **kwargs):
     model = instance.termination_type.model_class()
     model.objects.filter(pk=instance.termination_id).update(cable=None, cable_end='')
 
-    for cablepath in CablePath.objects.filter(_nodes__contains=instance.cable):
-        # Remove the deleted CableTermination if it's one of the path's originating nodes
-        if instance.termination in cablepath.origins:
-            cablepath.origins.remove(instance.termination)
-        cablepath.retrace()
+    # Remove the deleted CableTermination from the originating nodes of any affected paths
+    termination_node = compile_path_node(instance.termination_type_id, instance.termination_id)
+    retrace_paths(CablePath.objects.filter(_nodes__contains=instance.cable), exclude_origins=[termination_node])
 
 
 @receiver(post_save, sender=FrontPort)
@@ -138,5 +135,4 @@ def extend_rearport_cable_paths(instance, created, raw, **kwargs):
     """
     if created and not raw:
         rearport = instance.rear_port
-        for cablepath in CablePath.objects.filter(_nodes__contains=rearport):
-            cablepath.retrace()
+        retrace_paths(CablePath.objects.filter(_nodes__contains=rearport))
@@ -1,3 +1,5 @@
+import json
+
 from django.contrib.auth import get_user_model
 from django.test import override_settings
 from django.urls import reverse
@@ -7,7 +9,7 @@ from rest_framework import status
 from dcim.choices import *
 from dcim.constants import *
 from dcim.models import *
-from extras.models import ConfigTemplate
+from extras.models import ConfigContext, ConfigTemplate
 from ipam.models import ASN, RIR, VLAN, VRF
 from netbox.api.serializers import GenericObjectSerializer
 from tenancy.models import Tenant
@@ -1219,6 +1221,21 @@ class DeviceTest(APIViewTestCases.APIViewTestCase):
 
         self.assertFalse('config_context' in response.data['results'][0])
 
+    def test_config_contexts(self):
+        """
+        Check that the rendered config contexts of multiple devices can be retrieved at once.
+        """
+        ConfigContext.objects.create(name='Config Context 1', data={'A': 0, 'Z': 0})
+        self.add_permissions('dcim.view_device')
+        url = reverse('dcim-api:device-config-contexts') + '?name=Device 1&name=Device 2'
+        response = self.client.get(url, **self.header)
+
+        self.assertHttpStatus(response, status.HTTP_200_OK)
+        data = json.loads(b''.join(response.streaming_content))
+        self.assertEqual([d['name'] for d in data], ['Device 1', 'Device 2'])
+        self.assertEqual(data[0]['config_context'], {'A': 1, 'Z': 0})
+        self.assertEqual(data[1]['config_context'], {'A': 0, 'B': 2, 'Z': 0})
+
     def test_unique_name_per_site_constraint(self):
         """
         Check that creating a device with a duplicate name within a site fails.
@@ -4,7 +4,7 @@ from circuits.models import *
 from dcim.choices import LinkStatusChoices
 from dcim.models import *
 from dcim.svg import CableTraceSVG
-from dcim.utils import object_to_path_node
+from dcim.utils import create_cablepaths, deferred_path_tracing, object_to_path_node, rebuild_paths
 
 
 class CablePathTestCase(TestCase):
@@ -16,6 +16,7 @@ class CablePathTestCase(TestCase):
         2XX: Test different cable topologies
         3XX: Test responses to changes in existing objects
         4XX: Test to exclude specific cable topologies
+        5XX: Test bulk tracing of multiple paths
     """
     @classmethod
     def setUpTestData(cls):
@@ -2300,3 +2301,130 @@ class CablePathTestCase(TestCase):
             is_active=True
         )
         self.assertEqual(CablePath.objects.count(), 0)
+
+    def test_501_trace_multiple_paths(self):
+        """
+        [IF1] --C1-- [FP1:1] [RP1] --C3-- [RP2] [FP2:1] --C4-- [IF3]
+        [IF2] --C2-- [FP1:2]                    [FP2:2] --C5-- [IF4]
+        """
+        interfaces = [
+            Interface.objects.create(device=self.device, name=f'Interface {i}') for i in range(1, 5)
+        ]
+        rearport1 = RearPort.objects.create(device=self.device, name='Rear Port 1', positions=2)
+        rearport2 = RearPort.objects.create(device=self.device, name='Rear Port 2', positions=2)
+        frontports = [
+            FrontPort.objects.create(
+                device=self.device, name=f'Front Port {rp}:{pos}', rear_port=rear_port, rear_port_position=pos
+            )
+            for rp, rear_port in ((1, rearport1), (2, rearport2)) for pos in (1, 2)
+        ]
+        Cable(a_terminations=[interfaces[0]], b_terminations=[frontports[0]]).save()
+        Cable(a_terminations=[interfaces[1]], b_terminations=[frontports[1]]).save()
+        Cable(a_terminations=[rearport1], b_terminations=[rearport2]).save()
+        Cable(a_terminations=[frontports[2]], b_terminations=[interfaces[2]]).save()
+        Cable(a_terminations=[frontports[3]], b_terminations=[interfaces[3]]).save()
+        self.assertEqual(CablePath.objects.filter(is_complete=True).count(), 4)
+        expected_paths = sorted(
+            (cp.path, cp.is_active, cp.is_complete, cp.is_split) for cp in CablePath.objects.all()
+        )
+
+        # Trace all paths from scratch in a single pass
+        CablePath.objects.all().delete()
+        create_cablepaths([[interface] for interface in interfaces])
+        self.assertEqual(
+            sorted((cp.path, cp.is_active, cp.is_complete, cp.is_split) for cp in CablePath.objects.all()),
+            expected_paths
+        )
+        for interface in interfaces:
+            interface.refresh_from_db()
+            self.assertEqual(interface._path.path[0], [object_to_path_node(interface)])
+
+        # Rebuild all paths traversing the trunk cable in place
+        path_ids = set(CablePath.objects.values_list('pk', flat=True))
+        rebuild_paths([rearport1])
+        self.assertEqual(set(CablePath.objects.values_list('pk', flat=True)), path_ids)
+        self.assertEqual(
+            sorted((cp.path, cp.is_active, cp.is_complete, cp.is_split) for cp in CablePath.objects.all()),
+            expected_paths
+        )
+
+    def test_502_path_node_index(self):
+        """
+        [IF1] --C1-- [FP1] [RP1] --C2-- [RP2] [FP2] --C3-- [IF2]
+        """
+        interface1 = Interface.objects.create(device=self.device, name='Interface 1')
+        interface2 = Interface.objects.create(device=self.device, name='Interface 2')
+        rearport1 = RearPort.objects.create(device=self.device, name='Rear Port 1', positions=1)
+        rearport2 = RearPort.objects.create(device=self.device, name='Rear Port 2', positions=1)
+        frontport1 = FrontPort.objects.create(
+            device=self.device, name='Front Port 1', rear_port=rearport1, rear_port_position=1
+        )
+        frontport2 = FrontPort.objects.create(
+            device=self.device, name='Front Port 2', rear_port=rearport2, rear_port_position=1
+        )
+        Cable(a_terminations=[interface1], b_terminations=[frontport1]).save()
+        cable2 = Cable(a_terminations=[rearport1], b_terminations=[rearport2])
+        cable2.save()
+        Cable(a_terminations=[frontport2], b_terminations=[interface2]).save()
+
+        # Every node of every path should be recorded in the reverse index
+        for cp in CablePath.objects.all():
+            self.assertEqual(
+                sorted(object_to_path_node(node.object_type.model_class()(pk=node.object_id)) for node in
+                       CablePathNode.objects.filter(path=cp)),
+                sorted(set(cp._nodes))
+            )
+        self.assertEqual(CablePath.objects.filter(_nodes__contains=cable2).count(), 2)
+        self.assertEqual(CablePath.objects.filter(_nodes__contains=interface1).count(), 2)
+
+        # Deleting the trunk cable should update the index
+        cable2.delete()
+        self.assertEqual(CablePath.objects.filter(_nodes__contains=cable2).count(), 0)
+        self.assertFalse(CablePathNode.objects.exclude(path__in=CablePath.objects.all()).exists())
+
+    def test_503_deferred_path_tracing(self):
+        """
+        [IF1] --C1-- [FP1:1] [RP1] --C3-- [RP2] [FP2:1] --C4-- [IF3]
+        [IF2] --C2-- [FP1:2]                    [FP2:2] --C5-- [IF4]
+        """
+        interfaces = [
+            Interface.objects.create(device=self.device, name=f'Interface {i}') for i in range(1, 5)
+        ]
+        rearport1 = RearPort.objects.create(device=self.device, name='Rear Port 1', positions=2)
+        rearport2 = RearPort.objects.create(device=self.device, name='Rear Port 2', positions=2)
+        frontports = [
+            FrontPort.objects.create(
+                device=self.device, name=f'Front Port {rp}:{pos}', rear_port=rear_port, rear_port_position=pos
+            )
+            for rp, rear_port in ((1, rearport1), (2, rearport2)) for pos in (1, 2)
+        ]
+
+        # No paths should be traced until the deferred block exits
+        with deferred_path_tracing():
+            Cable(a_terminations=[interfaces[0]], b_terminations=[frontports[0]]).save()
+            Cable(a_terminations=[interfaces[1]], b_terminations=[frontports[1]]).save()
+            trunk_cable = Cable(a_terminations=[rearport1], b_terminations=[rearport2])
+            trunk_cable.save()
+            Cable(a_terminations=[frontports[2]], b_terminations=[interfaces[2]]).save()
+            Cable(a_terminations=[frontports[3]], b_terminations=[interfaces[3]]).save()
+            self.assertFalse(CablePath.objects.exists())
+        self.assertEqual(CablePath.objects.count(), 4)
+        self.assertEqual(CablePath.objects.filter(is_complete=True).count(), 4)
+        for interface in interfaces:
+            interface.refresh_from_db()
+            self.assertEqual(interface._path.path[0], [object_to_path_node(interface)])
+
+        # Deleting the trunk cable should retrace each affected path once
+        path_ids = set(CablePath.objects.values_list('pk', flat=True))
+        with deferred_path_tracing():
+            trunk_cable.delete()
+            self.assertEqual(CablePath.objects.filter(is_complete=True).count(), 4)
+        self.assertEqual(set(CablePath.objects.values_list('pk', flat=True)), path_ids)
+        self.assertFalse(CablePath.objects.filter(is_complete=True).exists())
+
+        # Queued work should be discarded if the block raises an exception
+        with self.assertRaises(ValueError):
+            with deferred_path_tracing():
+                Cable(a_terminations=[rearport1], b_terminations=[rearport2]).save()
+                raise ValueError
+        self.assertFalse(CablePath.objects.filter(is_complete=True).exists())
@@ -0,0 +1,93 @@
+import os
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.db.models.signals import post_save
+from django.test import TransactionTestCase
+
+from dcim.management.commands.trace_paths import Checkpoint
+from dcim.models import *
+from netbox.search.backends import search_backend
+
+
+class TracePathsTestCase(TransactionTestCase):
+    """
+    Test the trace_paths management command. A TransactionTestCase is used so that forked worker processes can see
+    the test data.
+    """
+    def setUp(self):
+        # Disconnect search backend to avoid issues with cached ObjectTypes being deleted
+        # from the database upon transaction rollback
+        post_save.disconnect(search_backend.caching_handler)
+
+        site = Site.objects.create(name='Site 1', slug='site-1')
+        manufacturer = Manufacturer.objects.create(name='Manufacturer 1', slug='manufacturer-1')
+        device_type = DeviceType.objects.create(manufacturer=manufacturer, model='Device Type 1')
+        role = DeviceRole.objects.create(name='Device Role 1', slug='device-role-1')
+        self.devices = (
+            Device.objects.create(site=site, device_type=device_type, role=role, name='Device 1'),
+            Device.objects.create(site=site, device_type=device_type, role=role, name='Device 2'),
+        )
+
+        # Connect two interfaces on each device to one another
+        for device in self.devices:
+            Cable(
+                a_terminations=[Interface.objects.create(device=device, name='Interface 1')],
+                b_terminations=[Interface.objects.create(device=device, name='Interface 2')]
+            ).save()
+        self.assertEqual(CablePath.objects.count(), 4)
+
+        # Delete all paths, leaving them to be retraced
+        CablePath.objects.all().delete()
+
+        fd, self.checkpoint = tempfile.mkstemp()
+        os.close(fd)
+        os.remove(self.checkpoint)
+
+    def tearDown(self):
+        post_save.connect(search_backend.caching_handler)
+        if os.path.exists(self.checkpoint):
+            os.remove(self.checkpoint)
+
+    def write_checkpoint(self, *keys):
+        with open(self.checkpoint, 'w') as f:
+            f.writelines(f'{key}\n' for key in keys)
+
+    def trace_paths(self, **options):
+        call_command('trace_paths', no_input=True, checkpoint=self.checkpoint, stdout=StringIO(), **options)
+
+    def test_trace_paths_parallel(self):
+        self.trace_paths(workers=2)
+
+        self.assertEqual(CablePath.objects.count(), 4)
+        self.assertFalse(Interface.objects.filter(_path__isnull=True).exists())
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+    def test_trace_paths_resume_partition(self):
+        # Mark the first device's partition as complete
+        self.write_checkpoint(f'dcim.interface:{self.devices[0].pk}')
+        self.trace_paths(workers=2)
+
+        self.assertEqual(CablePath.objects.count(), 2)
+        self.assertFalse(Interface.objects.filter(device=self.devices[0], _path__isnull=False).exists())
+        self.assertFalse(Interface.objects.filter(device=self.devices[1], _path__isnull=True).exists())
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+    def test_trace_paths_resume_model(self):
+        # Mark all interfaces as complete
+        self.write_checkpoint('dcim.interface')
+        self.trace_paths(workers=1)
+
+        self.assertEqual(CablePath.objects.count(), 0)
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+    def test_trace_paths_serial_checkpoint(self):
+        # Interrupt the run before it finishes, leaving the checkpoint file in place
+        with patch.object(Checkpoint, 'finish', lambda checkpoint: checkpoint._file.close()):
+            self.trace_paths(workers=1)
+
+        self.assertEqual(CablePath.objects.count(), 4)
+        with open(self.checkpoint) as f:
+            self.assertIn('dcim.interface', f.read().split())
@@ -0,0 +1,548 @@
+import itertools
+from collections import defaultdict
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Case, Value, When
+
+from circuits.models import CircuitTermination
+from dcim.choices import CableEndChoices, LinkStatusChoices
+from dcim.models import (
+    Cable, CablePath, CablePathNode, CableTermination, FrontPort, Interface, PathEndpoint, RearPort,
+)
+from dcim.utils import compile_path_node, decompile_path_node
+from wireless.models import WirelessLink
+
+__all__ = (
+    'CablePathTracer',
+)
+
+# Maximum number of originating objects to update per query
+ORIGIN_UPDATE_BATCH_SIZE = 1000
+
+
+class CablePathTracer:
+    """
+    Trace CablePaths for many sets of origins in a single pass.
+
+    Each path is traced by a generator which mirrors the logic of CablePath.from_origin(), but rather than querying
+    the database at every hop, it declares the objects it needs next (cables, cable terminations, device ports,
+    circuit terminations, etc.). The tracer advances all traces in lockstep, resolving the combined requirements of
+    each step with a single query per object type. Resolved objects are cached for the lifetime of the tracer, so
+    paths which share segments (e.g. a trunk between two patch panels) are loaded only once.
+    """
+    def __init__(self):
+        self._objects = {}                                  # (content type ID, object ID) -> instance
+        self._cables = {}                                   # Cable ID -> Cable
+        self._cable_terminations = {}                       # Cable ID -> [CableTermination]
+        self._terminations_by_object = {}                   # (content type ID, object ID) -> CableTermination
+        self._wireless_links = {}                           # WirelessLink ID -> WirelessLink
+        self._devices = set()                               # IDs of Devices with loaded front & rear ports
+        self._rear_ports = {}                               # RearPort ID -> RearPort
+        self._front_ports = defaultdict(list)               # RearPort ID -> [FrontPort]
+        self._port_ranks = {}                               # (model, object ID) -> default ordering rank
+        self._circuits = {}                                 # Circuit ID -> {term_side: CircuitTermination}
+        self._content_types = {}                            # model -> content type ID
+
+    #
+    # Public API
+    #
+
+    def trace(self, origin_sets):
+        """
+        Trace a path from each set of origin terminations. Returns a list of unsaved CablePath instances (or None,
+        where no path exists) in the same order as the given origin sets.
+        """
+        traces = {i: self._trace(list(origins)) for i, origins in enumerate(origin_sets)}
+        results = [None] * len(traces)
+
+        while traces:
+            requirements = []
+            for i, trace in list(traces.items()):
+                try:
+                    requirements.extend(next(trace))
+                except StopIteration as e:
+                    results[i] = e.value
+                    del traces[i]
+            self._resolve(requirements)
+
+        return results
+
+    def create(self, origin_sets):
+        """
+        Trace and save new CablePaths for each set of origin terminations. Returns the list of created CablePaths.
+        """
+        cable_paths = [cp for cp in self.trace(origin_sets) if cp is not None]
+        for cp in cable_paths:
+            cp._nodes = list(itertools.chain(*cp.path))
+        CablePath.objects.bulk_create(cable_paths)
+        CablePath.update_node_index(cable_paths)
+        self._update_origins(cable_paths)
+
+        return cable_paths
+
+    def retrace(self, cable_paths):
+        """
+        Retrace the given CablePaths from their current originating terminations. Paths which no longer exist are
+        deleted; all others are updated in place.
+        """
+        cable_paths = list(cable_paths)
+        if not cable_paths:
+            return
+
+        # Resolve the originating objects of all paths in bulk. If a path's objects have already been resolved (e.g.
+        # its list of origins was modified in place), honor them.
+        origin_nodes = {
+            cp.pk: [decompile_path_node(node) for node in cp.path[0]] if cp.path else []
+            for cp in cable_paths if not hasattr(cp, '_path_objects')
+        }
+        self._resolve([
+            ('object', node) for nodes in origin_nodes.values() for node in nodes
+        ])
+        origin_sets = []
+        for cp in cable_paths:
+            if cp.pk in origin_nodes:
+                origin_sets.append([self._objects[node] for node in origin_nodes[cp.pk] if node in self._objects])
+            else:
+                origin_sets.append(cp.origins)
+
+        to_update = []
+        to_delete = []
+        for cp, new in zip(cable_paths, self.trace(origin_sets)):
+            if new is None:
+                to_delete.append(cp.pk)
+                continue
+            cp.path = new.path
+            cp.is_complete = new.is_complete
+            cp.is_active = new.is_active
+            cp.is_split = new.is_split
+            cp._nodes = list(itertools.chain(*cp.path))
+            if hasattr(cp, '_path_objects'):
+                del cp._path_objects
+            to_update.append(cp)
+
+        if to_update:
+            CablePath.objects.bulk_update(to_update, ('path', 'is_complete', 'is_active', 'is_split', '_nodes'))
+            CablePath.update_node_index(to_update)
+            self._update_origins(to_update)
+        if to_delete:
+            CablePathNode.objects.filter(path__in=to_delete)._raw_delete(using=CablePathNode.objects.db)
+            CablePath.objects.filter(pk__in=to_delete).delete()
+
+    #
+    # Path tracing
+    #
+
+    def _trace(self, terminations):
+        """
+        Generator which traces a single path, yielding its data requirements at each hop. Returns a CablePath (or
+        None) upon completion.
+        """
+        if not terminations:
+            return None
+
+        if requirements := self._link_requirements(terminations):
+            yield requirements
+
+        # Ensure all originating terminations are attached to the same link
+        if len(terminations) > 1:
+            assert all(self._link_key(t) == self._link_key(terminations[0]) for t in terminations[1:])
+
+        path = []
+        position_stack = []
+        is_complete = False
+        is_active = True
+        is_split = False
+
+        while terminations:
+
+            if requirements := self._link_requirements(terminations):
+                yield requirements
+
+            # Terminations must all be of the same type
+            assert all(isinstance(t, type(terminations[0])) for t in terminations[1:])
+
+            # All mid-span terminations must all be attached to the same device
+            if not isinstance(terminations[0], PathEndpoint):
+                assert all(self._parent_key(t) == self._parent_key(terminations[0]) for t in terminations[1:])
+
+            # Check for a split path (e.g. rear port fanning out to multiple front ports with
+            # different cables attached)
+            if len(set(self._link_key(t) for t in terminations)) > 1 and (
+                    position_stack and len(terminations) != len(position_stack[-1])
+            ):
+                is_split = True
+                break
+
+            # Step 1: Record the near-end termination object(s)
+            path.append([
+                self._path_node(t) for t in terminations
+            ])
+
+            # Step 2: Determine the attached links (Cable or WirelessLink), if any
+            links = [link for link in (self._get_link(t) for t in terminations) if link is not None]
+            if len(links) == 0:
+                if len(path) == 1:
+                    # If this is the start of the path and no link exists, return None
+                    return None
+                # Otherwise, halt the trace if no link exists
+                break
+            assert all(isinstance(link, type(links[0])) for link in links)
+
+            # Step 3: Record asymmetric paths as split
+            if len(links) < len(terminations):
+                is_complete = False
+                is_split = True
+
+            # Step 4: Record the links, keeping cables in order to allow for SVG rendering
+            cables = []
+            for link in links:
+                if self._path_node(link) not in cables:
+                    cables.append(self._path_node(link))
+            path.append(cables)
+
+            # Step 5: Update the path status if a link is not connected
+            if any(link.status != LinkStatusChoices.STATUS_CONNECTED for link in links):
+                is_active = False
+
+            # Step 6: Determine the far-end terminations
+            if isinstance(links[0], Cable):
+                remote_terminations = self._get_link_peers(terminations)
+            else:
+                # WirelessLink
+                remote_terminations = [
+                    self._objects.get((
+                        self._content_type_id(Interface),
+                        link.interface_b_id if link.interface_a_id == terminations[0].pk else link.interface_a_id
+                    )) for link in links
+                ]
+
+            # Remote Terminations must all be of the same type, otherwise return a split path
+            if not all(isinstance(t, type(remote_terminations[0])) for t in remote_terminations[1:]):
+                is_complete = False
+                is_split = True
+                break
+
+            # Step 7: Record the far-end termination object(s)
+            path.append([
+                self._path_node(t) for t in remote_terminations if t is not None
+            ])
+
+            # Step 8: Determine the "next hop" terminations, if applicable
+            if not remote_terminations:
+                break
+
+            if isinstance(remote_terminations[0], FrontPort):
+                # Follow FrontPorts to their corresponding RearPorts
+                if requirements := self._port_requirements(remote_terminations):
+                    yield requirements
+                rear_ports = self._sort_ports(
+                    self._rear_ports[pk] for pk in {t.rear_port_id for t in remote_terminations}
+                    if pk in self._rear_ports
+                )
+                if len(rear_ports) > 1 or rear_ports[0].positions > 1:
+                    position_stack.append([fp.rear_port_position for fp in remote_terminations])
+
+                terminations = rear_ports
+
+            elif isinstance(remote_terminations[0], RearPort):
+                if requirements := self._port_requirements(remote_terminations):
+                    yield requirements
+
+                if len(remote_terminations) == 1 and remote_terminations[0].positions == 1:
+                    front_ports = [
+                        fp for rp in {rp.pk for rp in remote_terminations} for fp in self._front_ports[rp]
+                        if fp.rear_port_position == 1
+                    ]
+                # Obtain the individual front ports based on the termination and all positions
+                elif len(remote_terminations) > 1 and position_stack:
+                    positions = position_stack.pop()
+
+                    # Ensure we have a number of positions equal to the amount of remote terminations
+                    assert len(remote_terminations) == len(positions)
+
+                    # Get our front ports
+                    rear_port_positions = set()
+                    for rt in remote_terminations:
+                        position = positions.pop()
+                        rear_port_positions.add((rt.pk, position))
+                    front_ports = [
+                        fp for rp in {rp.pk for rp in remote_terminations} for fp in self._front_ports[rp]
+                        if (fp.rear_port_id, fp.rear_port_position) in rear_port_positions
+                    ]
+                # Obtain the individual front ports based on the termination and position
+                elif position_stack:
+                    positions = position_stack.pop()
+                    front_ports = [
+                        fp for fp in self._front_ports[remote_terminations[0].pk]
+                        if fp.rear_port_position in positions
+                    ]
+                else:
+                    # No position indicated: path has split, so we stop at the RearPorts
+                    is_split = True
+                    break
+
+                terminations = self._sort_ports(front_ports)
+
+            elif isinstance(remote_terminations[0], CircuitTermination):
+                # Follow a CircuitTermination to its corresponding CircuitTermination (A to Z or vice versa)
+                if len(remote_terminations) > 1:
+                    is_split = True
+                    break
+                if remote_terminations[0].circuit_id not in self._circuits:
+                    yield [('circuit', remote_terminations[0].circuit_id)]
+                circuit_termination = self._circuits[remote_terminations[0].circuit_id].get(
+                    'Z' if remote_terminations[0].term_side == 'A' else 'A'
+                )
+                if circuit_termination is None:
+                    break
+                elif circuit_termination.provider_network_id:
+                    # Circuit terminates to a ProviderNetwork
+                    path.extend([
+                        [self._path_node(circuit_termination)],
+                        [self._path_node(circuit_termination, 'provider_network')],
+                    ])
+                    is_complete = True
+                    break
+                elif circuit_termination.site_id and not circuit_termination.cable_id:
+                    # Circuit terminates to a Site
+                    path.extend([
+                        [self._path_node(circuit_termination)],
+                        [self._path_node(circuit_termination, 'site')],
+                    ])
+                    break
+
+                terminations = [circuit_termination]
+
+            else:
+                # Check for non-symmetric path
+                if all(isinstance(t, type(remote_terminations[0])) for t in remote_terminations[1:]):
+                    is_complete = True
+                elif len(remote_terminations) == 0:
+                    is_complete = False
+                else:
+                    # Unsupported topology, mark as split and exit
+                    is_complete = False
+                    is_split = True
+                break
+
+        return CablePath(
+            path=path,
+            is_complete=is_complete,
+            is_active=is_active,
+            is_split=is_split
+        )
+
+    def _get_link_peers(self, terminations):
+        """
+        Return the terminations on the opposite end(s) of the Cable(s) attached to the given terminations, in the
+        same order as they would be returned by the database.
+        """
+        termination_type_id = self._content_type_id(type(terminations[0]))
+        local_cable_terminations = [
+            self._terminations_by_object[(termination_type_id, t.pk)] for t in terminations
+            if (termination_type_id, t.pk) in self._terminations_by_object
+        ]
+
+        remote_ends = set()
+        for lct in local_cable_terminations:
+            cable_end = CableEndChoices.SIDE_A if lct.cable_end == CableEndChoices.SIDE_B else CableEndChoices.SIDE_B
+            remote_ends.add((lct.cable_id, cable_end))
+
+        remote_cable_terminations = sorted(
+            (
+                ct for cable_id in {cable_id for cable_id, _ in remote_ends}
+                for ct in self._cable_terminations.get(cable_id, [])
+                if (ct.cable_id, ct.cable_end) in remote_ends
+            ),
+            key=lambda ct: (ct.cable_id, ct.cable_end, ct.pk)
+        )
+
+        return [
+            self._objects.get((ct.termination_type_id, ct.termination_id)) for ct in remote_cable_terminations
+        ]
+
+    #
+    # Helpers
+    #
+
+    def _content_type_id(self, model):
+        if model not in self._content_types:
+            self._content_types[model] = ContentType.objects.get_for_model(model).pk
+        return self._content_types[model]
+
+    def _path_node(self, obj, field_name=None):
+        """
+        Return the path node representation of the given object, or of the object it references by `field_name`.
+        """
+        if field_name:
+            field = obj._meta.get_field(field_name)
+            return compile_path_node(self._content_type_id(field.related_model), getattr(obj, field.attname))
+        return compile_path_node(self._content_type_id(type(obj)), obj.pk)
+
+    def _get_link(self, termination):
+        if termination.cable_id:
+            return self._cables.get(termination.cable_id)
+        if getattr(termination, 'wireless_link_id', None):
+            return self._wireless_links.get(termination.wireless_link_id)
+        return None
+
+    @staticmethod
+    def _link_key(termination):
+        if termination.cable_id:
+            return Cable, termination.cable_id
+        if getattr(termination, 'wireless_link_id', None):
+            return WirelessLink, termination.wireless_link_id
+        return None
+
+    @staticmethod
+    def _parent_key(termination):
+        if isinstance(termination, CircuitTermination):
+            return termination.circuit_id
+        return termination.device_id
+
+    def _sort_ports(self, ports):
+        """
+        Order front or rear ports as they would be ordered by the database.
+        """
+        return sorted(ports, key=lambda port: self._port_ranks[(type(port), port.pk)])
+
+    #
+    # Data resolution
+    #
+
+    def _link_requirements(self, terminations):
+        requirements = []
+        for t in terminations:
+            if t.cable_id and t.cable_id not in self._cables:
+                requirements.append(('cable', t.cable_id))
+            elif getattr(t, 'wireless_link_id', None) and t.wireless_link_id not in self._wireless_links:
+                requirements.append(('wireless_link', t.wireless_link_id))
+        return requirements
+
+    def _port_requirements(self, ports):
+        return [
+            ('device', port.device_id) for port in ports if port is not None and port.device_id not in self._devices
+        ]
+
+    def _resolve(self, requirements):
+        """
+        Load all required objects which have not already been cached, using a single query per object type.
+        """
+        pending = defaultdict(set)
+        for kind, key in requirements:
+            pending[kind].add(key)
+
+        if pending['wireless_link']:
+            self._load_wireless_links(pending['wireless_link'])
+        if pending['cable']:
+            self._load_cables(pending['cable'])
+        if pending['device']:
+            self._load_device_ports(pending['device'])
+        if pending['circuit']:
+            self._load_circuits(pending['circuit'])
+        if pending['object']:
+            self._load_objects(pending['object'])
+
+    def _load_objects(self, keys):
+        """
+        Load arbitrary objects, identified by (content type ID, object ID) pairs.
+        """
+        object_ids = defaultdict(set)
+        for ct_id, object_id in keys:
+            if (ct_id, object_id) not in self._objects:
+                object_ids[ct_id].add(object_id)
+
+        for ct_id, pks in object_ids.items():
+            model = ContentType.objects.get_for_id(ct_id).model_class()
+            for obj in model.objects.filter(pk__in=pks):
+                self._objects.setdefault((ct_id, obj.pk), obj)
+
+    def _load_cables(self, pks):
+        """
+        Load Cables along with all their CableTerminations and the objects to which they terminate.
+        """
+        pks = set(pks) - set(self._cables)
+        if not pks:
+            return
+
+        for cable in Cable.objects.filter(pk__in=pks):
+            self._cables[cable.pk] = cable
+            self._cable_terminations[cable.pk] = []
+        for ct in CableTermination.objects.filter(cable_id__in=pks).order_by('cable_id', 'cable_end', 'pk'):
+            self._cable_terminations.setdefault(ct.cable_id, []).append(ct)
+            self._terminations_by_object[(ct.termination_type_id, ct.termination_id)] = ct
+
+        self._load_objects([
+            (ct.termination_type_id, ct.termination_id) for pk in pks for ct in self._cable_terminations.get(pk, [])
+        ])
+
+    def _load_wireless_links(self, pks):
+        """
+        Load WirelessLinks along with both of their Interfaces.
+        """
+        pks = set(pks) - set(self._wireless_links)
+        if not pks:
+            return
+
+        interface_ct_id = self._content_type_id(Interface)
+        interface_ids = set()
+        for link in WirelessLink.objects.filter(pk__in=pks):
+            self._wireless_links[link.pk] = link
+            interface_ids.update((link.interface_a_id, link.interface_b_id))
+
+        self._load_objects([(interface_ct_id, pk) for pk in interface_ids])
+
+    def _load_device_ports(self, device_ids):
+        """
+        Load all front and rear ports belonging to the given Devices. Each port's position in the model's default
+        ordering is recorded so that subsets of ports can be returned in the same order as a filtered query.
+        """
+        device_ids = set(device_ids) - self._devices
+        if not device_ids:
+            return
+        self._devices.update(device_ids)
+
+        for rank, rear_port in enumerate(RearPort.objects.filter(device_id__in=device_ids)):
+            self._rear_ports[rear_port.pk] = rear_port
+            self._port_ranks[(RearPort, rear_port.pk)] = rank
+        for rank, front_port in enumerate(FrontPort.objects.filter(device_id__in=device_ids)):
+            self._front_ports[front_port.rear_port_id].append(front_port)
+            self._port_ranks[(FrontPort, front_port.pk)] = rank
+
+    def _load_circuits(self, circuit_ids):
+        """
+        Load the CircuitTerminations for both sides of the given Circuits.
+        """
+        circuit_ids = set(circuit_ids) - set(self._circuits)
+        if not circuit_ids:
+            return
+
+        ct_id = self._content_type_id(CircuitTermination)
+        for circuit_id in circuit_ids:
+            self._circuits[circuit_id] = {}
+        for termination in CircuitTermination.objects.filter(circuit_id__in=circuit_ids):
+            termination = self._objects.setdefault((ct_id, termination.pk), termination)
+            self._circuits[termination.circuit_id][termination.term_side] = termination
+
+    #
+    # Persistence
+    #
+
+    def _update_origins(self, cable_paths):
+        """
+        Record a direct reference to each CablePath on its originating object(s).
+        """
+        origins = defaultdict(dict)
+        for cp in cable_paths:
+            for node in cp.path[0]:
+                ct_id, object_id = decompile_path_node(node)
+                origins[ct_id][object_id] = cp.pk
+
+        for ct_id, path_ids in origins.items():
+            model = ContentType.objects.get_for_id(ct_id).model_class()
+            path_ids = list(path_ids.items())
+            for i in range(0, len(path_ids), ORIGIN_UPDATE_BATCH_SIZE):
+                batch = path_ids[i:i + ORIGIN_UPDATE_BATCH_SIZE]
+                model.objects.filter(pk__in=[object_id for object_id, _ in batch]).update(_path=Case(
+                    *[When(pk=object_id, then=Value(path_id)) for object_id, path_id in batch]
+                ))
@@ -1,7 +1,11 @@
-import itertools
+from collections import defaultdict
+from contextlib import contextmanager
 
 from django.contrib.contenttypes.models import ContentType
 from django.db import transaction
+from django.db.models import Q
+
+from netbox.context import cablepaths_queue
 
 
 def compile_path_node(ct_id, object_id):
@@ -34,27 +38,172 @@ def path_node_to_object(repr):
 
 def create_cablepath(terminations):
     """
-    Create CablePaths for all paths originating from the specified set of nodes.
+    Create CablePaths for all paths originating from the specified set of nodes. If path tracing is currently being
+    deferred, queue the nodes for tracing instead.
 
     :param terminations: Iterable of CableTermination objects
     """
     from dcim.models import CablePath
 
+    if (queue := cablepaths_queue.get()) is not None:
+        origins = tuple((ContentType.objects.get_for_model(t).pk, t.pk) for t in terminations)
+        if origins:
+            queue['origins'][origins] = None
+        return
+
     cp = CablePath.from_origin(terminations)
     if cp:
         cp.save()
 
 
+def create_cablepaths(origin_sets):
+    """
+    Create CablePaths for many sets of originating nodes at once, tracing all paths in a single pass.
+
+    :param origin_sets: Iterable of lists of CableTermination objects
+    """
+    from dcim.tracing import CablePathTracer
+
+    return CablePathTracer().create(origin_sets)
+
+
+def get_paths_traversing(nodes):
+    """
+    Return a QuerySet of all CablePaths which traverse any of the given nodes.
+
+    :param nodes: Iterable of (content type ID, object ID) tuples
+    """
+    from dcim.models import CablePath, CablePathNode
+
+    object_ids = defaultdict(set)
+    for ct_id, object_id in nodes:
+        object_ids[ct_id].add(object_id)
+    if not object_ids:
+        return CablePath.objects.none()
+
+    query = Q()
+    for ct_id, pks in object_ids.items():
+        query |= Q(object_type_id=ct_id, object_id__in=pks)
+
+    return CablePath.objects.filter(pk__in=CablePathNode.objects.filter(query).values('path'))
+
+
 def rebuild_paths(terminations):
     """
-    Rebuild all CablePaths which traverse the specified nodes.
+    Rebuild all CablePaths which traverse the specified nodes. If path tracing is currently being deferred, queue
+    the nodes for rebuilding instead.
     """
-    from dcim.models import CablePath
+    from dcim.tracing import CablePathTracer
+
+    nodes = {(ContentType.objects.get_for_model(obj).pk, obj.pk) for obj in terminations}
+
+    if (queue := cablepaths_queue.get()) is not None:
+        queue['nodes'].update(nodes)
+        return
 
-    for obj in terminations:
-        cable_paths = CablePath.objects.filter(_nodes__contains=obj)
+    with transaction.atomic():
+        CablePathTracer().retrace(get_paths_traversing(nodes))
 
-        with transaction.atomic():
-            for cp in cable_paths:
-                cp.delete()
-                create_cablepath(cp.origins)
+
+def retrace_paths(cable_paths, exclude_origins=None):
+    """
+    Retrace the given CablePaths. If path tracing is currently being deferred, queue the paths for retracing instead.
+
+    :param cable_paths: QuerySet of CablePaths
+    :param exclude_origins: Iterable of path nodes to be removed from the paths' originating terminations (e.g.
+        because their cable has been removed)
+    """
+    from dcim.tracing import CablePathTracer
+
+    exclude_origins = set(exclude_origins or [])
+
+    if (queue := cablepaths_queue.get()) is not None:
+        for pk in cable_paths.values_list('pk', flat=True):
+            queue['paths'].add(pk)
+            if exclude_origins:
+                queue['excluded_origins'][pk].update(exclude_origins)
+        return
+
+    cable_paths = list(cable_paths)
+    if exclude_origins:
+        for cp in cable_paths:
+            _exclude_origins(cp, exclude_origins)
+    CablePathTracer().retrace(cable_paths)
+
+
+def _exclude_origins(cable_path, nodes):
+    """
+    Remove the given nodes from the originating step of a CablePath prior to retracing it.
+    """
+    if cable_path.path:
+        cable_path.path = [
+            [node for node in cable_path.path[0] if node not in nodes],
+            *cable_path.path[1:]
+        ]
+
+
+@contextmanager
+def deferred_path_tracing():
+    """
+    Defer the creation and retracing of CablePaths until the end of the enclosed block, e.g. a bulk import or deletion
+    of cables. Affected origins and paths are collected while the block executes; upon its successful completion,
+    each affected path is retraced exactly once in a single pass. If an exception is raised, queued work is discarded.
+
+    This should be entered within the transaction enclosing the bulk operation, so that paths are updated atomically
+    with it. Nested invocations defer to the outermost block.
+    """
+    if cablepaths_queue.get() is not None:
+        yield
+        return
+
+    token = cablepaths_queue.set({
+        'origins': {},
+        'nodes': set(),
+        'paths': set(),
+        'excluded_origins': defaultdict(set),
+    })
+    try:
+        yield
+        queue = cablepaths_queue.get()
+    finally:
+        cablepaths_queue.reset(token)
+
+    flush_cablepaths_queue(queue)
+
+
+def flush_cablepaths_queue(queue):
+    """
+    Process all queued CablePath work: retrace each affected path once, then trace any new paths from queued origins.
+    """
+    from dcim.models import CablePath
+    from dcim.tracing import CablePathTracer
+
+    tracer = CablePathTracer()
+
+    # Retrace all affected paths (those traversing queued nodes plus those queued directly)
+    path_ids = set(queue['paths'])
+    if queue['nodes']:
+        path_ids.update(get_paths_traversing(queue['nodes']).values_list('pk', flat=True))
+    if path_ids:
+        cable_paths = list(CablePath.objects.filter(pk__in=path_ids))
+        for cp in cable_paths:
+            if cp.pk in queue['excluded_origins']:
+                _exclude_origins(cp, queue['excluded_origins'][cp.pk])
+        tracer.retrace(cable_paths)
+
+    # Trace new paths from queued origins, omitting any objects which have since been deleted
+    if queue['origins']:
+        object_ids = defaultdict(set)
+        for origins in queue['origins']:
+            for ct_id, object_id in origins:
+                object_ids[ct_id].add(object_id)
+        objects = {}
+        for ct_id, pks in object_ids.items():
+            model = ContentType.objects.get_for_id(ct_id).model_class()
+            for obj in model.objects.filter(pk__in=pks):
+                objects[(ct_id, obj.pk)] = obj
+        origin_sets = [
+            [objects[node] for node in origins if node in objects]
+            for origins in queue['origins']
+        ]
+        tracer.create([origin_set for origin_set in origin_sets if origin_set])
@@ -1,10 +1,10 @@
 from django.utils.translation import gettext as _
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema_field
+from django.db.models import Manager
 from rest_framework.fields import Field
-from rest_framework.serializers import ValidationError
+from rest_framework.serializers import ListSerializer, ValidationError
 
-from core.models import ObjectType
 from extras.choices import CustomFieldTypeChoices
 from extras.models import CustomField
 from utilities.api import get_serializer_for_model
@@ -24,8 +24,7 @@ class CustomFieldDefaultValues:
         self.model = serializer_field.parent.Meta.model
 
         # Retrieve the CustomFields for the parent model
-        object_type = ObjectType.objects.get_for_model(self.model)
-        fields = CustomField.objects.filter(object_types=object_type)
+        fields = CustomField.objects.get_for_model(self.model)
 
         # Populate the default value for each CustomField
         value = {}
@@ -46,13 +45,31 @@ class CustomFieldsDataField(Field):
         Cache CustomFields assigned to this model to avoid redundant database queries
         """
         if not hasattr(self, '_custom_fields'):
-            object_type = ObjectType.objects.get_for_model(self.parent.Meta.model)
-            self._custom_fields = CustomField.objects.filter(object_types=object_type)
+            self._custom_fields = CustomField.objects.get_for_model(self.parent.Meta.model)
         return self._custom_fields
 
+    def _prefetch_related_objects(self):
+        """
+        When serializing a list of objects, retrieve the objects referenced by object and multi-object custom fields
+        for the entire list at once (rather than for each object individually).
+        """
+        self._related_objects_prefetched = True
+        list_serializer = getattr(self.parent, 'parent', None)
+        if not isinstance(list_serializer, ListSerializer) or list_serializer.instance is None:
+            return
+        instances = list_serializer.instance
+        if isinstance(instances, Manager):
+            instances = instances.all()
+        CustomField.prefetch_related_objects(
+            self._get_custom_fields(),
+            [getattr(instance, self.source, None) or {} for instance in instances]
+        )
+
     def to_representation(self, obj):
         # TODO: Fix circular import
         from utilities.api import get_serializer_for_model
+        if not getattr(self, '_related_objects_prefetched', False):
+            self._prefetch_related_objects()
         data = {}
         for cf in self._get_custom_fields():
             value = cf.deserialize(obj.get(cf.name))
@@ -1,10 +1,17 @@
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
 from jinja2.exceptions import TemplateError
 from rest_framework.decorators import action
 from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.status import HTTP_400_BAD_REQUEST
 
+from extras.config_contexts import get_config_context_data
 from netbox.api.renderers import TextRenderer
+from utilities.data import deepmerge
+from utilities.streaming import coalesce_chunks
 from .serializers import ConfigTemplateSerializer
 
 __all__ = (
@@ -13,12 +20,16 @@ __all__ = (
     'RenderConfigMixin',
 )
 
+# Number of objects to retrieve at a time when streaming rendered config contexts
+CONFIG_CONTEXTS_CHUNK_SIZE = 1000
+
 
 class ConfigContextQuerySetMixin:
     """
     Used by views that work with config context models (device and virtual machine).
     Provides a get_queryset() method which deals with adding the config context
-    data annotation or not.
+    data annotation or not, and a /config-contexts/ endpoint for the bulk retrieval
+    of rendered config contexts.
     """
     def get_queryset(self):
         """
@@ -35,6 +46,39 @@ class ConfigContextQuerySetMixin:
             return queryset
         return queryset.annotate_config_context_data()
 
+    @action(detail=False, methods=['get'], url_path='config-contexts')
+    def config_contexts(self, request):
+        """
+        Stream the rendered config context of every object matching the specified filters as a JSON list. Contexts are
+        retrieved from the cache where possible.
+        """
+        queryset = self.filter_queryset(self.queryset).select_related(
+            'site', 'tenant', 'cluster'
+        ).prefetch_related('tags').order_by('pk')
+
+        def iter_objects():
+            # Retrieve objects in chunks, so that their config context data can be retrieved from the cache collectively
+            objects = []
+            for obj in queryset.iterator(chunk_size=CONFIG_CONTEXTS_CHUNK_SIZE):
+                objects.append(obj)
+                if len(objects) >= CONFIG_CONTEXTS_CHUNK_SIZE:
+                    yield from zip(objects, get_config_context_data(objects))
+                    objects = []
+            if objects:
+                yield from zip(objects, get_config_context_data(objects))
+
+        def iter_content():
+            yield '['
+            for i, (obj, data) in enumerate(iter_objects()):
+                if obj.local_context_data:
+                    data = deepmerge(data, obj.local_context_data)
+                if i:
+                    yield ','
+                yield json.dumps({'id': obj.pk, 'name': obj.name, 'config_context': data}, cls=DjangoJSONEncoder)
+            yield ']'
+
+        return StreamingHttpResponse(coalesce_chunks(iter_content()), content_type='application/json')
+
 
 class ConfigTemplateRenderMixin:
     """
@@ -0,0 +1,78 @@
+from functools import partial
+
+from django.db import connection, transaction
+
+from .models import ObjectChange
+
+__all__ = (
+    'enqueue_objectchange',
+    'flush_objectchanges',
+    'get_committed_objectchanges',
+    'get_queued_objectchange',
+    'new_objectchanges_queue',
+)
+
+# Maximum number of ObjectChange records to create per INSERT query
+OBJECTCHANGE_BATCH_SIZE = 500
+
+
+def get_objectchange_key(instance):
+    return f'{instance._meta.app_label}.{instance._meta.model_name}:{instance.pk}'
+
+
+def new_objectchanges_queue():
+    """
+    Return an empty queue of ObjectChange records. The queue comprises an ordered list of all changes, a mapping of
+    each changed object to its most recent change, and the IDs of changes made within a transaction which has not
+    (yet) been committed.
+    """
+    return {'changes': [], 'latest': {}, 'uncommitted': set()}
+
+
+def enqueue_objectchange(queue, instance, objectchange):
+    """
+    Queue an ObjectChange record representing a change to the given instance, to be written to the database once the
+    request has completed. If the change is made within a transaction, the record is written only if that transaction
+    is committed.
+    """
+    queue['changes'].append(objectchange)
+    queue['latest'][get_objectchange_key(instance)] = objectchange
+
+    if connection.in_atomic_block:
+        queue['uncommitted'].add(id(objectchange))
+        transaction.on_commit(partial(queue['uncommitted'].discard, id(objectchange)))
+
+
+def get_queued_objectchange(queue, instance):
+    """
+    Return the most recent ObjectChange queued for the given instance (if any).
+    """
+    return queue['latest'].get(get_objectchange_key(instance))
+
+
+def get_committed_objectchanges(queue):
+    """
+    Return all queued ObjectChange records which are to be written to the database, omitting those made within a
+    transaction which has since been rolled back.
+    """
+    if connection.in_atomic_block:
+        # The enclosing transaction remains open: Records written now will be committed or rolled back along with it.
+        return queue['changes']
+
+    return [
+        objectchange for objectchange in queue['changes'] if id(objectchange) not in queue['uncommitted']
+    ]
+
+
+def flush_objectchanges(changes):
+    """
+    Write all queued ObjectChange records to the database.
+    """
+    for objectchange in changes:
+        # Replicate ObjectChange.save(), which is bypassed by bulk_create()
+        if not objectchange.user_name:
+            objectchange.user_name = objectchange.user.username
+        if not objectchange.object_repr:
+            objectchange.object_repr = str(objectchange.changed_object)
+
+    ObjectChange.objects.bulk_create(changes, batch_size=OBJECTCHANGE_BATCH_SIZE)
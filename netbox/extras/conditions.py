@@ -12,6 +12,13 @@ AND = 'and'
 OR = 'or'
 
 
+def _get(obj, key):
+    if isinstance(obj, list):
+        return [dict.get(i, key) for i in obj]
+
+    return dict.get(obj, key)
+
+
 def is_ruleset(data):
     """
     Determine whether the given dictionary looks like a rule set.
@@ -64,18 +71,20 @@ class Condition:
         self.eval_func = getattr(self, f'eval_{op}')
         self.negate = negate
 
+        # Precompile the attribute path and any regular expression, as a Condition may be evaluated many times
+        self.attr_path = attr.split('.')
+        if op == self.REGEX:
+            try:
+                self.regex = re.compile(value)
+            except re.error as e:
+                raise ValueError(_("Invalid regular expression: {error}").format(error=e))
+
     def eval(self, data):
         """
         Evaluate the provided data to determine whether it matches the condition.
         """
-        def _get(obj, key):
-            if isinstance(obj, list):
-                return [dict.get(i, key) for i in obj]
-
-            return dict.get(obj, key)
-
         try:
-            value = functools.reduce(_get, self.attr.split('.'), data)
+            value = functools.reduce(_get, self.attr_path, data)
         except TypeError:
             # Invalid key path
             value = None
@@ -118,7 +127,7 @@ class Condition:
     # Regular expressions
 
     def eval_regex(self, value):
-        return re.match(self.value, value) is not None
+        return self.regex.match(value) is not None
 
 
 class ConditionSet:
@@ -0,0 +1,86 @@
+import hashlib
+
+from django.core.cache import cache
+
+from utilities.caching import VersionedCache
+from utilities.data import deepmerge
+
+__all__ = (
+    'config_contexts_cache',
+    'get_config_context_data',
+)
+
+# Compiled config context data, cached by all processes
+config_contexts_cache = VersionedCache('config_contexts_version')
+
+# Number of seconds for which compiled config context data is cached
+CONFIG_CONTEXT_CACHE_TIMEOUT = 86400
+
+
+def get_config_context_key(obj, version):
+    """
+    Return the cache key for the config context data applicable to a Device or VirtualMachine. The key is derived from
+    each of the object's attributes which determine the applicable ConfigContexts, such that objects having identical
+    attributes share a cache entry, and a change to any of these attributes does not require invalidation.
+    """
+    site = obj.site
+    tenant = obj.tenant
+    cluster = obj.cluster
+    attrs = (
+        obj._meta.label_lower,
+        obj.role_id,
+        obj.platform_id,
+        obj.site_id,
+        getattr(site, 'region_id', None),
+        getattr(site, 'group_id', None),
+        getattr(obj, 'location_id', None),
+        getattr(obj, 'device_type_id', None),
+        obj.cluster_id,
+        getattr(cluster, 'type_id', None),
+        getattr(cluster, 'group_id', None),
+        obj.tenant_id,
+        getattr(tenant, 'group_id', None),
+        sorted(tag.pk for tag in obj.tags.all()),
+    )
+    digest = hashlib.sha256(repr(attrs).encode()).hexdigest()
+
+    return f'config_context_{version}_{digest}'
+
+
+def compile_config_context_data(obj):
+    """
+    Merge the data of all ConfigContexts applicable to an object (excluding its local context data).
+    """
+    from extras.models import ConfigContext
+
+    data = {}
+    for context in ConfigContext.objects.get_for_object(obj, aggregate_data=True) or []:
+        data = deepmerge(data, context)
+
+    return data
+
+
+def get_config_context_data(objects):
+    """
+    Return a list of the merged ConfigContext data (excluding local context data) applicable to each of the given
+    Devices or VirtualMachines, in order. Data is retrieved from the cache where possible, and otherwise compiled once
+    for each distinct combination of attributes and cached. Objects should be retrieved with their site, tenant, and
+    cluster selected and their tags prefetched, to avoid querying for each object individually.
+
+    Note that the same dictionary may be returned for multiple objects: it must not be modified.
+    """
+    if (version := config_contexts_cache.get_version()) is None:
+        return [compile_config_context_data(obj) for obj in objects]
+
+    keys = [get_config_context_key(obj, version) for obj in objects]
+
+    contexts = cache.get_many(set(keys))
+    missing = {}
+    for obj, key in zip(objects, keys):
+        if key not in contexts and key not in missing:
+            missing[key] = compile_config_context_data(obj)
+    if missing:
+        cache.set_many(missing, CONFIG_CONTEXT_CACHE_TIMEOUT)
+        contexts.update(missing)
+
+    return [contexts[key] for key in keys]
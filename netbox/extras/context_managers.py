@@ -1,26 +1,46 @@
+from collections import defaultdict
 from contextlib import contextmanager
 
-from netbox.context import current_request, events_queue
+from django.conf import settings
+
+from netbox.context import current_request, events_queue, objectchanges_queue, search_queue
+from netbox.search.backends import flush_search_queue
+from .changelog import flush_objectchanges, get_committed_objectchanges, new_objectchanges_queue
 from .events import flush_events
 
 
 @contextmanager
 def event_tracking(request):
     """
-    Queue interesting events in memory while processing a request, then flush that queue for processing by the
-    events pipline before returning the response.
+    Queue interesting events and change records in memory while processing a request, then flush those queues (writing
+    change records to the database, and sending events to the events pipeline) before returning the response. If
+    SEARCH_CACHE_ASYNC is enabled, changed objects are also queued to have their cached search values updated by a
+    background worker.
 
     :param request: WSGIRequest object with a unique `id` set
     """
     current_request.set(request)
     events_queue.set({})
+    objectchanges_queue.set(new_objectchanges_queue())
+    if settings.SEARCH_CACHE_ASYNC:
+        search_queue.set(defaultdict(set))
 
     yield
 
+    # Record all queued changes which have been committed
+    if changes := get_committed_objectchanges(objectchanges_queue.get()):
+        flush_objectchanges(changes)
+
     # Flush queued webhooks to RQ
     if events := list(events_queue.get().values()):
         flush_events(events)
 
+    # Enqueue the updating of the search cache for all changed objects
+    if queue := search_queue.get():
+        flush_search_queue(queue)
+
     # Clear context vars
     current_request.set(None)
     events_queue.set({})
+    objectchanges_queue.set(None)
+    search_queue.set(None)
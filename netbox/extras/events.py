@@ -1,3 +1,7 @@
+import copy
+import logging
+from collections import defaultdict
+
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
@@ -10,14 +14,85 @@ from core.models import Job
 from netbox.config import get_config
 from netbox.constants import RQ_QUEUE_DEFAULT
 from netbox.registry import registry
-from utilities.api import get_serializer_for_model
+from utilities.api import get_prefetches_for_serializer, get_serializer_for_model
+from utilities.caching import VersionedCache
 from utilities.rqworker import get_rq_retry
 from utilities.serialization import serialize_object
 from .choices import *
+from .constants import *
 from .models import EventRule
 
 logger = logging.getLogger('netbox.events_processor')
 
+# The events pipeline which processes EventRules
+DEFAULT_EVENTS_PIPELINE = 'extras.events.process_event_queue'
+
+# Maximum number of webhook payloads to be delivered by a single background task
+WEBHOOK_JOB_MAX_PAYLOADS = 1000
+
+# Mapping of each type of event to the EventRule field which enables it
+EVENT_RULE_TYPE_FIELDS = {
+    EVENT_CREATE: 'type_create',
+    EVENT_UPDATE: 'type_update',
+    EVENT_DELETE: 'type_delete',
+    EVENT_JOB_START: 'type_job_start',
+    EVENT_JOB_END: 'type_job_end',
+}
+
+# Enabled EventRules held in memory by each process, indexed by object type ID and event type
+event_rules_cache = VersionedCache('event_rules_version')
+
+
+def load_event_rules():
+    """
+    Retrieve all enabled EventRules from the database and compile their conditions. Return a dictionary mapping each
+    (object type ID, event type) to a list of the applicable EventRules.
+    """
+    event_rules = {
+        event_rule.pk: event_rule for event_rule in EventRule.objects.filter(enabled=True)
+    }
+    for event_rule in event_rules.values():
+        try:
+            event_rule.condition_set
+        except ValueError:
+            # Invalid conditions will raise an exception when the rule is evaluated
+            pass
+
+    object_types = EventRule.object_types.through.objects.filter(
+        eventrule__enabled=True
+    ).values_list('eventrule_id', 'objecttype_id')
+    object_types_map = defaultdict(list)
+    for event_rule_id, object_type_id in object_types:
+        object_types_map[event_rule_id].append(object_type_id)
+
+    rules = defaultdict(list)
+    for event_rule in event_rules.values():
+        for event_type, field_name in EVENT_RULE_TYPE_FIELDS.items():
+            if getattr(event_rule, field_name):
+                for object_type_id in object_types_map[event_rule.pk]:
+                    rules[(object_type_id, event_type)].append(event_rule)
+
+    return dict(rules)
+
+
+def get_event_rules(object_type, event_type):
+    """
+    Return a list of the enabled EventRules which apply to the given type of event for the specified object type.
+    EventRules are retained in memory by each process until invalidated by a change to any EventRule. A copy of each
+    EventRule is returned, so that any related objects cached on it (such as its action object) are not retained.
+    """
+    if (version := event_rules_cache.get_version()) is None:
+        rules = load_event_rules()
+    else:
+        local_data = event_rules_cache.get_local_data(version)
+        if 'rules' not in local_data:
+            local_data['rules'] = load_event_rules()
+        rules = local_data['rules']
+
+    return [
+        copy.copy(event_rule) for event_rule in rules.get((object_type.pk, event_type), [])
+    ]
+
 
 def serialize_for_event(instance):
     """
@@ -47,10 +122,49 @@ def get_snapshots(instance, action):
     return snapshots
 
 
+class QueuedEvent(dict):
+    """
+    A dictionary representing an event queued for processing once the request has completed. The serialized
+    representation of the object (`data`) and its pre- & post-change snapshots (`snapshots`) are not generated until
+    either is first accessed, so that an object is serialized only once per request, and only if necessary. (Events
+    passed to any events pipeline other than the default are always serialized beforehand.)
+
+    :param instance: The object to which the event pertains
+    :param action: The action most recently performed on the object
+    """
+    def __init__(self, instance, action, **kwargs):
+        super().__init__(**kwargs)
+        self.instance = instance
+        self.action = action
+        self.prechange_snapshot = getattr(instance, '_prechange_snapshot', None)
+
+    def __missing__(self, key):
+        if key not in ('data', 'snapshots'):
+            raise KeyError(key)
+        self.serialize()
+        return self[key]
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def serialize(self):
+        """
+        Generate the serialized representation and snapshots of the object in its current state.
+        """
+        self['data'] = serialize_for_event(self.instance)
+        self['snapshots'] = {
+            'prechange': self.prechange_snapshot,
+            'postchange': get_snapshots(self.instance, self.action)['postchange'],
+        }
+
+
 def enqueue_object(queue, instance, user, request_id, action):
     """
-    Enqueue a serialized representation of a created/updated/deleted object for the processing of
-    events once the request has completed.
+    Enqueue a created/updated/deleted object for the processing of events once the request has completed. The object
+    is not serialized until the queue is processed, except where it is being deleted and its event may be acted upon.
     """
     # Determine whether this type of object supports event rules
     app_label = instance._meta.app_label
@@ -61,26 +175,96 @@ def enqueue_object(queue, instance, user, request_id, action):
     assert instance.pk is not None
     key = f'{app_label}.{model_name}:{instance.pk}'
     if key in queue:
-        queue[key]['data'] = serialize_for_event(instance)
-        queue[key]['snapshots']['postchange'] = get_snapshots(instance, action)['postchange']
+        queue[key].instance = instance
+        queue[key].action = action
     else:
-        queue[key] = {
-            'content_type': ContentType.objects.get_for_model(instance),
-            'object_id': instance.pk,
-            'event': action,
-            'data': serialize_for_event(instance),
-            'snapshots': get_snapshots(instance, action),
-            'username': user.username,
-            'request_id': request_id
-        }
+        queue[key] = QueuedEvent(
+            instance,
+            action,
+            content_type=ContentType.objects.get_for_model(instance),
+            object_id=instance.pk,
+            event=action,
+            username=user.username,
+            request_id=request_id
+        )
 
+    # A deleted object must be serialized prior to its removal from the database
+    if action == ObjectChangeActionChoices.ACTION_DELETE and event_has_consumers(queue[key]):
+        queue[key].serialize()
+
+
+def has_custom_events_pipeline():
+    """
+    Return True if any events pipeline other than the default has been configured.
+    """
+    return any(name != DEFAULT_EVENTS_PIPELINE for name in settings.EVENTS_PIPELINE)
+
+
+def event_has_consumers(event):
+    """
+    Return True if the given queued event may be acted upon: i.e. if any enabled EventRule applies to it, or if any
+    events pipeline other than the default has been configured.
+    """
+    if has_custom_events_pipeline():
+        return True
+    return bool(get_event_rules(event['content_type'], event['event']))
+
+
+def refresh_event_objects(events):
+    """
+    Replace the objects referenced by any queued events which have not yet been serialized with their current state,
+    retrieved from the database in bulk along with any related objects required for serialization.
+    """
+    events_by_type = defaultdict(list)
+    for event in events:
+        if isinstance(event, QueuedEvent) and 'data' not in event:
+            events_by_type[event['content_type']].append(event)
+
+    for content_type, type_events in events_by_type.items():
+        model = content_type.model_class()
+        queryset = model.objects.filter(pk__in=[event['object_id'] for event in type_events])
+        if prefetch := get_prefetches_for_serializer(get_serializer_for_model(model)):
+            queryset = queryset.prefetch_related(*prefetch)
+        objects = queryset.in_bulk()
+        for event in type_events:
+            if instance := objects.get(event['object_id']):
+                event.instance = instance
+
+
+def serialize_events(events):
+    """
+    Serialize all queued events which have not yet been serialized, retrieving their objects from the database in bulk.
+    """
+    refresh_event_objects(events)
+    for event in events:
+        if isinstance(event, QueuedEvent) and 'data' not in event:
+            event.serialize()
 
-def process_event_rules(event_rules, model_name, event, data, username=None, snapshots=None, request_id=None):
-    if username:
-        user = get_user_model().objects.get(username=username)
-    else:
-        user = None
 
+def enqueue_webhooks(event_rule, payloads):
+    """
+    Enqueue background tasks to deliver a list of webhook payloads for an EventRule. Payloads are divided among tasks
+    of no more than WEBHOOK_JOB_MAX_PAYLOADS each.
+    """
+    queue_name = get_config().QUEUE_MAPPINGS.get('webhook', RQ_QUEUE_DEFAULT)
+    rq_queue = get_queue(queue_name)
+
+    for i in range(0, len(payloads), WEBHOOK_JOB_MAX_PAYLOADS):
+        rq_queue.enqueue(
+            "extras.webhooks.send_webhooks",
+            event_rule=event_rule,
+            payloads=payloads[i:i + WEBHOOK_JOB_MAX_PAYLOADS],
+            retry=get_rq_retry()
+        )
+
+
+def process_event_rules(event_rules, model_name, event, data, username=None, snapshots=None, request_id=None,
+                        webhooks_queue=None):
+    """
+    Process the given EventRules for an event. Webhook payloads are appended to `webhooks_queue` (a mapping of
+    EventRules to lists of payloads) if one is provided, to be enqueued collectively; otherwise, they are enqueued
+    immediately.
+    """
     for event_rule in event_rules:
 
         # Evaluate event rule conditions (if any)
@@ -90,36 +274,27 @@ def process_event_rules(event_rules, model_name, event, data, username=None, sna
         # Webhooks
         if event_rule.action_type == EventRuleActionChoices.WEBHOOK:
 
-            # Select the appropriate RQ queue
-            queue_name = get_config().QUEUE_MAPPINGS.get('webhook', RQ_QUEUE_DEFAULT)
-            rq_queue = get_queue(queue_name)
-
-            # Compile the task parameters
-            params = {
-                "event_rule": event_rule,
+            # Compile the webhook payload
+            payload = {
                 "model_name": model_name,
                 "event": event,
                 "data": data,
                 "snapshots": snapshots,
                 "timestamp": timezone.now().isoformat(),
                 "username": username,
-                "retry": get_rq_retry()
+                "request_id": request_id,
             }
-            if snapshots:
-                params["snapshots"] = snapshots
-            if request_id:
-                params["request_id"] = request_id
-
-            # Enqueue the task
-            rq_queue.enqueue(
-                "extras.webhooks.send_webhook",
-                **params
-            )
+
+            if webhooks_queue is not None:
+                webhooks_queue.setdefault(event_rule, []).append(payload)
+            else:
+                enqueue_webhooks(event_rule, [payload])
 
         # Scripts
         elif event_rule.action_type == EventRuleActionChoices.SCRIPT:
             # Resolve the script from action parameters
             script = event_rule.action_object.python_class()
+            user = get_user_model().objects.get(username=username) if username else None
 
             # Enqueue a Job to record the script's execution
             Job.enqueue(
@@ -140,40 +315,42 @@ def process_event_queue(events):
     """
     Flush a list of object representation to RQ for EventRule processing.
     """
-    events_cache = {
-        'type_create': {},
-        'type_update': {},
-        'type_delete': {},
-    }
+    events_cache = {}
+    webhooks_queue = {}
 
+    # Determine the EventRules applicable to each event, disregarding any events to which none apply
+    pending_events = []
     for data in events:
-        action_flag = {
-            ObjectChangeActionChoices.ACTION_CREATE: 'type_create',
-            ObjectChangeActionChoices.ACTION_UPDATE: 'type_update',
-            ObjectChangeActionChoices.ACTION_DELETE: 'type_delete',
-        }[data['event']]
-        content_type = data['content_type']
-
-        # Cache applicable Event Rules
-        if content_type not in events_cache[action_flag]:
-            events_cache[action_flag][content_type] = EventRule.objects.filter(
-                **{action_flag: True},
-                object_types=content_type,
-                enabled=True
-            )
-        event_rules = events_cache[action_flag][content_type]
+        cache_key = (data['content_type'], data['event'])
+        if cache_key not in events_cache:
+            events_cache[cache_key] = get_event_rules(*cache_key)
+        if event_rules := events_cache[cache_key]:
+            pending_events.append((data, event_rules))
+
+    # Retrieve in bulk all objects which have yet to be serialized
+    refresh_event_objects([data for data, event_rules in pending_events])
 
+    for data, event_rules in pending_events:
         process_event_rules(
-            event_rules, content_type.model, data['event'], data['data'], data['username'],
-            snapshots=data['snapshots'], request_id=data['request_id']
+            event_rules, data['content_type'].model, data['event'], data['data'], data['username'],
+            snapshots=data['snapshots'], request_id=data['request_id'], webhooks_queue=webhooks_queue
         )
 
+    # Enqueue the webhook payloads collected for each EventRule
+    for event_rule, payloads in webhooks_queue.items():
+        enqueue_webhooks(event_rule, payloads)
+
 
 def flush_events(events):
     """
     Flush a list of object representations to RQ for event processing.
     """
     if events:
+        # Other events pipelines may access each event in any manner (e.g. by copying it), so ensure that all events
+        # have been serialized
+        if has_custom_events_pipeline():
+            serialize_events(events)
+
         for name in settings.EVENTS_PIPELINE:
             try:
                 func = import_string(name)
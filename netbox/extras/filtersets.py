@@ -72,8 +72,8 @@ class WebhookFilterSet(NetBoxModelFilterSet):
     class Meta:
         model = Webhook
         fields = (
-            'id', 'name', 'payload_url', 'http_method', 'http_content_type', 'secret', 'ssl_verification',
-            'ca_file_path', 'description',
+            'id', 'name', 'payload_url', 'http_method', 'http_content_type', 'secret', 'batch_size',
+            'ssl_verification', 'ca_file_path', 'description',
         )
 
     def search(self, queryset, name, value):
@@ -202,6 +202,11 @@ class WebhookBulkEditForm(NetBoxModelBulkEditForm):
         label=_('Secret'),
         required=False
     )
+    batch_size = forms.IntegerField(
+        label=_('Batch size'),
+        min_value=1,
+        required=False
+    )
     ca_file_path = forms.CharField(
         required=False,
         label=_('CA file path')
@@ -1,4 +1,4 @@
-from django.db.models import CharField, TextField, Lookup
+from django.db.models import CharField, TextField, Lookup, lookups
 from .fields import CachedValueField
 
 
@@ -30,5 +30,36 @@ class NetContainsOrEquals(Lookup):
         return 'CAST(%s AS INET) >>= %s' % (lhs, rhs), params
 
 
+class ILikeMixin:
+    """
+    Perform a case-insensitive match on PostgreSQL using the ILIKE operator, rather than by comparing upper-cased
+    values. This allows the match to be served by a trigram (pg_trgm) index on the column.
+    """
+    def as_postgresql(self, compiler, connection):
+        lhs, lhs_params = Lookup.process_lhs(self, compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} ILIKE {rhs}', (*lhs_params, *rhs_params)
+
+
+class IExact(ILikeMixin, lookups.IExact):
+    pass
+
+
+class IContains(ILikeMixin, lookups.IContains):
+    pass
+
+
+class IStartsWith(ILikeMixin, lookups.IStartsWith):
+    pass
+
+
+class IEndsWith(ILikeMixin, lookups.IEndsWith):
+    pass
+
+
 CharField.register_lookup(Empty)
 CachedValueField.register_lookup(NetContainsOrEquals)
+CachedValueField.register_lookup(IExact)
+CachedValueField.register_lookup(IContains)
+CachedValueField.register_lookup(IStartsWith)
+CachedValueField.register_lookup(IEndsWith)
@@ -11,6 +11,7 @@ from packaging import version
 
 from core.models import Job
 from extras.models import ObjectChange
+from netbox.authentication.cache import flush_token_last_used
 from netbox.config import Config
 
 
@@ -91,6 +92,17 @@ class Command(BaseCommand):
                 f"\tSkipping: No retention period specified (JOB_RETENTION = {config.JOB_RETENTION})"
             )
 
+        # Record the last use of API tokens
+        if options['verbosity']:
+            self.stdout.write("[*] Updating API token last used times")
+        if config.MAINTENANCE_MODE:
+            if options['verbosity']:
+                self.stdout.write("\tSkipping: Maintenance mode is enabled")
+        else:
+            updated_tokens = flush_token_last_used()
+            if options['verbosity']:
+                self.stdout.write(f"\tUpdated {updated_tokens} tokens.", self.style.SUCCESS)
+
         # Check for new releases (if enabled)
         if options['verbosity']:
             self.stdout.write("[*] Checking for latest release")
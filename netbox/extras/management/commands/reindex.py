@@ -1,10 +1,34 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.apps import apps
 from django.contrib.contenttypes.models import ContentType
 from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
 from django.utils.translation import gettext as _
 
 from netbox.registry import registry
+from netbox.search import get_indexer
 from netbox.search.backends import search_backend
 
+# Default maximum number of objects to be reindexed by each task
+DEFAULT_BATCH_SIZE = 10000
+
+
+def reindex_objects(model_label, first_pk=None, last_pk=None, object_ids=None):
+    """
+    Cache the objects of the specified model having primary keys within the given range (for a full reindex), or
+    refresh the specified objects (for an incremental reindex). Returns the model label and the number of entries
+    cached.
+    """
+    model = apps.get_model(model_label)
+    if object_ids is not None:
+        return model_label, search_backend.refresh(model, object_ids)
+
+    indexer = get_indexer(model)
+    queryset = indexer.get_queryset().filter(pk__gte=first_pk, pk__lte=last_pk)
+    return model_label, search_backend.cache(queryset.iterator(), indexer=indexer, remove_existing=False)
+
 
 class Command(BaseCommand):
     help = 'Reindex objects for search'
@@ -21,6 +45,23 @@ class Command(BaseCommand):
             action='store_true',
             help="For each model, reindex objects only if no cache entries already exist"
         )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help="Reindex only objects which have been updated (or deleted) since they were last cached"
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help="Number of worker processes among which to divide reindexing"
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Maximum number of objects to reindex in each batch"
+        )
 
     def _get_indexers(self, *model_names):
         indexers = {}
@@ -58,7 +99,49 @@ class Command(BaseCommand):
 
         return indexers
 
+    def _get_tasks(self, model, batch_size, incremental=False):
+        """
+        Divide the reindexing of a model into tasks of up to batch_size objects each. Returns a list of keyword
+        argument dictionaries to be passed to reindex_objects().
+        """
+        model_label = model._meta.label_lower
+
+        # Refresh only objects whose cached values are stale
+        if incremental:
+            object_ids = search_backend.get_stale_objects(model)
+            return [
+                {'model_label': model_label, 'object_ids': object_ids[i:i + batch_size]}
+                for i in range(0, len(object_ids), batch_size)
+            ]
+
+        # Divide all objects into contiguous ranges of primary keys
+        pks = list(model.objects.order_by('pk').values_list('pk', flat=True))
+        return [
+            {'model_label': model_label, 'first_pk': pks[i], 'last_pk': pks[min(i + batch_size, len(pks)) - 1]}
+            for i in range(0, len(pks), batch_size)
+        ]
+
+    def _run_tasks(self, tasks, workers):
+        """
+        Execute reindexing tasks, yielding the model label and number of entries cached by each as it completes.
+        """
+        if workers <= 1:
+            for task in tasks:
+                yield reindex_objects(**task)
+            return
+
+        # Close all database connections prior to forking, so that each worker process opens its own
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork')) as executor:
+            futures = [executor.submit(reindex_objects, **task) for task in tasks]
+            for future in as_completed(futures):
+                yield future.result()
+
     def handle(self, *model_labels, **kwargs):
+        if kwargs['lazy'] and kwargs['incremental']:
+            raise CommandError(_("The --lazy and --incremental options cannot be used together."))
+        if kwargs['workers'] < 1 or kwargs['batch_size'] < 1:
+            raise CommandError(_("The number of workers and batch size must be positive integers."))
 
         # Determine which models to reindex
         indexers = self._get_indexers(*model_labels)
@@ -66,32 +149,42 @@ class Command(BaseCommand):
             raise CommandError(_("No indexers found!"))
         self.stdout.write(f'Reindexing {len(indexers)} models.')
 
-        # Clear all cached values for the specified models (if not being lazy)
-        if not kwargs['lazy']:
+        # Clear all cached values (if performing a full reindex)
+        if not kwargs['lazy'] and not kwargs['incremental']:
             self.stdout.write('Clearing cached values... ', ending='')
             self.stdout.flush()
             deleted_count = search_backend.clear()
             self.stdout.write(f'{deleted_count} entries deleted.')
 
-        # Index models
-        self.stdout.write('Indexing models')
-        for model, idx in indexers.items():
-            app_label = model._meta.app_label
-            model_name = model._meta.model_name
-            self.stdout.write(f'  {app_label}.{model_name}... ', ending='')
-            self.stdout.flush()
+        # Divide the work for each model into tasks
+        self.stdout.write('Preparing tasks')
+        tasks = []
+        pending = {}
+        for model in indexers:
+            model_label = model._meta.label_lower
 
             if kwargs['lazy']:
                 content_type = ContentType.objects.get_for_model(model)
                 if cached_count := search_backend.count(object_types=[content_type]):
-                    self.stdout.write(f'Skipping (found {cached_count} existing).')
+                    self.stdout.write(f'  {model_label}... Skipping (found {cached_count} existing).')
                     continue
 
-            i = search_backend.cache(model.objects.iterator(), remove_existing=False)
-            if i:
-                self.stdout.write(f'{i} entries cached.')
-            else:
-                self.stdout.write(f'No objects found.')
+            model_tasks = self._get_tasks(model, kwargs['batch_size'], incremental=kwargs['incremental'])
+            if not model_tasks:
+                self.stdout.write(f'  {model_label}... No objects found.')
+                continue
+            tasks.extend(model_tasks)
+            pending[model_label] = len(model_tasks)
+        self.stdout.write(f'  {len(tasks)} tasks prepared.')
+
+        # Index models, reporting on each model once all of its tasks have completed
+        self.stdout.write(f'Indexing models ({kwargs["workers"]} workers)')
+        counts = {model_label: 0 for model_label in pending}
+        for model_label, count in self._run_tasks(tasks, kwargs['workers']):
+            counts[model_label] += count
+            pending[model_label] -= 1
+            if not pending[model_label]:
+                self.stdout.write(f'  {model_label}... {counts[model_label]} entries cached.')
 
         msg = f'Completed.'
         if total_count := search_backend.size:
@@ -0,0 +1,41 @@
+from django.db import DatabaseError, migrations, transaction
+
+
+def create_trigram_index(apps, schema_editor):
+    """
+    Create a trigram index on CachedValue.value (to accelerate partial and case-insensitive searches), if the pg_trgm
+    extension is available and can be installed.
+    """
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            return
+        try:
+            with transaction.atomic(using=schema_editor.connection.alias):
+                cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        except DatabaseError:
+            # The database user lacks permission to install the extension
+            return
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS extras_cachedvalue_value_trgm "
+            "ON extras_cachedvalue USING gin (value gin_trgm_ops)"
+        )
+
+
+def drop_trigram_index(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("DROP INDEX IF EXISTS extras_cachedvalue_value_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('extras', '0116_webhook_batch_size'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            code=create_trigram_index,
+            reverse_code=drop_trigram_index
+        ),
+    ]
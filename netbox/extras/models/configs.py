@@ -1,3 +1,5 @@
+import copy
+
 from django.apps import apps
 from django.conf import settings
 from django.core.validators import ValidationError
@@ -7,6 +9,7 @@ from django.utils.translation import gettext_lazy as _
 from jinja2.loaders import BaseLoader
 from jinja2.sandbox import SandboxedEnvironment
 
+from extras.config_contexts import get_config_context_data
 from extras.querysets import ConfigContextQuerySet
 from netbox.config import get_config
 from netbox.models import ChangeLoggedModel
@@ -178,17 +181,15 @@ class ConfigContextModel(models.Model):
         Compile all config data, overwriting lower-weight values with higher-weight values where a collision occurs.
         Return the rendered configuration context for a device or VM.
         """
-        data = {}
-
         if not hasattr(self, 'config_context_data'):
-            # The annotation is not available, so we fall back to manually querying for the config context objects
-            config_context_data = ConfigContext.objects.get_for_object(self, aggregate_data=True) or []
+            # The annotation is not available, so we fall back to the cached config context data (compiling it if
+            # necessary). A copy is made, as the cached data may be shared with other objects.
+            data = copy.deepcopy(get_config_context_data([self])[0])
         else:
             # The attribute may exist, but the annotated value could be None if there is no config context data
-            config_context_data = self.config_context_data or []
-
-        for context in config_context_data:
-            data = deepmerge(data, context)
+            data = {}
+            for context in self.config_context_data or []:
+                data = deepmerge(data, context)
 
         # If the object has local config context data defined, merge it last
         if self.local_context_data:
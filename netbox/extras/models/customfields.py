@@ -1,6 +1,8 @@
+import copy
 import decimal
 import json
 import re
+from collections import defaultdict
 from datetime import datetime, date
 
 import django_filters
@@ -21,6 +23,7 @@ from netbox.models import ChangeLoggedModel
 from netbox.models.features import CloningMixin, ExportTemplatesMixin
 from netbox.search import FieldTypes
 from utilities import filters
+from utilities.caching import VersionedCache
 from utilities.forms.fields import (
     CSVChoiceField, CSVModelChoiceField, CSVModelMultipleChoiceField, CSVMultipleChoiceField, DynamicChoiceField,
     DynamicModelChoiceField, DynamicModelMultipleChoiceField, DynamicMultipleChoiceField, JSONField, LaxURLField,
@@ -46,24 +49,52 @@ SEARCH_TYPES = {
     CustomFieldTypeChoices.TYPE_URL: FieldTypes.STRING,
 }
 
+# Registry of CustomFields held in memory by each process, keyed by object type ID
+custom_fields_cache = VersionedCache('custom_fields_version')
+
+
+def get_registered_custom_fields(object_type):
+    """
+    Return a list of all CustomFields assigned to the given object type. CustomFields are retained in memory by each
+    process until invalidated by a change to any CustomField. A copy of each CustomField is returned, so that any
+    attributes set on it (such as prefetched related objects) are not retained.
+    """
+    queryset = CustomField.objects.filter(object_types=object_type).select_related('related_object_type', 'choice_set')
+
+    if (version := custom_fields_cache.get_version()) is None:
+        return list(queryset)
+
+    custom_fields = custom_fields_cache.get_local_data(version)
+    if object_type.pk not in custom_fields:
+        custom_fields[object_type.pk] = list(queryset)
+
+    return [copy.copy(cf) for cf in custom_fields[object_type.pk]]
+
 
 class CustomFieldManager(models.Manager.from_queryset(RestrictedQuerySet)):
     use_in_migrations = True
 
     def get_for_model(self, model):
         """
-        Return all CustomFields assigned to the given model.
+        Return all CustomFields assigned to the given model. The QuerySet is populated from the registry of CustomFields
+        held in memory, and so can be evaluated without querying the database. (Any further filtering of the QuerySet
+        will query the database.)
         """
         content_type = ObjectType.objects.get_for_model(model._meta.concrete_model)
-        return self.get_queryset().filter(object_types=content_type)
+        queryset = self.get_queryset().filter(object_types=content_type)
+
+        # Historical models (e.g. within migrations) are not registered
+        if self.model is CustomField:
+            queryset._result_cache = get_registered_custom_fields(content_type)
+
+        return queryset
 
     def get_defaults_for_model(self, model):
         """
         Return a dictionary of serialized default values for all CustomFields applicable to the given model.
         """
-        custom_fields = self.get_for_model(model).filter(default__isnull=False)
         return {
-            cf.name: cf.default for cf in custom_fields
+            cf.name: cf.default for cf in self.get_for_model(model) if cf.default is not None
         }
 
 
@@ -241,6 +272,9 @@ class CustomField(CloningMixin, ExportTemplatesMixin, ChangeLoggedModel):
         # Cache instance's original name so we can check later whether it has changed
         self._name = self.__dict__.get('name')
 
+        # Related objects (and their relative positions) retrieved by prefetch_related_objects(), keyed by primary key
+        self._related_objects = None
+
     @property
     def search_type(self):
         return SEARCH_TYPES.get(self.type)
@@ -251,6 +285,43 @@ class CustomField(CloningMixin, ExportTemplatesMixin, ChangeLoggedModel):
             return self.choice_set.choices
         return []
 
+    @classmethod
+    def prefetch_related_objects(cls, custom_fields, data):
+        """
+        Retrieve all objects referenced by object and multi-object CustomFields within a set of custom field data,
+        using a single query for each related model. The objects are retained on each CustomField, so that calls to
+        deserialize() do not query for them individually.
+
+        Args:
+            custom_fields: An iterable of CustomFields
+            data: An iterable of custom field data dictionaries (e.g. the custom_field_data of a list of objects)
+        """
+        data = list(data)
+        custom_fields_by_model = defaultdict(list)
+        pks_by_model = defaultdict(set)
+
+        for cf in custom_fields:
+            if cf.type not in (CustomFieldTypeChoices.TYPE_OBJECT, CustomFieldTypeChoices.TYPE_MULTIOBJECT):
+                continue
+            if (model := cf.related_object_type.model_class()) is None:
+                continue
+            custom_fields_by_model[model].append(cf)
+            for cf_data in data:
+                if (value := cf_data.get(cf.name)) is None:
+                    continue
+                if cf.type == CustomFieldTypeChoices.TYPE_MULTIOBJECT:
+                    pks_by_model[model].update(value)
+                else:
+                    pks_by_model[model].add(value)
+
+        for model, pks in pks_by_model.items():
+            # Record the position of each object, to retain the model's ordering for multi-object values
+            related_objects = {
+                obj.pk: (i, obj) for i, obj in enumerate(model.objects.filter(pk__in=pks))
+            }
+            for cf in custom_fields_by_model[model]:
+                cf._related_objects = related_objects
+
     def get_ui_visible_color(self):
         return CustomFieldUIVisibleChoices.colors.get(self.ui_visible)
 
@@ -394,9 +465,13 @@ class CustomField(CloningMixin, ExportTemplatesMixin, ChangeLoggedModel):
             except ValueError:
                 return value
         if self.type == CustomFieldTypeChoices.TYPE_OBJECT:
+            if self._related_objects is not None and value in self._related_objects:
+                return self._related_objects[value][1]
             model = self.related_object_type.model_class()
             return model.objects.filter(pk=value).first()
         if self.type == CustomFieldTypeChoices.TYPE_MULTIOBJECT:
+            if self._related_objects is not None and all(pk in self._related_objects for pk in value):
+                return [obj for i, obj in sorted(self._related_objects[pk] for pk in set(value))]
             model = self.related_object_type.model_class()
             return model.objects.filter(pk__in=value)
         return value
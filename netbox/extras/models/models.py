@@ -1,14 +1,16 @@
+import itertools
 import json
 import urllib.parse
 
 from django.conf import settings
 from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelation
-from django.core.validators import ValidationError
+from django.core.validators import MinValueValidator, ValidationError
 from django.db import models
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.formats import date_format
+from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 from rest_framework.utils.encoders import JSONEncoder
 
@@ -25,7 +27,8 @@ from netbox.models.features import (
 from utilities.html import clean_html
 from utilities.querydict import dict_to_querydict
 from utilities.querysets import RestrictedQuerySet
-from utilities.jinja2 import render_jinja2
+from utilities.jinja2 import render_jinja2, render_jinja2_stream
+from utilities.streaming import StreamingQuerySet, coalesce_chunks, normalize_line_endings
 
 __all__ = (
     'Bookmark',
@@ -160,15 +163,23 @@ class EventRule(CustomFieldsMixin, ExportTemplatesMixin, TagsMixin, ChangeLogged
             except ValueError as e:
                 raise ValidationError({'conditions': e})
 
+    @cached_property
+    def condition_set(self):
+        """
+        Return the compiled ConditionSet for the event rule's conditions, or None if no conditions are specified.
+        """
+        if self.conditions:
+            return ConditionSet(self.conditions)
+
     def eval_conditions(self, data):
         """
         Test whether the given data meets the conditions of the event rule (if any). Return True
         if met or no conditions are specified.
         """
-        if not self.conditions:
+        if self.condition_set is None:
             return True
 
-        return ConditionSet(self.conditions).eval(data)
+        return self.condition_set.eval(data)
 
 
 class Webhook(CustomFieldsMixin, ExportTemplatesMixin, TagsMixin, ChangeLoggedModel):
@@ -237,6 +248,16 @@ class Webhook(CustomFieldsMixin, ExportTemplatesMixin, TagsMixin, ChangeLoggedMo
             "digest of the payload body using the secret as the key. The secret is not transmitted in the request."
         )
     )
+    batch_size = models.PositiveSmallIntegerField(
+        verbose_name=_('batch size'),
+        default=1,
+        validators=(MinValueValidator(1),),
+        help_text=_(
+            "The maximum number of events to convey in each request. If greater than one, events are sent in "
+            "batches, and the template context includes <code>events</code> (a list of individual event contexts) "
+            "in place of the attributes of a single event."
+        )
+    )
     ssl_verification = models.BooleanField(
         default=True,
         verbose_name=_('SSL verification'),
@@ -294,6 +315,10 @@ class Webhook(CustomFieldsMixin, ExportTemplatesMixin, TagsMixin, ChangeLoggedMo
             ret[header.strip()] = value.strip()
         return ret
 
+    @property
+    def is_batched(self):
+        return self.batch_size > 1
+
     def render_body(self, context):
         """
         Render the body template, if defined. Otherwise, jump the context as a JSON object.
@@ -497,15 +522,33 @@ class ExportTemplate(SyncedDataMixin, CloningMixin, ExportTemplatesMixin, Change
 
         return output
 
+    def render_stream(self, queryset):
+        """
+        Render the contents of the template incrementally, streaming the queryset's objects from the database in
+        chunks. Returns a generator of rendered content.
+        """
+        context = {
+            'queryset': StreamingQuerySet(queryset)
+        }
+        output = render_jinja2_stream(self.template_code, context)
+
+        # Replace CRLF-style line terminators
+        return coalesce_chunks(normalize_line_endings(output))
+
     def render_to_response(self, queryset):
         """
-        Render the template to an HTTP response, delivered as a named file attachment
+        Render the template to a streaming HTTP response, delivered as a named file attachment
         """
-        output = self.render(queryset)
+        output = self.render_stream(queryset)
         mime_type = 'text/plain; charset=utf-8' if not self.mime_type else self.mime_type
 
+        # Render the first chunk of output (up to STREAMING_BUFFER_SIZE characters) immediately, so that an error
+        # encountered early in rendering the template is raised before the response is returned. An error raised
+        # while rendering any later chunk cannot change the response status, and will truncate the response.
+        output = itertools.chain([next(output, '')], output)
+
         # Build the response
-        response = HttpResponse(output, content_type=mime_type)
+        response = StreamingHttpResponse(output, content_type=mime_type)
 
         if self.as_attachment:
             basename = queryset.model._meta.verbose_name_plural.replace(' ', '_')
@@ -4,24 +4,27 @@ import logging
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ImproperlyConfigured, ValidationError
 from django.db.models.fields.reverse_related import ManyToManyRel
-from django.db.models.signals import m2m_changed, post_save, pre_delete
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
 from django.dispatch import receiver, Signal
 from django.utils.translation import gettext_lazy as _
 from django_prometheus.models import model_deletes, model_inserts, model_updates
 
 from core.models import ObjectType
 from core.signals import job_end, job_start
+from extras.config_contexts import config_contexts_cache
 from extras.constants import EVENT_JOB_END, EVENT_JOB_START
-from extras.events import process_event_rules
-from extras.models import EventRule
+from extras.events import event_rules_cache, get_event_rules, process_event_rules
+from extras.models import ConfigContext, EventRule
 from netbox.config import get_config
-from netbox.context import current_request, events_queue
+from netbox.context import current_request, events_queue, objectchanges_queue
 from netbox.models.features import ChangeLoggingMixin
 from netbox.signals import post_clean
 from utilities.exceptions import AbortRequest
+from .changelog import enqueue_objectchange, get_queued_objectchange, new_objectchanges_queue
 from .choices import ObjectChangeActionChoices
 from .events import enqueue_object, get_snapshots, serialize_for_event
-from .models import CustomField, ObjectChange, TaggedItem
+from .models import CustomField, CustomFieldChoiceSet, TaggedItem
+from .models.customfields import custom_fields_cache
 from .validators import CustomValidator
 
 
@@ -82,27 +85,22 @@ def handle_changed_object(sender, instance, **kwargs):
     else:
         return
 
-    # Create/update an ObjectChange record for this change
+    # Ensure that we're working with fresh M2M assignments
+    if m2m_changed:
+        instance._prefetched_objects_cache = {}
+
+    # Queue an ObjectChange record for this change
     objectchange = instance.to_objectchange(action)
-    # If this is a many-to-many field change, check for a previous ObjectChange instance recorded
+    changes_queue = objectchanges_queue.get()
+    # If this is a many-to-many field change, check for a previous ObjectChange instance queued
     # for this object by this request and update it
-    if m2m_changed and (
-        prev_change := ObjectChange.objects.filter(
-            changed_object_type=ContentType.objects.get_for_model(instance),
-            changed_object_id=instance.pk,
-            request_id=request.id
-        ).first()
-    ):
+    if m2m_changed and (prev_change := get_queued_objectchange(changes_queue, instance)):
         prev_change.postchange_data = objectchange.postchange_data
-        prev_change.save()
     elif objectchange and objectchange.has_changes:
         objectchange.user = request.user
         objectchange.request_id = request.id
-        objectchange.save()
-
-    # Ensure that we're working with fresh M2M assignments
-    if m2m_changed:
-        instance.refresh_from_db()
+        enqueue_objectchange(changes_queue, instance, objectchange)
+    objectchanges_queue.set(changes_queue)
 
     # Enqueue the object for event processing
     queue = events_queue.get()
@@ -145,7 +143,9 @@ def handle_deleted_object(sender, instance, **kwargs):
         objectchange = instance.to_objectchange(ObjectChangeActionChoices.ACTION_DELETE)
         objectchange.user = request.user
         objectchange.request_id = request.id
-        objectchange.save()
+        changes_queue = objectchanges_queue.get()
+        enqueue_objectchange(changes_queue, instance, objectchange)
+        objectchanges_queue.set(changes_queue)
 
     # Django does not automatically send an m2m_changed signal for the reverse direction of a
     # many-to-many relationship (see https://code.djangoproject.com/ticket/17688), so we need to
@@ -178,11 +178,13 @@ def handle_deleted_object(sender, instance, **kwargs):
 @receiver(clear_events)
 def clear_events_queue(sender, **kwargs):
     """
-    Delete any queued events (e.g. because of an aborted bulk transaction)
+    Delete any queued events and change records (e.g. because of an aborted bulk transaction)
     """
     logger = logging.getLogger('events')
     logger.info(f"Clearing {len(events_queue.get())} queued events ({sender})")
     events_queue.set({})
+    if objectchanges_queue.get() is not None:
+        objectchanges_queue.set(new_objectchanges_queue())
 
 
 #
@@ -225,6 +227,35 @@ pre_delete.connect(handle_cf_deleted, sender=CustomField)
 m2m_changed.connect(handle_cf_added_obj_types, sender=CustomField.object_types.through)
 m2m_changed.connect(handle_cf_removed_obj_types, sender=CustomField.object_types.through)
 
+# Invalidate the CustomFields held in memory when any CustomField (or its choice set or assignment to object types) is
+# modified
+post_save.connect(custom_fields_cache.handle_change, sender=CustomField)
+post_delete.connect(custom_fields_cache.handle_change, sender=CustomField)
+m2m_changed.connect(custom_fields_cache.handle_change, sender=CustomField.object_types.through)
+post_save.connect(custom_fields_cache.handle_change, sender=CustomFieldChoiceSet)
+post_delete.connect(custom_fields_cache.handle_change, sender=CustomFieldChoiceSet)
+
+
+#
+# Config contexts
+#
+
+def connect_config_context_signals():
+    """
+    Invalidate all cached config context data when any ConfigContext (or its assignment to objects) is modified, when
+    an object to which a ConfigContext is assigned is deleted, or when the hierarchy of regions or site groups changes.
+    """
+    for model in ('extras.ConfigContext', 'dcim.Region', 'dcim.SiteGroup'):
+        post_save.connect(config_contexts_cache.handle_change, sender=model)
+        post_delete.connect(config_contexts_cache.handle_change, sender=model)
+    for field in ConfigContext._meta.many_to_many:
+        m2m_changed.connect(config_contexts_cache.handle_change, sender=field.remote_field.through)
+        # Deleting an assigned object removes its assignment without sending m2m_changed
+        post_delete.connect(config_contexts_cache.handle_change, sender=field.related_model)
+
+
+connect_config_context_signals()
+
 
 #
 # Custom validation
@@ -263,12 +294,18 @@ def validate_assigned_tags(sender, instance, action, model, pk_set, **kwargs):
 # Event rules
 #
 
+# Invalidate the EventRules held in memory when any EventRule (or its assignment to object types) is modified
+post_save.connect(event_rules_cache.handle_change, sender=EventRule)
+post_delete.connect(event_rules_cache.handle_change, sender=EventRule)
+m2m_changed.connect(event_rules_cache.handle_change, sender=EventRule.object_types.through)
+
+
 @receiver(job_start)
 def process_job_start_event_rules(sender, **kwargs):
     """
     Process event rules for jobs starting.
     """
-    event_rules = EventRule.objects.filter(type_job_start=True, enabled=True, object_types=sender.object_type)
+    event_rules = get_event_rules(sender.object_type, EVENT_JOB_START)
     username = sender.user.username if sender.user else None
     process_event_rules(event_rules, sender.object_type.model, EVENT_JOB_START, sender.data, username)
 
@@ -278,6 +315,6 @@ def process_job_end_event_rules(sender, **kwargs):
     """
     Process event rules for jobs terminating.
     """
-    event_rules = EventRule.objects.filter(type_job_end=True, enabled=True, object_types=sender.object_type)
+    event_rules = get_event_rules(sender.object_type, EVENT_JOB_END)
     username = sender.user.username if sender.user else None
     process_event_rules(event_rules, sender.object_type.model, EVENT_JOB_END, sender.data, username)
@@ -1,13 +1,18 @@
+import uuid
+
 from django.contrib.contenttypes.models import ContentType
-from django.test import override_settings
+from django.test import RequestFactory, TestCase, override_settings
 from django.urls import reverse
 from rest_framework import status
 
 from core.models import ObjectType
 from dcim.choices import SiteStatusChoices
-from dcim.models import Site
+from dcim.models import Rack, Site
 from extras.choices import *
+from extras.context_managers import event_tracking
 from extras.models import CustomField, CustomFieldChoiceSet, ObjectChange, Tag
+from extras.signals import clear_events
+from users.models import User
 from utilities.testing import APITestCase
 from utilities.testing.utils import create_tags, post_data
 from utilities.testing.views import ModelViewTestCase
@@ -223,6 +228,34 @@ class ChangeLogViewTest(ModelViewTestCase):
         self.assertEqual(objectchange.prechange_data['slug'], sites[0].slug)
         self.assertEqual(objectchange.postchange_data, None)
 
+    def test_bulk_delete_objects_protected(self):
+        sites = (
+            Site(name='Site 1', slug='site-1', status=SiteStatusChoices.STATUS_ACTIVE),
+            Site(name='Site 2', slug='site-2', status=SiteStatusChoices.STATUS_ACTIVE),
+            Site(name='Site 3', slug='site-3', status=SiteStatusChoices.STATUS_ACTIVE),
+        )
+        Site.objects.bulk_create(sites)
+        # Deletion of the last site is prevented by its rack
+        Rack.objects.create(site=sites[2], name='Rack 1')
+
+        form_data = {
+            'pk': [site.pk for site in sites],
+            'confirm': True,
+            '_confirm': True,
+        }
+
+        request = {
+            'path': self._get_url('bulk_delete'),
+            'data': post_data(form_data),
+        }
+        self.add_permissions('dcim.delete_site')
+        response = self.client.post(**request)
+        self.assertHttpStatus(response, 302)
+
+        # No sites should have been deleted, and no changes recorded
+        self.assertEqual(Site.objects.count(), 3)
+        self.assertFalse(ObjectChange.objects.exists())
+
     @override_settings(CHANGELOG_SKIP_EMPTY_CHANGES=False)
     def test_update_object_change(self):
         # Create a Site
@@ -541,3 +574,52 @@ class ChangeLogAPITest(APITestCase):
         self.assertEqual(objectchange.prechange_data['name'], 'Site 1')
         self.assertEqual(objectchange.prechange_data['slug'], 'site-1')
         self.assertEqual(objectchange.postchange_data, None)
+
+
+class ChangeLogQueueTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser')
+        Tag.objects.bulk_create((
+            Tag(name='Tag 1', slug='tag-1'),
+            Tag(name='Tag 2', slug='tag-2'),
+        ))
+
+    def get_request(self):
+        request = RequestFactory().get('/')
+        request.id = uuid.uuid4()
+        request.user = self.user
+        return request
+
+    def test_changes_recorded_on_exit(self):
+        request = self.get_request()
+
+        with event_tracking(request):
+            sites = [Site(name=f'Site {i}', slug=f'site-{i}') for i in range(1, 4)]
+            for site in sites:
+                site.save()
+                site.tags.set(Tag.objects.all())
+
+            # Change records are written only once the request has completed
+            self.assertEqual(ObjectChange.objects.count(), 0)
+
+        # The M2M assignment of tags should be merged into each creation record
+        self.assertEqual(ObjectChange.objects.count(), 3)
+        for site in sites:
+            objectchange = ObjectChange.objects.get(
+                changed_object_type=ContentType.objects.get_for_model(Site),
+                changed_object_id=site.pk
+            )
+            self.assertEqual(objectchange.action, ObjectChangeActionChoices.ACTION_CREATE)
+            self.assertEqual(objectchange.request_id, request.id)
+            self.assertEqual(objectchange.user_name, self.user.username)
+            self.assertEqual(objectchange.object_repr, site.name)
+            self.assertEqual(objectchange.postchange_data['tags'], ['Tag 1', 'Tag 2'])
+
+    def test_changes_discarded(self):
+        with event_tracking(self.get_request()):
+            Site.objects.create(name='Site 1', slug='site-1')
+            clear_events.send(sender=self)
+
+        self.assertEqual(ObjectChange.objects.count(), 0)
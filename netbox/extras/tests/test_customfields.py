@@ -11,6 +11,7 @@ from dcim.forms import SiteImportForm
 from dcim.models import Manufacturer, Rack, Site
 from extras.choices import *
 from extras.models import CustomField, CustomFieldChoiceSet
+from extras.models.customfields import custom_fields_cache
 from ipam.models import VLAN
 from netbox.choices import CSVDelimiterChoices, ImportFormatChoices
 from utilities.testing import APITestCase, TestCase
@@ -401,6 +402,38 @@ class CustomFieldTest(TestCase):
         instance.refresh_from_db()
         self.assertIsNone(instance.custom_field_data.get(cf.name))
 
+    def test_prefetch_related_objects(self):
+        vlans = (
+            VLAN(name='VLAN 1', vid=1),
+            VLAN(name='VLAN 2', vid=2),
+            VLAN(name='VLAN 3', vid=3),
+        )
+        VLAN.objects.bulk_create(vlans)
+        vlan_type = ObjectType.objects.get_for_model(VLAN)
+        object_cf = CustomField.objects.create(
+            name='object_field',
+            type=CustomFieldTypeChoices.TYPE_OBJECT,
+            related_object_type=vlan_type
+        )
+        multiobject_cf = CustomField.objects.create(
+            name='multiobject_field',
+            type=CustomFieldTypeChoices.TYPE_MULTIOBJECT,
+            related_object_type=vlan_type
+        )
+        data = [
+            {'object_field': vlans[0].pk, 'multiobject_field': [vlans[2].pk, vlans[1].pk]},
+            {'object_field': vlans[1].pk, 'multiobject_field': None},
+        ]
+
+        # Related objects for both fields should be retrieved with a single query
+        with self.assertNumQueries(1):
+            CustomField.prefetch_related_objects([object_cf, multiobject_cf], data)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(object_cf.deserialize(data[0]['object_field']), vlans[0])
+            self.assertEqual(object_cf.deserialize(data[1]['object_field']), vlans[1])
+            self.assertEqual(multiobject_cf.deserialize(data[0]['multiobject_field']), [vlans[1], vlans[2]])
+
     def test_rename_customfield(self):
         obj_type = ObjectType.objects.get_for_model(Site)
         FIELD_DATA = 'abc'
@@ -545,6 +578,25 @@ class CustomFieldManagerTest(TestCase):
         self.assertEqual(CustomField.objects.get_for_model(Site).count(), 1)
         self.assertEqual(CustomField.objects.get_for_model(VirtualMachine).count(), 0)
 
+    def test_get_for_model_registry(self):
+        # Treat all changes to CustomFields as having been committed
+        custom_fields_cache.invalidate()
+
+        self.assertEqual(len(CustomField.objects.get_for_model(Site)), 1)
+        with self.assertNumQueries(0):
+            custom_fields = list(CustomField.objects.get_for_model(Site))
+        self.assertEqual(custom_fields[0].name, 'text_field')
+
+        # A copy of each registered CustomField should be returned
+        custom_fields[0].name = 'foo'
+        self.assertEqual(CustomField.objects.get_for_model(Site)[0].name, 'text_field')
+
+        # Modifying a CustomField should invalidate the registry
+        custom_field = CustomField(type=CustomFieldTypeChoices.TYPE_TEXT, name='text_field2')
+        custom_field.save()
+        custom_field.object_types.set([ObjectType.objects.get_for_model(Site)])
+        self.assertEqual(len(CustomField.objects.get_for_model(Site)), 2)
+
 
 class CustomFieldAPITest(APITestCase):
 
@@ -1,24 +1,37 @@
 import json
 import uuid
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 import django_rq
 from django.http import HttpResponse
-from django.test import RequestFactory
+from django.test import RequestFactory, override_settings
 from django.urls import reverse
-from requests import Session
+from requests import RequestException, Session
 from rest_framework import status
 
 from core.models import ObjectType
 from dcim.choices import SiteStatusChoices
 from dcim.models import Site
 from extras.choices import EventRuleActionChoices, ObjectChangeActionChoices
+from extras.constants import EVENT_JOB_START
 from extras.context_managers import event_tracking
-from extras.events import enqueue_object, flush_events, serialize_for_event
+from extras.events import (
+    DEFAULT_EVENTS_PIPELINE, enqueue_object, event_rules_cache, flush_events, get_event_rules, serialize_for_event,
+)
 from extras.models import EventRule, Tag, Webhook
-from extras.webhooks import generate_signature, send_webhook
+from extras.webhooks import generate_signature, send_webhooks
 from utilities.testing import APITestCase
 
+# Copies of the events received by capture_events()
+captured_events = []
+
+
+def capture_events(events):
+    """
+    An events pipeline which records a copy of each event.
+    """
+    captured_events.extend(dict(event) for event in events)
+
 
 class EventRuleTest(APITestCase):
 
@@ -29,6 +42,9 @@ class EventRuleTest(APITestCase):
         self.queue = django_rq.get_queue('default')
         self.queue.empty()
 
+        # Discard any EventRules cached prior to the rollback of a previous test
+        event_rules_cache.invalidate()
+
     @classmethod
     def setUpTestData(cls):
 
@@ -107,6 +123,72 @@ class EventRuleTest(APITestCase):
         # Evaluate the conditions (status='active')
         self.assertTrue(event_rule.eval_conditions(data))
 
+    def test_get_event_rules(self):
+        """
+        Test the retrieval of cached EventRules, and their invalidation upon modification.
+        """
+        site_type = ObjectType.objects.get_for_model(Site)
+        event_rule = EventRule.objects.get(type_create=True)
+        self.assertListEqual(get_event_rules(site_type, ObjectChangeActionChoices.ACTION_CREATE), [event_rule])
+        self.assertListEqual(get_event_rules(site_type, EVENT_JOB_START), [])
+
+        # Disabling the rule should remove it from the cache
+        event_rule.enabled = False
+        event_rule.save()
+        self.assertListEqual(get_event_rules(site_type, ObjectChangeActionChoices.ACTION_CREATE), [])
+
+        # Removing the rule's object types should remove it from the cache
+        event_rule = EventRule.objects.get(type_update=True)
+        self.assertListEqual(get_event_rules(site_type, ObjectChangeActionChoices.ACTION_UPDATE), [event_rule])
+        event_rule.object_types.clear()
+        self.assertListEqual(get_event_rules(site_type, ObjectChangeActionChoices.ACTION_UPDATE), [])
+
+    def test_lazy_serialization(self):
+        """
+        Check that queued objects are serialized only when processed, and only if an EventRule applies.
+        """
+        queue = {}
+        site = Site.objects.create(name='Site 1', slug='site-1')
+        enqueue_object(queue, site, self.user, uuid.uuid4(), ObjectChangeActionChoices.ACTION_CREATE)
+        site.snapshot()
+        site.name = 'Site X'
+        site.save()
+        enqueue_object(queue, site, self.user, uuid.uuid4(), ObjectChangeActionChoices.ACTION_UPDATE)
+        event = queue[f'dcim.site:{site.pk}']
+        self.assertNotIn('data', event)
+
+        # The object should be serialized once, in its final state, when the queue is processed
+        flush_events(list(queue.values()))
+        self.assertEqual(event['event'], ObjectChangeActionChoices.ACTION_CREATE)
+        self.assertEqual(event['data']['name'], 'Site X')
+        self.assertEqual(event['snapshots']['postchange']['name'], 'Site X')
+        self.assertEqual(self.queue.count, 1)
+
+        # An object to which no EventRule applies should not be serialized
+        queue = {}
+        site.snapshot()
+        site.save()
+        enqueue_object(queue, site, self.user, uuid.uuid4(), ObjectChangeActionChoices.ACTION_UPDATE)
+        EventRule.objects.filter(type_update=True).update(enabled=False)
+        event_rules_cache.invalidate()
+        flush_events(list(queue.values()))
+        self.assertNotIn('data', queue[f'dcim.site:{site.pk}'])
+
+    @override_settings(EVENTS_PIPELINE=[DEFAULT_EVENTS_PIPELINE, 'extras.tests.test_event_rules.capture_events'])
+    def test_custom_events_pipeline(self):
+        """
+        Check that events passed to a custom events pipeline include their serialized data.
+        """
+        captured_events.clear()
+        site = Site.objects.create(name='Site 1', slug='site-1')
+        queue = {}
+        enqueue_object(queue, site, self.user, uuid.uuid4(), ObjectChangeActionChoices.ACTION_CREATE)
+
+        flush_events(list(queue.values()))
+        self.assertEqual(len(captured_events), 1)
+        self.assertEqual(captured_events[0]['data']['name'], 'Site 1')
+        self.assertEqual(captured_events[0]['snapshots']['postchange']['name'], 'Site 1')
+
     def test_single_create_process_eventrule(self):
         """
         Check that creating an object with an applicable EventRule queues a background task for the rule's action.
@@ -131,17 +213,18 @@ class EventRuleTest(APITestCase):
         self.assertEqual(self.queue.count, 1)
         job = self.queue.jobs[0]
         self.assertEqual(job.kwargs['event_rule'], EventRule.objects.get(type_create=True))
-        self.assertEqual(job.kwargs['event'], ObjectChangeActionChoices.ACTION_CREATE)
-        self.assertEqual(job.kwargs['model_name'], 'site')
-        self.assertEqual(job.kwargs['data']['id'], response.data['id'])
-        self.assertEqual(len(job.kwargs['data']['tags']), len(response.data['tags']))
-        self.assertEqual(job.kwargs['snapshots']['postchange']['name'], 'Site 1')
-        self.assertEqual(job.kwargs['snapshots']['postchange']['tags'], ['Bar', 'Foo'])
+        payload = job.kwargs['payloads'][0]
+        self.assertEqual(payload['event'], ObjectChangeActionChoices.ACTION_CREATE)
+        self.assertEqual(payload['model_name'], 'site')
+        self.assertEqual(payload['data']['id'], response.data['id'])
+        self.assertEqual(len(payload['data']['tags']), len(response.data['tags']))
+        self.assertEqual(payload['snapshots']['postchange']['name'], 'Site 1')
+        self.assertEqual(payload['snapshots']['postchange']['tags'], ['Bar', 'Foo'])
 
     def test_bulk_create_process_eventrule(self):
         """
-        Check that bulk creating multiple objects with an applicable EventRule queues a background task for each
-        new object.
+        Check that bulk creating multiple objects with an applicable EventRule queues a single background task
+        for all new objects.
         """
         # Create multiple objects via the REST API
         data = [
@@ -177,16 +260,18 @@ class EventRuleTest(APITestCase):
         self.assertEqual(Site.objects.count(), 3)
         self.assertEqual(Site.objects.first().tags.count(), 2)
 
-        # Verify that a background task was queued for each new object
-        self.assertEqual(self.queue.count, 3)
-        for i, job in enumerate(self.queue.jobs):
-            self.assertEqual(job.kwargs['event_rule'], EventRule.objects.get(type_create=True))
-            self.assertEqual(job.kwargs['event'], ObjectChangeActionChoices.ACTION_CREATE)
-            self.assertEqual(job.kwargs['model_name'], 'site')
-            self.assertEqual(job.kwargs['data']['id'], response.data[i]['id'])
-            self.assertEqual(len(job.kwargs['data']['tags']), len(response.data[i]['tags']))
-            self.assertEqual(job.kwargs['snapshots']['postchange']['name'], response.data[i]['name'])
-            self.assertEqual(job.kwargs['snapshots']['postchange']['tags'], ['Bar', 'Foo'])
+        # Verify that a single background task was queued for all new objects
+        self.assertEqual(self.queue.count, 1)
+        job = self.queue.jobs[0]
+        self.assertEqual(job.kwargs['event_rule'], EventRule.objects.get(type_create=True))
+        self.assertEqual(len(job.kwargs['payloads']), 3)
+        for i, payload in enumerate(job.kwargs['payloads']):
+            self.assertEqual(payload['event'], ObjectChangeActionChoices.ACTION_CREATE)
+            self.assertEqual(payload['model_name'], 'site')
+            self.assertEqual(payload['data']['id'], response.data[i]['id'])
+            self.assertEqual(len(payload['data']['tags']), len(response.data[i]['tags']))
+            self.assertEqual(payload['snapshots']['postchange']['name'], response.data[i]['name'])
+            self.assertEqual(payload['snapshots']['postchange']['tags'], ['Bar', 'Foo'])
 
     def test_single_update_process_eventrule(self):
         """
@@ -212,19 +297,20 @@ class EventRuleTest(APITestCase):
         self.assertEqual(self.queue.count, 1)
         job = self.queue.jobs[0]
         self.assertEqual(job.kwargs['event_rule'], EventRule.objects.get(type_update=True))
-        self.assertEqual(job.kwargs['event'], ObjectChangeActionChoices.ACTION_UPDATE)
-        self.assertEqual(job.kwargs['model_name'], 'site')
-        self.assertEqual(job.kwargs['data']['id'], site.pk)
-        self.assertEqual(len(job.kwargs['data']['tags']), len(response.data['tags']))
-        self.assertEqual(job.kwargs['snapshots']['prechange']['name'], 'Site 1')
-        self.assertEqual(job.kwargs['snapshots']['prechange']['tags'], ['Bar', 'Foo'])
-        self.assertEqual(job.kwargs['snapshots']['postchange']['name'], 'Site X')
-        self.assertEqual(job.kwargs['snapshots']['postchange']['tags'], ['Baz'])
+        payload = job.kwargs['payloads'][0]
+        self.assertEqual(payload['event'], ObjectChangeActionChoices.ACTION_UPDATE)
+        self.assertEqual(payload['model_name'], 'site')
+        self.assertEqual(payload['data']['id'], site.pk)
+        self.assertEqual(len(payload['data']['tags']), len(response.data['tags']))
+        self.assertEqual(payload['snapshots']['prechange']['name'], 'Site 1')
+        self.assertEqual(payload['snapshots']['prechange']['tags'], ['Bar', 'Foo'])
+        self.assertEqual(payload['snapshots']['postchange']['name'], 'Site X')
+        self.assertEqual(payload['snapshots']['postchange']['tags'], ['Baz'])
 
     def test_bulk_update_process_eventrule(self):
         """
-        Check that bulk updating multiple objects with an applicable EventRule queues a background task for each
-        updated object.
+        Check that bulk updating multiple objects with an applicable EventRule queues a single background task
+        for all updated objects.
         """
         sites = (
             Site(name='Site 1', slug='site-1'),
@@ -264,18 +350,20 @@ class EventRuleTest(APITestCase):
         response = self.client.patch(url, data, format='json', **self.header)
         self.assertHttpStatus(response, status.HTTP_200_OK)
 
-        # Verify that a background task was queued for each updated object
-        self.assertEqual(self.queue.count, 3)
-        for i, job in enumerate(self.queue.jobs):
-            self.assertEqual(job.kwargs['event_rule'], EventRule.objects.get(type_update=True))
-            self.assertEqual(job.kwargs['event'], ObjectChangeActionChoices.ACTION_UPDATE)
-            self.assertEqual(job.kwargs['model_name'], 'site')
-            self.assertEqual(job.kwargs['data']['id'], data[i]['id'])
-            self.assertEqual(len(job.kwargs['data']['tags']), len(response.data[i]['tags']))
-            self.assertEqual(job.kwargs['snapshots']['prechange']['name'], sites[i].name)
-            self.assertEqual(job.kwargs['snapshots']['prechange']['tags'], ['Bar', 'Foo'])
-            self.assertEqual(job.kwargs['snapshots']['postchange']['name'], response.data[i]['name'])
-            self.assertEqual(job.kwargs['snapshots']['postchange']['tags'], ['Baz'])
+        # Verify that a single background task was queued for all updated objects
+        self.assertEqual(self.queue.count, 1)
+        job = self.queue.jobs[0]
+        self.assertEqual(job.kwargs['event_rule'], EventRule.objects.get(type_update=True))
+        self.assertEqual(len(job.kwargs['payloads']), 3)
+        for i, payload in enumerate(job.kwargs['payloads']):
+            self.assertEqual(payload['event'], ObjectChangeActionChoices.ACTION_UPDATE)
+            self.assertEqual(payload['model_name'], 'site')
+            self.assertEqual(payload['data']['id'], data[i]['id'])
+            self.assertEqual(len(payload['data']['tags']), len(response.data[i]['tags']))
+            self.assertEqual(payload['snapshots']['prechange']['name'], sites[i].name)
+            self.assertEqual(payload['snapshots']['prechange']['tags'], ['Bar', 'Foo'])
+            self.assertEqual(payload['snapshots']['postchange']['name'], response.data[i]['name'])
+            self.assertEqual(payload['snapshots']['postchange']['tags'], ['Baz'])
 
     def test_single_delete_process_eventrule(self):
         """
@@ -294,16 +382,17 @@ class EventRuleTest(APITestCase):
         self.assertEqual(self.queue.count, 1)
         job = self.queue.jobs[0]
         self.assertEqual(job.kwargs['event_rule'], EventRule.objects.get(type_delete=True))
-        self.assertEqual(job.kwargs['event'], ObjectChangeActionChoices.ACTION_DELETE)
-        self.assertEqual(job.kwargs['model_name'], 'site')
-        self.assertEqual(job.kwargs['data']['id'], site.pk)
-        self.assertEqual(job.kwargs['snapshots']['prechange']['name'], 'Site 1')
-        self.assertEqual(job.kwargs['snapshots']['prechange']['tags'], ['Bar', 'Foo'])
+        payload = job.kwargs['payloads'][0]
+        self.assertEqual(payload['event'], ObjectChangeActionChoices.ACTION_DELETE)
+        self.assertEqual(payload['model_name'], 'site')
+        self.assertEqual(payload['data']['id'], site.pk)
+        self.assertEqual(payload['snapshots']['prechange']['name'], 'Site 1')
+        self.assertEqual(payload['snapshots']['prechange']['tags'], ['Bar', 'Foo'])
 
     def test_bulk_delete_process_eventrule(self):
         """
-        Check that bulk deleting multiple objects with an applicable EventRule queues a background task for each
-        deleted object.
+        Check that bulk deleting multiple objects with an applicable EventRule queues a single background task
+        for all deleted objects.
         """
         sites = (
             Site(name='Site 1', slug='site-1'),
@@ -323,15 +412,17 @@ class EventRuleTest(APITestCase):
         response = self.client.delete(url, data, format='json', **self.header)
         self.assertHttpStatus(response, status.HTTP_204_NO_CONTENT)
 
-        # Verify that a background task was queued for each deleted object
-        self.assertEqual(self.queue.count, 3)
-        for i, job in enumerate(self.queue.jobs):
-            self.assertEqual(job.kwargs['event_rule'], EventRule.objects.get(type_delete=True))
-            self.assertEqual(job.kwargs['event'], ObjectChangeActionChoices.ACTION_DELETE)
-            self.assertEqual(job.kwargs['model_name'], 'site')
-            self.assertEqual(job.kwargs['data']['id'], sites[i].pk)
-            self.assertEqual(job.kwargs['snapshots']['prechange']['name'], sites[i].name)
-            self.assertEqual(job.kwargs['snapshots']['prechange']['tags'], ['Bar', 'Foo'])
+        # Verify that a single background task was queued for all deleted objects
+        self.assertEqual(self.queue.count, 1)
+        job = self.queue.jobs[0]
+        self.assertEqual(job.kwargs['event_rule'], EventRule.objects.get(type_delete=True))
+        self.assertEqual(len(job.kwargs['payloads']), 3)
+        for i, payload in enumerate(job.kwargs['payloads']):
+            self.assertEqual(payload['event'], ObjectChangeActionChoices.ACTION_DELETE)
+            self.assertEqual(payload['model_name'], 'site')
+            self.assertEqual(payload['data']['id'], sites[i].pk)
+            self.assertEqual(payload['snapshots']['prechange']['name'], sites[i].name)
+            self.assertEqual(payload['snapshots']['prechange']['tags'], ['Bar', 'Foo'])
 
     def test_send_webhook(self):
         request_id = uuid.uuid4()
@@ -353,7 +444,7 @@ class EventRuleTest(APITestCase):
             # Validate the outgoing request body
             body = json.loads(request.body)
             self.assertEqual(body['event'], 'created')
-            self.assertEqual(body['timestamp'], job.kwargs['timestamp'])
+            self.assertEqual(body['timestamp'], job.kwargs['payloads'][0]['timestamp'])
             self.assertEqual(body['model'], 'site')
             self.assertEqual(body['username'], 'testuser')
             self.assertEqual(body['request_id'], str(request_id))
@@ -378,7 +469,91 @@ class EventRuleTest(APITestCase):
 
         # Patch the Session object with our dummy_send() method, then process the webhook for sending
         with patch.object(Session, 'send', dummy_send) as mock_send:
-            send_webhook(**job.kwargs)
+            send_webhooks(**job.kwargs)
+
+    def test_send_batched_webhook(self):
+        webhook = Webhook.objects.get(name='Webhook 1')
+        webhook.batch_size = 2
+        webhook.save()
+        requests_sent = []
+
+        def dummy_send(_, request, **kwargs):
+            """
+            A dummy implementation of Session.send() to be used for testing.
+            Always returns a 200 HTTP response.
+            """
+            self.assertEqual(request.headers['X-Hook-Signature'], generate_signature(request.body, webhook.secret))
+            requests_sent.append(json.loads(request.body))
+
+            return HttpResponse()
+
+        # Enqueue webhooks for three new objects
+        webhooks_queue = {}
+        for i in range(1, 4):
+            site = Site.objects.create(name=f'Site {i}', slug=f'site-{i}')
+            enqueue_object(
+                webhooks_queue,
+                instance=site,
+                user=self.user,
+                request_id=uuid.uuid4(),
+                action=ObjectChangeActionChoices.ACTION_CREATE
+            )
+        flush_events(list(webhooks_queue.values()))
+        self.assertEqual(self.queue.count, 1)
+        job = self.queue.jobs[0]
+
+        # Process the webhooks, which should be sent in two batches
+        with patch.object(Session, 'send', dummy_send):
+            send_webhooks(**job.kwargs)
+        self.assertEqual(len(requests_sent), 2)
+        events = [event for body in requests_sent for event in body['events']]
+        self.assertEqual(sorted(len(body['events']) for body in requests_sent), [1, 2])
+        self.assertEqual(
+            sorted(event['data']['name'] for event in events),
+            ['Site 1', 'Site 2', 'Site 3']
+        )
+
+    def test_send_webhooks_retry(self):
+        requests_sent = []
+
+        def dummy_send(_, request, **kwargs):
+            """
+            A dummy implementation of Session.send() to be used for testing. Fails with an unexpected exception for
+            Site 2 on the first attempt.
+            """
+            name = json.loads(request.body)['data']['name']
+            if name == 'Site 2' and not requests_sent.count(name):
+                requests_sent.append(name)
+                raise ValueError('Unexpected error')
+            requests_sent.append(name)
+
+            return HttpResponse()
+
+        # Enqueue webhooks for two new objects
+        webhooks_queue = {}
+        for i in range(1, 3):
+            site = Site.objects.create(name=f'Site {i}', slug=f'site-{i}')
+            enqueue_object(
+                webhooks_queue,
+                instance=site,
+                user=self.user,
+                request_id=uuid.uuid4(),
+                action=ObjectChangeActionChoices.ACTION_CREATE
+            )
+        flush_events(list(webhooks_queue.values()))
+        job = self.queue.jobs[0]
+        rq_job = MagicMock(meta={})
+
+        # The failed request should be reported, and the successful one recorded on the job
+        with patch.object(Session, 'send', dummy_send), patch('extras.webhooks.get_current_job', return_value=rq_job):
+            with self.assertRaises(RequestException):
+                send_webhooks(**job.kwargs)
+            self.assertEqual(len(rq_job.meta['delivered']), 1)
+            rq_job.save_meta.assert_called_once()
+
+            # Upon retry, only the failed request should be sent again
+            send_webhooks(**job.kwargs)
+        self.assertEqual(sorted(requests_sent), ['Site 1', 'Site 2', 'Site 2'])
 
     def test_duplicate_triggers(self):
         """
@@ -2,6 +2,7 @@ from django.test import TestCase
 
 from core.models import ObjectType
 from dcim.models import Device, DeviceRole, DeviceType, Location, Manufacturer, Platform, Region, Site, SiteGroup
+from extras.config_contexts import config_contexts_cache
 from extras.models import ConfigContext, Tag
 from tenancy.models import Tenant, TenantGroup
 from utilities.exceptions import AbortRequest
@@ -92,6 +93,48 @@ class ConfigContextTest(TestCase):
         }
         self.assertEqual(device.get_config_context(), expected_data)
 
+    def test_cached_config_context(self):
+        """
+        Check that cached config context data reflects changes to ConfigContexts and their assignments.
+        """
+        device = Device.objects.first()
+        context = ConfigContext.objects.create(name='context 1', data={'a': 1})
+        self.assertEqual(device.get_config_context(), {'a': 1})
+
+        # Modify the ConfigContext's data
+        context.data = {'a': 2}
+        context.save()
+        self.assertEqual(device.get_config_context(), {'a': 2})
+
+        # Restrict the ConfigContext to a tag not assigned to the Device
+        tag = Tag.objects.get(slug='tag')
+        context.tags.add(tag)
+        self.assertEqual(device.get_config_context(), {})
+
+        # Assign the tag to the Device
+        device.tags.add(tag)
+        self.assertEqual(device.get_config_context(), {'a': 2})
+
+    def test_cached_config_context_deleted_assignment(self):
+        """
+        Check that cached config context data is invalidated when an object to which a ConfigContext is assigned is
+        deleted.
+        """
+        device = Device.objects.first()
+        tag = Tag.objects.get(slug='tag2')
+        context = ConfigContext.objects.create(name='context 1', data={'a': 1})
+        context.tags.add(tag)
+
+        # Treat all changes as having been committed, so that the data is cached
+        config_contexts_cache.invalidate()
+        version = config_contexts_cache.get_version()
+        self.assertEqual(device.get_config_context(), {})
+
+        # Deleting the tag removes the ConfigContext's restriction without sending m2m_changed
+        tag.delete()
+        self.assertNotEqual(config_contexts_cache.get_version(), version)
+        self.assertEqual(device.get_config_context(), {'a': 1})
+
     def test_name_ordering_after_weight(self):
         device = Device.objects.first()
         context1 = ConfigContext(
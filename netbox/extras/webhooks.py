@@ -1,16 +1,26 @@
 import hashlib
 import hmac
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.cookiejar import DefaultCookiePolicy
+from urllib.parse import urlsplit
 
 import requests
 from django.conf import settings
 from django_rq import job
 from jinja2.exceptions import TemplateError
+from requests.adapters import HTTPAdapter
+from rq import get_current_job
 
 from .constants import WEBHOOK_EVENT_TYPES
 
 logger = logging.getLogger('netbox.webhooks')
 
+# Persistent HTTP sessions held by this process, keyed by endpoint (scheme & location) and SSL verification setting
+_sessions = {}
+_sessions_lock = threading.Lock()
+
 
 def generate_signature(request_body, secret):
     """
@@ -24,14 +34,37 @@ def generate_signature(request_body, secret):
     return hmac_prep.hexdigest()
 
 
-@job('default')
-def send_webhook(event_rule, model_name, event, data, timestamp, username, request_id=None, snapshots=None):
+def get_endpoint(url):
     """
-    Make a POST request to the defined Webhook
+    Return a tuple of the scheme and network location (host and port) identifying the endpoint of a URL.
     """
-    webhook = event_rule.action_object
+    parts = urlsplit(url)
+    return parts.scheme, parts.netloc
+
 
-    # Prepare context data for headers & body templates
+def get_session(endpoint, verify):
+    """
+    Return the persistent Session used by this process to send requests to the specified endpoint, creating it if
+    necessary. Connections to the endpoint are pooled by the Session and reused across requests, up to a maximum of
+    WEBHOOK_CONCURRENCY connections. Cookies are not retained, as the Session is shared by all webhooks.
+    """
+    key = (*endpoint, verify)
+    with _sessions_lock:
+        if key not in _sessions:
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings.WEBHOOK_CONCURRENCY)
+            session = requests.Session()
+            session.verify = verify
+            session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _sessions[key] = session
+        return _sessions[key]
+
+
+def get_webhook_context(model_name, event, data, timestamp, username, request_id=None, snapshots=None):
+    """
+    Return the context data for rendering a webhook's headers, body, and URL for a single event.
+    """
     context = {
         'event': WEBHOOK_EVENT_TYPES[event],
         'timestamp': timestamp,
@@ -45,6 +78,14 @@ def send_webhook(event_rule, model_name, event, data, timestamp, username, reque
             'snapshots': snapshots
         })
 
+    return context
+
+
+def prepare_request(webhook, context):
+    """
+    Render the headers, body, and URL of a Webhook using the given context, and return the prepared (and, if a secret
+    is defined, signed) HTTP request.
+    """
     # Build the headers for the HTTP request
     headers = {
         'Content-Type': webhook.http_content_type,
@@ -69,9 +110,6 @@ def send_webhook(event_rule, model_name, event, data, timestamp, username, reque
         'headers': headers,
         'data': body.encode('utf8'),
     }
-    logger.info(
-        f"Sending {params['method']} request to {params['url']} ({context['model']} {context['event']})"
-    )
     logger.debug(params)
     try:
         prepared_request = requests.Request(**params).prepare()
@@ -83,18 +121,109 @@ def send_webhook(event_rule, model_name, event, data, timestamp, username, reque
     if webhook.secret != '':
         prepared_request.headers['X-Hook-Signature'] = generate_signature(prepared_request.body, webhook.secret)
 
-    # Send the request
-    with requests.Session() as session:
-        session.verify = webhook.ssl_verification
-        if webhook.ca_file_path:
-            session.verify = webhook.ca_file_path
-        response = session.send(prepared_request, proxies=settings.HTTP_PROXIES)
+    return prepared_request
+
+
+def deliver_request(webhook, prepared_request):
+    """
+    Send a prepared request to its endpoint using a pooled connection. Raises RequestException if the request fails
+    or the receiver does not return a 2xx response.
+    """
+    session = get_session(get_endpoint(prepared_request.url), webhook.ca_file_path or webhook.ssl_verification)
+    response = session.send(prepared_request, proxies=settings.HTTP_PROXIES)
 
     if 200 <= response.status_code <= 299:
         logger.info(f"Request succeeded; response status {response.status_code}")
-        return f"Status {response.status_code} returned, webhook successfully processed."
+        return response
     else:
         logger.warning(f"Request failed; response status {response.status_code}: {response.content}")
         raise requests.exceptions.RequestException(
             f"Status {response.status_code} returned with content '{response.content}', webhook FAILED to process."
         )
+
+
+@job('default')
+def send_webhook(event_rule, model_name, event, data, timestamp, username, request_id=None, snapshots=None):
+    """
+    Make a POST request to the defined Webhook
+    """
+    webhook = event_rule.action_object
+    context = get_webhook_context(model_name, event, data, timestamp, username, request_id, snapshots)
+    prepared_request = prepare_request(webhook, context)
+    logger.info(
+        f"Sending {prepared_request.method} request to {prepared_request.url} ({context['model']} {context['event']})"
+    )
+
+    response = deliver_request(webhook, prepared_request)
+
+    return f"Status {response.status_code} returned, webhook successfully processed."
+
+
+@job('default')
+def send_webhooks(event_rule, payloads):
+    """
+    Deliver a set of events to the Webhook assigned to an EventRule. Each payload is a dictionary of the arguments
+    accepted by send_webhook(). If the Webhook has a batch size greater than one, events are conveyed in requests of up
+    to that many events each; otherwise, a request is sent for each event.
+
+    Requests to each endpoint are sent concurrently, up to WEBHOOK_CONCURRENCY at a time. Should any request fail (or
+    fail to be prepared), an exception is raised once all others have been attempted. Successfully delivered requests
+    are recorded on the current job, so that they are not repeated if the job is retried.
+    """
+    webhook = event_rule.action_object
+    rq_job = get_current_job()
+    delivered = set(rq_job.meta.get('delivered', [])) if rq_job else set()
+
+    # Compile the context for each request
+    contexts = [get_webhook_context(**payload) for payload in payloads]
+    if webhook.is_batched:
+        contexts = [
+            {'events': contexts[i:i + webhook.batch_size]} for i in range(0, len(contexts), webhook.batch_size)
+        ]
+
+    # Prepare all outstanding requests, grouped by endpoint
+    outstanding = len(contexts) - len(delivered)
+    errors = []
+    requests_by_endpoint = {}
+    for i, context in enumerate(contexts):
+        if i in delivered:
+            continue
+        try:
+            prepared_request = prepare_request(webhook, context)
+        except Exception as e:
+            errors.append(e)
+            continue
+        requests_by_endpoint.setdefault(get_endpoint(prepared_request.url), []).append((i, prepared_request))
+    logger.info(
+        f"Sending {sum(len(r) for r in requests_by_endpoint.values())} {webhook.http_method} requests for "
+        f"{len(payloads)} events to {len(requests_by_endpoint)} endpoints"
+    )
+
+    # Send the requests to each endpoint using a dedicated pool of threads
+    futures = []
+    executors = []
+    for endpoint_requests in requests_by_endpoint.values():
+        executor = ThreadPoolExecutor(max_workers=min(settings.WEBHOOK_CONCURRENCY, len(endpoint_requests)))
+        executors.append(executor)
+        for i, prepared_request in endpoint_requests:
+            futures.append((i, executor.submit(deliver_request, webhook, prepared_request)))
+    for executor in executors:
+        executor.shutdown(wait=True)
+
+    # Record the outcome of each request
+    for i, future in futures:
+        try:
+            future.result()
+            delivered.add(i)
+        except Exception as e:
+            errors.append(e)
+
+    if errors:
+        if rq_job:
+            rq_job.meta['delivered'] = sorted(delivered)
+            rq_job.save_meta()
+        raise requests.exceptions.RequestException(
+            f"{len(errors)} of {outstanding} requests FAILED to process; first error: {errors[0]}"
+        )
+
+    return f"{len(futures)} requests sent, webhook successfully processed."
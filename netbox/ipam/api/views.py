@@ -1,4 +1,5 @@
 from copy import deepcopy
+from itertools import islice
 
 from django.core.exceptions import ObjectDoesNotExist, PermissionDenied
 from django.db import transaction
@@ -329,7 +330,7 @@ class AvailablePrefixesView(AvailableObjectsView):
         return get_object_or_404(Prefix.objects.restrict(request.user), pk=pk)
 
     def get_available_objects(self, parent, limit=None):
-        return parent.get_available_prefixes().iter_cidrs()
+        return list(parent.iter_available_prefixes())
 
     def check_sufficient_available(self, requested_objects, available_objects):
         available_prefixes = IPSet(available_objects)
@@ -379,13 +380,8 @@ class AvailableIPAddressesView(AvailableObjectsView):
     advisory_lock_key = 'available-ips'
 
     def get_available_objects(self, parent, limit=None):
-        # Calculate available IPs within the parent
-        ip_list = []
-        for index, ip in enumerate(parent.get_available_ips(), start=1):
-            ip_list.append(ip)
-            if index == limit:
-                break
-        return ip_list
+        # Calculate available IPs within the parent, stopping once the limit has been reached
+        return list(islice(parent.iter_available_ips(), limit or None))
 
     def get_extra_context(self, parent):
         return {
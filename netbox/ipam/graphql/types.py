@@ -105,7 +105,7 @@ class FHRPGroupType(NetBoxObjectType, IPAddressesMixin):
 class FHRPGroupAssignmentType(BaseObjectType):
     group: Annotated["FHRPGroupType", strawberry.lazy('ipam.graphql.types')]
 
-    @strawberry_django.field
+    @strawberry_django.field(only=['interface_type', 'interface_id'], prefetch_related=['interface'])
     def interface(self) -> Annotated[Union[
         Annotated["InterfaceType", strawberry.lazy('dcim.graphql.types')],
         Annotated["VMInterfaceType", strawberry.lazy('virtualization.graphql.types')],
@@ -128,7 +128,7 @@ class IPAddressType(NetBoxObjectType, BaseIPAddressFamilyType):
     tunnel_terminations: List[Annotated["TunnelTerminationType", strawberry.lazy('vpn.graphql.types')]]
     services: List[Annotated["ServiceType", strawberry.lazy('ipam.graphql.types')]]
 
-    @strawberry_django.field
+    @strawberry_django.field(only=['assigned_object_type', 'assigned_object_id'], prefetch_related=['assigned_object'])
     def assigned_object(self) -> Annotated[Union[
         Annotated["InterfaceType", strawberry.lazy('dcim.graphql.types')],
         Annotated["FHRPGroupType", strawberry.lazy('ipam.graphql.types')],
@@ -252,7 +252,7 @@ class VLANGroupType(OrganizationalObjectType):
 
     vlans: List[VLANType]
 
-    @strawberry_django.field
+    @strawberry_django.field(only=['scope_type', 'scope_id'], prefetch_related=['scope'])
     def scope(self) -> Annotated[Union[
         Annotated["ClusterType", strawberry.lazy('virtualization.graphql.types')],
         Annotated["ClusterGroupType", strawberry.lazy('virtualization.graphql.types')],
@@ -0,0 +1,76 @@
+import netaddr
+
+__all__ = (
+    'get_free_intervals',
+    'intervals_to_ipset',
+    'iter_interval_addresses',
+    'iter_interval_cidrs',
+    'merge_intervals',
+)
+
+
+def merge_intervals(intervals):
+    """
+    Coalesce an iterable of inclusive (first, last) integer intervals, ordered by their first value, into
+    non-overlapping intervals. Overlapping and adjacent intervals are merged. Intervals are consumed lazily.
+    """
+    current_first = current_last = None
+    for first, last in intervals:
+        if current_first is None:
+            current_first, current_last = first, last
+        elif first <= current_last + 1:
+            current_last = max(current_last, last)
+        else:
+            yield current_first, current_last
+            current_first, current_last = first, last
+    if current_first is not None:
+        yield current_first, current_last
+
+
+def get_free_intervals(first, last, used_intervals):
+    """
+    Yield each inclusive (first, last) interval within the bounds [first, last] which is not covered by any of the
+    given used intervals. Used intervals must be ordered by their first value; they are consumed lazily, so that only
+    as many are evaluated as are needed to produce the free intervals consumed by the caller.
+
+    :param first: The integer value of the first address in the parent space
+    :param last: The integer value of the last address in the parent space
+    :param used_intervals: An iterable of (first, last) integer intervals, ordered by first value
+    """
+    cursor = first
+    for used_first, used_last in merge_intervals(used_intervals):
+        if used_last < cursor:
+            continue
+        if used_first > last:
+            break
+        if used_first > cursor:
+            yield cursor, used_first - 1
+        cursor = used_last + 1
+        if cursor > last:
+            return
+    if cursor <= last:
+        yield cursor, last
+
+
+def iter_interval_addresses(intervals, version):
+    """
+    Yield each individual IPAddress within the given integer intervals.
+    """
+    for first, last in intervals:
+        for value in range(first, last + 1):
+            yield netaddr.IPAddress(value, version)
+
+
+def iter_interval_cidrs(intervals, version):
+    """
+    Yield the minimal set of IPNetworks (CIDRs) spanning each of the given integer intervals.
+    """
+    for first, last in intervals:
+        yield from netaddr.iprange_to_cidrs(netaddr.IPAddress(first, version), netaddr.IPAddress(last, version))
+
+
+def intervals_to_ipset(intervals, version):
+    """
+    Return an IPSet comprising all the given integer intervals.
+    """
+    return netaddr.IPSet(iter_interval_cidrs(intervals, version))
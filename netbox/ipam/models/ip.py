@@ -1,3 +1,5 @@
+import heapq
+
 import netaddr
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.core.exceptions import ValidationError
@@ -12,6 +14,9 @@ from core.models import ObjectType
 from ipam.choices import *
 from ipam.constants import *
 from ipam.fields import IPNetworkField, IPAddressField
+from ipam.intervals import (
+    get_free_intervals, intervals_to_ipset, iter_interval_addresses, iter_interval_cidrs,
+)
 from ipam.lookups import Host
 from ipam.managers import IPAddressManager
 from ipam.querysets import PrefixQuerySet
@@ -32,9 +37,10 @@ __all__ = (
 
 class GetAvailablePrefixesMixin:
 
-    def get_available_prefixes(self):
+    def get_available_prefix_intervals(self):
         """
-        Return all available prefixes within this Aggregate or Prefix as an IPSet.
+        Yield the (first, last) integer bounds of each unallocated range within this Aggregate or Prefix, in order.
+        Child prefixes are streamed from the database in address order and consumed only as needed.
         """
         params = {
             'prefix__net_contained': str(self.prefix)
@@ -42,17 +48,30 @@ class GetAvailablePrefixesMixin:
         if hasattr(self, 'vrf'):
             params['vrf'] = self.vrf
 
-        child_prefixes = Prefix.objects.filter(**params).values_list('prefix', flat=True)
-        return netaddr.IPSet(self.prefix) - netaddr.IPSet(child_prefixes)
+        child_prefixes = Prefix.objects.filter(**params).order_by('prefix').values_list('prefix', flat=True)
+        yield from get_free_intervals(
+            self.prefix.first,
+            self.prefix.last,
+            ((prefix.first, prefix.last) for prefix in child_prefixes.iterator())
+        )
+
+    def iter_available_prefixes(self):
+        """
+        Yield each available prefix (as an IPNetwork) within this Aggregate or Prefix, in order.
+        """
+        return iter_interval_cidrs(self.get_available_prefix_intervals(), self.prefix.version)
+
+    def get_available_prefixes(self):
+        """
+        Return all available prefixes within this Aggregate or Prefix as an IPSet.
+        """
+        return intervals_to_ipset(self.get_available_prefix_intervals(), self.prefix.version)
 
     def get_first_available_prefix(self):
         """
         Return the first available child prefix within the prefix (or None).
         """
-        available_prefixes = self.get_available_prefixes()
-        if not available_prefixes:
-            return None
-        return available_prefixes.iter_cidrs()[0]
+        return next(self.iter_available_prefixes(), None)
 
 
 class RIR(OrganizationalModel):
@@ -419,44 +438,64 @@ class Prefix(ContactsMixin, GetAvailablePrefixesMixin, PrimaryModel):
         else:
             return IPAddress.objects.filter(address__net_host_contained=str(self.prefix), vrf=self.vrf)
 
-    def get_available_ips(self):
+    def get_available_ip_intervals(self):
         """
-        Return all available IPs within this prefix as an IPSet.
+        Yield the (first, last) integer bounds of each contiguous range of available IPs within this prefix, in order.
+        Child IPs and IP ranges are streamed from the database in address order and consumed only as needed, so the
+        cost of finding the first N available IPs is proportional to N rather than to the size of the prefix.
         """
         if self.mark_utilized:
-            return netaddr.IPSet()
+            return
 
-        prefix = netaddr.IPSet(self.prefix)
-        child_ips = netaddr.IPSet([ip.address.ip for ip in self.get_child_ips()])
-        child_ranges = []
-        for iprange in self.get_child_ranges():
-            child_ranges.append(iprange.range)
-        available_ips = prefix - child_ips - netaddr.IPSet(child_ranges)
+        first, last = self.prefix.first, self.prefix.last
 
         # IPv6 /127's, pool, or IPv4 /31-/32 sets are fully usable
-        if (self.family == 6 and self.prefix.prefixlen >= 127) or self.is_pool or (self.family == 4 and self.prefix.prefixlen >= 31):
-            return available_ips
-
-        if self.family == 4:
-            # For "normal" IPv4 prefixes, omit first and last addresses
-            available_ips -= netaddr.IPSet([
-                netaddr.IPAddress(self.prefix.first),
-                netaddr.IPAddress(self.prefix.last),
-            ])
-        else:
-            # For IPv6 prefixes, omit the Subnet-Router anycast address
-            # per RFC 4291
-            available_ips -= netaddr.IPSet([netaddr.IPAddress(self.prefix.first)])
-        return available_ips
+        if not (
+            (self.family == 6 and self.prefix.prefixlen >= 127) or
+            self.is_pool or
+            (self.family == 4 and self.prefix.prefixlen >= 31)
+        ):
+            if self.family == 4:
+                # For "normal" IPv4 prefixes, omit first and last addresses
+                first += 1
+                last -= 1
+            else:
+                # For IPv6 prefixes, omit the Subnet-Router anycast address
+                # per RFC 4291
+                first += 1
+
+        child_ips = self.get_child_ips().order_by(
+            Cast(Host('address'), output_field=IPAddressField())
+        ).values_list('address', flat=True)
+        child_ranges = self.get_child_ranges().order_by(
+            Cast(Host('start_address'), output_field=IPAddressField())
+        ).values_list('start_address', 'end_address')
+        used_intervals = heapq.merge(
+            ((int(address.ip), int(address.ip)) for address in child_ips.iterator()),
+            ((int(start.ip), int(end.ip)) for start, end in child_ranges.iterator()),
+        )
+        yield from get_free_intervals(first, last, used_intervals)
+
+    def iter_available_ips(self):
+        """
+        Yield each available IP (as an IPAddress) within this prefix, in order.
+        """
+        return iter_interval_addresses(self.get_available_ip_intervals(), self.family)
+
+    def get_available_ips(self):
+        """
+        Return all available IPs within this prefix as an IPSet.
+        """
+        return intervals_to_ipset(self.get_available_ip_intervals(), self.family)
 
     def get_first_available_ip(self):
         """
         Return the first available IP within the prefix (or None).
         """
-        available_ips = self.get_available_ips()
-        if not available_ips:
+        first_available_ip = next(self.iter_available_ips(), None)
+        if first_available_ip is None:
             return None
-        return '{}/{}'.format(next(available_ips.__iter__()), self.prefix.prefixlen)
+        return '{}/{}'.format(first_available_ip, self.prefix.prefixlen)
 
     def get_utilization(self):
         """
@@ -660,25 +699,42 @@ class IPRange(ContactsMixin, PrimaryModel):
             vrf=self.vrf
         )
 
+    def get_available_ip_intervals(self):
+        """
+        Yield the (first, last) integer bounds of each contiguous range of available IPs within this range, in order.
+        Child IPs are streamed from the database in address order and consumed only as needed.
+        """
+        child_ips = self.get_child_ips().order_by(
+            Cast(Host('address'), output_field=IPAddressField())
+        ).values_list('address', flat=True)
+        yield from get_free_intervals(
+            int(self.start_address.ip),
+            int(self.end_address.ip),
+            ((int(address.ip), int(address.ip)) for address in child_ips.iterator())
+        )
+
+    def iter_available_ips(self):
+        """
+        Yield each available IP (as an IPAddress) within this range, in order.
+        """
+        return iter_interval_addresses(self.get_available_ip_intervals(), self.family)
+
     def get_available_ips(self):
         """
         Return all available IPs within this range as an IPSet.
         """
-        range = netaddr.IPRange(self.start_address.ip, self.end_address.ip)
-        child_ips = netaddr.IPSet([ip.address.ip for ip in self.get_child_ips()])
-
-        return netaddr.IPSet(range) - child_ips
+        return intervals_to_ipset(self.get_available_ip_intervals(), self.family)
 
     @cached_property
     def first_available_ip(self):
         """
         Return the first available IP within the range (or None).
         """
-        available_ips = self.get_available_ips()
-        if not available_ips:
+        first_available_ip = next(self.iter_available_ips(), None)
+        if first_available_ip is None:
             return None
 
-        return '{}/{}'.format(next(available_ips.__iter__()), self.start_address.prefixlen)
+        return '{}/{}'.format(first_available_ip, self.start_address.prefixlen)
 
     @cached_property
     def utilization(self):
@@ -2,28 +2,10 @@ from django.db.models.signals import post_delete, post_save, pre_delete
 from django.dispatch import receiver
 
 from dcim.models import Device
+from netbox.context import prefixes_queue
 from virtualization.models import VirtualMachine
 from .models import IPAddress, Prefix
-
-
-def update_parents_children(prefix):
-    """
-    Update depth on prefix & containing prefixes
-    """
-    parents = prefix.get_parents(include_self=True).annotate_hierarchy()
-    for parent in parents:
-        parent._children = parent.hierarchy_children
-    Prefix.objects.bulk_update(parents, ['_children'], batch_size=100)
-
-
-def update_children_depth(prefix):
-    """
-    Update children count on prefix & contained prefixes
-    """
-    children = prefix.get_children(include_self=True).annotate_hierarchy()
-    for child in children:
-        child._depth = child.hierarchy_depth
-    Prefix.objects.bulk_update(children, ['_depth'], batch_size=100)
+from .utils import update_children_depth, update_parents_children
 
 
 @receiver(post_save, sender=Prefix)
@@ -32,6 +14,13 @@ def handle_prefix_saved(instance, created, **kwargs):
     # Prefix has changed (or new instance has been created)
     if created or instance.vrf_id != instance._vrf_id or instance.prefix != instance._prefix:
 
+        # If hierarchy maintenance is being deferred, queue the affected prefix(es) for processing
+        if (queue := prefixes_queue.get()) is not None:
+            queue[instance.vrf_id].add(instance.prefix)
+            if not created:
+                queue[instance._vrf_id].add(instance._prefix)
+            return
+
         update_parents_children(instance)
         update_children_depth(instance)
 
@@ -45,6 +34,11 @@ def handle_prefix_saved(instance, created, **kwargs):
 @receiver(post_delete, sender=Prefix)
 def handle_prefix_deleted(instance, **kwargs):
 
+    # If hierarchy maintenance is being deferred, queue the prefix for processing
+    if (queue := prefixes_queue.get()) is not None:
+        queue[instance.vrf_id].add(instance.prefix)
+        return
+
     update_parents_children(instance)
     update_children_depth(instance)
 
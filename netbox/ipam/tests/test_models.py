@@ -4,6 +4,7 @@ from netaddr import IPNetwork, IPSet
 
 from ipam.choices import *
 from ipam.models import *
+from ipam.utils import PREFIX_HIERARCHY_REBUILD_THRESHOLD, deferred_prefix_hierarchy, rebuild_prefixes
 
 
 class TestAggregate(TestCase):
@@ -159,6 +160,35 @@ class TestPrefix(TestCase):
 
         self.assertEqual(available_ips, missing_ips)
 
+    def test_iter_available_ips(self):
+
+        parent_prefix = Prefix.objects.create(prefix=IPNetwork('10.0.0.0/24'))
+        IPAddress.objects.bulk_create((
+            IPAddress(address=IPNetwork('10.0.0.200/24')),
+            IPAddress(address=IPNetwork('10.0.0.1/25')),
+            IPAddress(address=IPNetwork('10.0.0.2/32')),
+            IPAddress(address=IPNetwork('10.0.0.5/24')),
+        ))
+        IPRange.objects.create(
+            start_address=IPNetwork('10.0.0.3/24'),
+            end_address=IPNetwork('10.0.0.6/24')
+        )
+        IPRange.objects.create(
+            start_address=IPNetwork('10.0.0.4/24'),
+            end_address=IPNetwork('10.0.0.8/24')
+        )
+        available_ips = parent_prefix.iter_available_ips()
+
+        self.assertEqual(
+            [str(next(available_ips)) for _ in range(3)],
+            ['10.0.0.9', '10.0.0.10', '10.0.0.11']
+        )
+        self.assertEqual(
+            list(parent_prefix.get_available_ip_intervals()),
+            [(IPNetwork('10.0.0.9/32').first, IPNetwork('10.0.0.199/32').first),
+             (IPNetwork('10.0.0.201/32').first, IPNetwork('10.0.0.254/32').first)]
+        )
+
     def test_get_first_available_prefix(self):
 
         prefixes = Prefix.objects.bulk_create((
@@ -447,6 +477,42 @@ class TestPrefixHierarchy(TestCase):
         self.assertEqual(prefixes[3]._depth, 2)
         self.assertEqual(prefixes[3]._children, 0)
 
+    def test_deferred_prefix_hierarchy(self):
+        # Create more prefixes than can be updated incrementally
+        with deferred_prefix_hierarchy():
+            Prefix(prefix='10.0.0.0/12').save()
+            for i in range(PREFIX_HIERARCHY_REBUILD_THRESHOLD):
+                Prefix(prefix=f'10.0.{i}.0/25').save()
+            Prefix.objects.filter(prefix='10.0.0.0/16').delete()
+
+            # Hierarchy maintenance should have been deferred
+            self.assertEqual(Prefix.objects.get(prefix='10.0.0.0/8')._children, 2)
+
+        prefixes = Prefix.objects.filter(prefix__family=4)
+        self.assertEqual(prefixes[0].prefix, IPNetwork('10.0.0.0/8'))
+        self.assertEqual(prefixes[0]._depth, 0)
+        self.assertEqual(prefixes[0]._children, PREFIX_HIERARCHY_REBUILD_THRESHOLD + 2)
+        self.assertEqual(prefixes[1].prefix, IPNetwork('10.0.0.0/12'))
+        self.assertEqual(prefixes[1]._depth, 1)
+        self.assertEqual(prefixes[1]._children, PREFIX_HIERARCHY_REBUILD_THRESHOLD + 1)
+        self.assertEqual(prefixes[2].prefix, IPNetwork('10.0.0.0/24'))
+        self.assertEqual(prefixes[2]._depth, 2)
+        self.assertEqual(prefixes[2]._children, 1)
+        self.assertEqual(prefixes[3].prefix, IPNetwork('10.0.0.0/25'))
+        self.assertEqual(prefixes[3]._depth, 3)
+        self.assertEqual(prefixes[3]._children, 0)
+        self.assertEqual(prefixes[4].prefix, IPNetwork('10.0.1.0/25'))
+        self.assertEqual(prefixes[4]._depth, 2)
+        self.assertEqual(prefixes[4]._children, 0)
+
+    def test_rebuild_prefixes(self):
+        Prefix.objects.update(_depth=0, _children=0)
+        rebuild_prefixes(None)
+
+        for prefix in Prefix.objects.annotate_hierarchy():
+            self.assertEqual(prefix._depth, prefix.hierarchy_depth)
+            self.assertEqual(prefix._children, prefix.hierarchy_children)
+
 
 class TestIPAddress(TestCase):
 
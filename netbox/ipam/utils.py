@@ -1,5 +1,10 @@
+from collections import defaultdict
+from contextlib import contextmanager
+
 import netaddr
+from django.db import connection
 
+from netbox.context import prefixes_queue
 from .constants import *
 from .models import Prefix, VLAN
 
@@ -7,8 +12,11 @@ __all__ = (
     'add_available_ipaddresses',
     'add_available_vlans',
     'add_requested_prefixes',
+    'deferred_prefix_hierarchy',
     'get_next_available_prefix',
     'rebuild_prefixes',
+    'update_children_depth',
+    'update_parents_children',
 )
 
 
@@ -134,64 +142,106 @@ def add_available_vlans(vlans, vlan_group=None):
     return vlans
 
 
+# Number of changed prefixes within a VRF above which a deferred hierarchy update rebuilds the entire VRF
+PREFIX_HIERARCHY_REBUILD_THRESHOLD = 10
+
+# Recompute the depth and child count of every Prefix in a VRF (or the global table) in a single statement. Each
+# distinct prefix contributes an "open" event at its first address and a "close" event at its last address; ordering
+# these events by address, a running sum of opens minus closes yields the number of distinct prefixes enclosing each
+# prefix (its depth), while the number of (non-distinct) prefixes opened between a prefix's own open and close events
+# yields its number of children. This mirrors PrefixQuerySet.annotate_hierarchy().
+REBUILD_PREFIXES_SQL = """
+UPDATE ipam_prefix SET _depth = hierarchy.depth, _children = hierarchy.children
+FROM (
+    SELECT prefix,
+        MAX(depth) FILTER (WHERE kind = 0) - 1 AS depth,
+        MAX(opened) FILTER (WHERE kind = 1) - MAX(opened) FILTER (WHERE kind = 0) AS children
+    FROM (
+        SELECT prefix, kind, SUM(delta) OVER w AS depth, SUM(weight) OVER w AS opened
+        FROM (
+            SELECT prefix, HOST(NETWORK(prefix))::inet AS address, 0 AS kind, 1 AS delta, COUNT(*) AS weight
+            FROM ipam_prefix WHERE {vrf_filter} GROUP BY prefix
+            UNION ALL
+            SELECT DISTINCT prefix, HOST(BROADCAST(prefix))::inet, 1, -1, 0
+            FROM ipam_prefix WHERE {vrf_filter}
+        ) events
+        WINDOW w AS (
+            ORDER BY address, kind, CASE WHEN kind = 0 THEN MASKLEN(prefix) ELSE -MASKLEN(prefix) END
+            ROWS UNBOUNDED PRECEDING
+        )
+    ) running
+    GROUP BY prefix
+) hierarchy
+WHERE {vrf_filter} AND ipam_prefix.prefix = hierarchy.prefix
+    AND (ipam_prefix._depth != hierarchy.depth OR ipam_prefix._children != hierarchy.children)
+"""
+
+
 def rebuild_prefixes(vrf):
     """
     Rebuild the prefix hierarchy for all prefixes in the specified VRF (or global table).
+
+    :param vrf: The ID of the VRF, or None for the global table
     """
-    def contains(parent, child):
-        return child in parent and child != parent
-
-    def push_to_stack(prefix):
-        # Increment child count on parent nodes
-        for n in stack:
-            n['children'] += 1
-        stack.append({
-            'pk': [prefix['pk']],
-            'prefix': prefix['prefix'],
-            'children': 0,
-        })
+    if vrf is None:
+        sql, params = REBUILD_PREFIXES_SQL.format(vrf_filter='vrf_id IS NULL'), []
+    else:
+        sql, params = REBUILD_PREFIXES_SQL.format(vrf_filter='vrf_id = %s'), [vrf] * 3
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
 
-    stack = []
-    update_queue = []
-    prefixes = Prefix.objects.filter(vrf=vrf).values('pk', 'prefix')
-
-    # Iterate through all Prefixes in the VRF, growing and shrinking the stack as we go
-    for i, p in enumerate(prefixes):
-
-        # Grow the stack if this is a child of the most recent prefix
-        if not stack or contains(stack[-1]['prefix'], p['prefix']):
-            push_to_stack(p)
-
-        # Handle duplicate prefixes
-        elif stack[-1]['prefix'] == p['prefix']:
-            stack[-1]['pk'].append(p['pk'])
-
-        # If this is a sibling or parent of the most recent prefix, pop nodes from the
-        # stack until we reach a parent prefix (or the root)
-        else:
-            while stack and not contains(stack[-1]['prefix'], p['prefix']):
-                node = stack.pop()
-                for pk in node['pk']:
-                    update_queue.append(
-                        Prefix(pk=pk, _depth=len(stack), _children=node['children'])
-                    )
-            push_to_stack(p)
-
-        # Flush the update queue once it reaches 100 Prefixes
-        if len(update_queue) >= 100:
-            Prefix.objects.bulk_update(update_queue, ['_depth', '_children'])
-            update_queue = []
-
-    # Clear out any prefixes remaining in the stack
-    while stack:
-        node = stack.pop()
-        for pk in node['pk']:
-            update_queue.append(
-                Prefix(pk=pk, _depth=len(stack), _children=node['children'])
-            )
-
-    # Final flush of any remaining Prefixes
-    Prefix.objects.bulk_update(update_queue, ['_depth', '_children'])
+def update_parents_children(prefix):
+    """
+    Update depth on prefix & containing prefixes
+    """
+    parents = prefix.get_parents(include_self=True).annotate_hierarchy()
+    for parent in parents:
+        parent._children = parent.hierarchy_children
+    Prefix.objects.bulk_update(parents, ['_children'], batch_size=100)
+
+
+def update_children_depth(prefix):
+    """
+    Update children count on prefix & contained prefixes
+    """
+    children = prefix.get_children(include_self=True).annotate_hierarchy()
+    for child in children:
+        child._depth = child.hierarchy_depth
+    Prefix.objects.bulk_update(children, ['_depth'], batch_size=100)
+
+
+@contextmanager
+def deferred_prefix_hierarchy():
+    """
+    Defer maintenance of the prefix hierarchy (depth and child counts) until the end of the enclosed block, e.g. a
+    bulk import of prefixes. All created, modified, or deleted prefixes are collected by VRF while the block executes.
+    Upon its successful completion, the hierarchy of each affected VRF is rebuilt once in a single statement (or, if
+    only a handful of its prefixes have changed, updated incrementally). If an exception is raised, queued work is
+    discarded.
+
+    This should be entered within the transaction enclosing the bulk operation. Nested invocations defer to the
+    outermost block.
+    """
+    if prefixes_queue.get() is not None:
+        yield
+        return
+
+    token = prefixes_queue.set(defaultdict(set))
+    try:
+        yield
+        queue = prefixes_queue.get()
+    finally:
+        prefixes_queue.reset(token)
+
+    for vrf, prefixes in queue.items():
+        if len(prefixes) > PREFIX_HIERARCHY_REBUILD_THRESHOLD:
+            rebuild_prefixes(vrf)
+            continue
+        for prefix in prefixes:
+            prefix = Prefix(vrf_id=vrf, prefix=prefix)
+            update_parents_children(prefix)
+            update_children_depth(prefix)
 
 
 def get_next_available_prefix(ipset, prefix_size):
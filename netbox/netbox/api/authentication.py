@@ -1,11 +1,8 @@
-import logging
-
 from django.conf import settings
-from django.utils import timezone
 from rest_framework import authentication, exceptions
 from rest_framework.permissions import BasePermission, DjangoObjectPermissions, SAFE_METHODS
 
-from netbox.config import get_config
+from netbox.authentication.cache import get_cached_token, record_token_use
 from users.models import Token
 from utilities.request import get_client_ip
 
@@ -40,19 +37,13 @@ class TokenAuthentication(authentication.TokenAuthentication):
     def authenticate_credentials(self, key):
         model = self.get_model()
         try:
-            token = model.objects.prefetch_related('user').get(key=key)
+            token = get_cached_token(key, lambda: model.objects.prefetch_related('user').get(key=key))
         except model.DoesNotExist:
             raise exceptions.AuthenticationFailed("Invalid token")
 
-        # Update last used, but only once per minute at most. This reduces write load on the database
-        if not token.last_used or (timezone.now() - token.last_used).total_seconds() > 60:
-            # If maintenance mode is enabled, assume the database is read-only, and disable updating the token's
-            # last_used time upon authentication.
-            if get_config().MAINTENANCE_MODE:
-                logger = logging.getLogger('netbox.auth.login')
-                logger.debug("Maintenance mode enabled: Disabling update of token's last used timestamp")
-            else:
-                Token.objects.filter(pk=token.pk).update(last_used=timezone.now())
+        # Record the time of the token's use. This is written to the cache rather than the database, and flushed to
+        # the database periodically by the housekeeping command.
+        record_token_use(token)
 
         # Enforce the Token's expiration time, if one has been set.
         if token.is_expired:
@@ -1,7 +1,14 @@
+import base64
+import binascii
+
 from django.db.models import QuerySet
+from django.utils.translation import gettext as _
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 from netbox.config import get_config
+from utilities.counts import get_count
 
 
 class OptionalLimitOffsetPagination(LimitOffsetPagination):
@@ -9,33 +16,103 @@ class OptionalLimitOffsetPagination(LimitOffsetPagination):
     Override the stock paginator to allow setting limit=0 to disable pagination for a request. This returns all objects
     matching a query, but retains the same format as a paginated request. The limit can only be disabled if
     MAX_PAGE_SIZE has been set to 0 or None.
+
+    Two optional behaviors are also supported:
+
+        * Cursor (keyset) pagination: Passing the `cursor` query parameter (initially empty) orders objects by their
+          primary key and returns the page of objects following the given cursor. Each response's `next` link carries
+          an opaque cursor for the following page. Unlike offset-based pagination, the cost of retrieving each page
+          does not increase with its position in the result set.
+        * Omitting the count: Passing `omit_count=true` skips counting all objects matching the query. The `count`
+          attribute of the response will be null.
+
+    Where the count has been estimated (see COUNT_ESTIMATE_THRESHOLD), the `X-Count-Estimated` header is included in
+    the response.
     """
+    cursor_query_param = 'cursor'
+    omit_count_query_param = 'omit_count'
+
     def __init__(self):
         self.default_limit = get_config().PAGINATE_COUNT
 
     def paginate_queryset(self, queryset, request, view=None):
-
-        if isinstance(queryset, QuerySet):
+        self.limit = self.get_limit(request)
+        self.offset = self.get_offset(request)
+        self.request = request
+        self.cursor = self.get_cursor(request) if isinstance(queryset, QuerySet) else None
+        self.next_cursor = None
+        self.has_next = False
+        self.count_estimated = False
+
+        if self.get_omit_count(request):
+            self.count = None
+        elif isinstance(queryset, QuerySet):
             self.count = self.get_queryset_count(queryset)
         else:
             # We're dealing with an iterable, not a QuerySet
             self.count = len(queryset)
 
-        self.limit = self.get_limit(request)
-        self.offset = self.get_offset(request)
-        self.request = request
+        if self.cursor is not None:
+            return self.paginate_queryset_by_cursor(queryset)
 
-        if self.limit and self.count > self.limit and self.template is not None:
-            self.display_page_controls = True
+        if self.count is not None and not self.count_estimated:
+            if self.limit and self.count > self.limit and self.template is not None:
+                self.display_page_controls = True
 
-        if self.count == 0 or self.offset > self.count:
-            return list()
+            if self.count == 0 or self.offset > self.count:
+                return list()
 
-        if self.limit:
-            return list(queryset[self.offset:self.offset + self.limit])
-        else:
+        if not self.limit:
             return list(queryset[self.offset:])
 
+        # If the count is unknown or inexact, retrieve one additional object to determine whether a next page exists
+        if self.count is None or self.count_estimated:
+            results = list(queryset[self.offset:self.offset + self.limit + 1])
+            self.has_next = len(results) > self.limit
+            return results[:self.limit]
+
+        return list(queryset[self.offset:self.offset + self.limit])
+
+    def paginate_queryset_by_cursor(self, queryset):
+        """
+        Return the page of objects (ordered by primary key) which follows the current cursor.
+        """
+        queryset = queryset.order_by('pk')
+        if self.cursor:
+            queryset = queryset.filter(pk__gt=self.cursor)
+
+        if not self.limit:
+            return list(queryset)
+
+        # Retrieve one additional object to determine whether a next page exists
+        results = list(queryset[:self.limit + 1])
+        if len(results) > self.limit:
+            results = results[:self.limit]
+            self.next_cursor = results[-1].pk
+
+        return results
+
+    def get_cursor(self, request):
+        """
+        Decode and return the primary key encoded in the cursor query parameter. Returns zero if an empty cursor was
+        passed (indicating the first page), or None if cursor pagination has not been requested.
+        """
+        if self.cursor_query_param not in request.query_params:
+            return None
+        if not (cursor := request.query_params[self.cursor_query_param]):
+            return 0
+        try:
+            return int(base64.urlsafe_b64decode(cursor.encode()).decode())
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise NotFound(_("Invalid cursor"))
+
+    @staticmethod
+    def encode_cursor(pk):
+        return base64.urlsafe_b64encode(str(pk).encode()).decode()
+
+    def get_omit_count(self, request):
+        return request.query_params.get(self.omit_count_query_param, '').lower() in ('true', '1')
+
     def get_limit(self, request):
         if self.limit_query_param:
             try:
@@ -53,7 +130,14 @@ class OptionalLimitOffsetPagination(LimitOffsetPagination):
         return self.default_limit
 
     def get_queryset_count(self, queryset):
-        return queryset.count()
+        count, self.count_estimated = get_count(queryset)
+        return count
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if self.count_estimated:
+            response['X-Count-Estimated'] = 'true'
+        return response
 
     def get_next_link(self):
 
@@ -61,12 +145,27 @@ class OptionalLimitOffsetPagination(LimitOffsetPagination):
         if not self.limit:
             return None
 
+        # Cursor pagination
+        if self.cursor is not None:
+            if self.next_cursor is None:
+                return None
+            url = remove_query_param(self.request.build_absolute_uri(), self.offset_query_param)
+            url = replace_query_param(url, self.limit_query_param, self.limit)
+            return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_cursor))
+
+        # The total count is unknown or inexact
+        if self.count is None or self.count_estimated:
+            if not self.has_next:
+                return None
+            url = replace_query_param(self.request.build_absolute_uri(), self.limit_query_param, self.limit)
+            return replace_query_param(url, self.offset_query_param, self.offset + self.limit)
+
         return super().get_next_link()
 
     def get_previous_link(self):
 
-        # Pagination has been disabled
-        if not self.limit:
+        # Pagination has been disabled, or cursor pagination is in use (which supports moving forward only)
+        if not self.limit or self.cursor is not None:
             return None
 
         return super().get_previous_link()
@@ -82,4 +181,4 @@ class StripCountAnnotationsPaginator(OptionalLimitOffsetPagination):
         cloned_queryset = queryset.all()
         cloned_queryset.query.annotations.clear()
 
-        return cloned_queryset.count()
+        return super().get_queryset_count(cloned_queryset)
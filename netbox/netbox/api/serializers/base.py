@@ -44,7 +44,7 @@ class BaseModelSerializer(serializers.ModelSerializer):
         # identifying a related object.
         if self.nested:
             queryset = self.Meta.model.objects.all()
-            return get_related_object_by_attrs(queryset, data)
+            return get_related_object_by_attrs(queryset, data, self.context.get('related_object_resolver'))
 
         return super().to_internal_value(data)
 
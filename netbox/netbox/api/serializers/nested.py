@@ -18,7 +18,7 @@ class WritableNestedSerializer(BaseModelSerializer):
     """
     def to_internal_value(self, data):
         queryset = self.Meta.model.objects.all()
-        return get_related_object_by_attrs(queryset, data)
+        return get_related_object_by_attrs(queryset, data, self.context.get('related_object_resolver'))
 
 
 # Declared here for use by PrimaryModelSerializer, but should be imported from extras.api.nested_serializers
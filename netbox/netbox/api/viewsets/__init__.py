@@ -7,10 +7,14 @@ from django.db.models import ProtectedError, RestrictedError
 from django_pglocks import advisory_lock
 from netbox.constants import ADVISORY_LOCK_KEYS
 from rest_framework import mixins as drf_mixins
+from rest_framework.permissions import SAFE_METHODS
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
-from utilities.api import get_annotations_for_serializer, get_prefetches_for_serializer
+from dcim.utils import deferred_path_tracing
+from extras.signals import clear_events
+from ipam.utils import deferred_prefix_hierarchy
+from utilities.api import RelatedObjectResolver, get_annotations_for_serializer, get_prefetches_for_serializer
 from utilities.exceptions import AbortRequest
 from . import mixins
 
@@ -121,12 +125,39 @@ class NetBoxModelViewSet(
             obj.snapshot()
         return obj
 
+    @cached_property
+    def related_object_resolver(self):
+        """
+        Resolves the related objects referenced by objects being created or updated in bulk.
+        """
+        return RelatedObjectResolver()
+
+    def get_serializer_context(self):
+        return {
+            **super().get_serializer_context(),
+            'related_object_resolver': self.related_object_resolver,
+        }
+
     def get_serializer(self, *args, **kwargs):
         # If a list of objects has been provided, initialize the serializer with many=True
         if isinstance(kwargs.get('data', {}), list):
             kwargs['many'] = True
 
-        return super().get_serializer(*args, **kwargs)
+        serializer = super().get_serializer(*args, **kwargs)
+
+        # Resolve all related objects referenced by the list of objects at once
+        if kwargs.get('many') and 'data' in kwargs:
+            self.related_object_resolver.prefetch(serializer.child, kwargs['data'])
+
+        return serializer
+
+    def handle_exception(self, exc):
+        # Any changes made while processing the request have been rolled back, so discard any queued events and
+        # change records
+        if self.request.method not in SAFE_METHODS:
+            clear_events.send(sender=self)
+
+        return super().handle_exception(exc)
 
     def dispatch(self, request, *args, **kwargs):
         logger = logging.getLogger(f'netbox.api.views.{self.__class__.__name__}')
@@ -165,7 +196,7 @@ class NetBoxModelViewSet(
 
         # Enforce object-level permissions on save()
         try:
-            with transaction.atomic():
+            with transaction.atomic(), deferred_path_tracing(), deferred_prefix_hierarchy():
                 instance = serializer.save()
                 self._validate_objects(instance)
         except ObjectDoesNotExist:
@@ -185,7 +216,7 @@ class NetBoxModelViewSet(
 
         # Enforce object-level permissions on save()
         try:
-            with transaction.atomic():
+            with transaction.atomic(), deferred_path_tracing(), deferred_prefix_hierarchy():
                 instance = serializer.save()
                 self._validate_objects(instance)
         except ObjectDoesNotExist:
@@ -5,7 +5,9 @@ from rest_framework import status
 from rest_framework.response import Response
 
 from core.models import ObjectType
-from extras.models import ExportTemplate
+from dcim.utils import deferred_path_tracing
+from extras.models import CustomField, ExportTemplate
+from ipam.utils import deferred_prefix_hierarchy
 from netbox.api.serializers import BulkOperationSerializer
 
 __all__ = (
@@ -26,9 +28,8 @@ class CustomFieldsMixin:
         context = super().get_serializer_context()
 
         if hasattr(self.queryset.model, 'custom_fields'):
-            object_type = ObjectType.objects.get_for_model(self.queryset.model)
             context.update({
-                'custom_fields': object_type.custom_fields.all(),
+                'custom_fields': CustomField.objects.get_for_model(self.queryset.model),
             })
 
         return context
@@ -62,6 +63,9 @@ class SequentialBulkCreatesMixin:
             # Creating a single object
             return super().create(request, *args, **kwargs)
 
+        # Resolve all related objects referenced by the list of objects at once
+        self.related_object_resolver.prefetch(self.get_serializer(), request.data)
+
         return_data = []
         for data in request.data:
             serializer = self.get_serializer(data=data)
@@ -113,7 +117,10 @@ class BulkUpdateModelMixin:
         return Response(data, status=status.HTTP_200_OK)
 
     def perform_bulk_update(self, objects, update_data, partial):
-        with transaction.atomic():
+        # Resolve all related objects referenced by the updated data at once
+        self.related_object_resolver.prefetch(self.get_serializer(), list(update_data.values()))
+
+        with transaction.atomic(), deferred_path_tracing(), deferred_prefix_hierarchy():
             data_list = []
             for obj in objects:
                 data = update_data.get(obj.id)
@@ -157,7 +164,7 @@ class BulkDestroyModelMixin:
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     def perform_bulk_destroy(self, objects):
-        with transaction.atomic():
+        with transaction.atomic(), deferred_path_tracing(), deferred_prefix_hierarchy():
             for obj in objects:
                 if hasattr(obj, 'snapshot'):
                     obj.snapshot()
@@ -1,5 +1,5 @@
+import hashlib
 import logging
-from collections import defaultdict
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
@@ -12,8 +12,9 @@ from django.utils.translation import gettext_lazy as _
 from users.constants import CONSTRAINT_TOKEN_USER
 from users.models import Group, ObjectPermission
 from utilities.permissions import (
-    permission_is_exempt, qs_filter_from_constraints, resolve_permission, resolve_permission_type,
+    ObjectPermissionMap, permission_is_exempt, resolve_permission, resolve_permission_type,
 )
+from .cache import get_cached_object_permissions
 from .misc import _mirror_groups
 
 UserModel = get_user_model()
@@ -69,18 +70,34 @@ class ObjectPermissionMixin:
         if not user_obj.is_active or user_obj.is_anonymous:
             return dict()
         if not hasattr(user_obj, '_object_perm_cache'):
-            user_obj._object_perm_cache = self.get_object_permissions(user_obj)
+            user_obj._object_perm_cache = get_cached_object_permissions(
+                self.get_permission_cache_key(user_obj),
+                lambda: self.get_object_permissions(user_obj)
+            )
         return user_obj._object_perm_cache
 
     def get_permission_filter(self, user_obj):
         return Q(users=user_obj) | Q(groups__user=user_obj)
 
+    def get_permission_cache_key(self, user_obj):
+        """
+        Return a string identifying the set of ObjectPermissions which apply to the user, under which its compiled
+        permissions are cached. This must reflect any criteria (beyond the user's assignments and group memberships)
+        employed by get_permission_filter().
+        """
+        # Include the user's creation time to avoid matching a former user with the same numeric ID (e.g. following
+        # the restoration of a database)
+        key = f'{user_obj.pk}_{user_obj.date_joined.timestamp()}'
+        if settings.DEFAULT_PERMISSIONS:
+            key += f'_{hashlib.md5(repr(settings.DEFAULT_PERMISSIONS).encode()).hexdigest()}'
+        return key
+
     def get_object_permissions(self, user_obj):
         """
         Return all permissions granted to the user by an ObjectPermission.
         """
         # Initialize a dictionary mapping permission names to sets of constraints
-        perms = defaultdict(list)
+        perms = ObjectPermissionMap()
 
         # Collect any configured default permissions
         for perm_name, constraints in settings.DEFAULT_PERMISSIONS.items():
@@ -89,7 +106,7 @@ class ObjectPermissionMixin:
                 raise ImproperlyConfigured(
                     f"Constraints for default permission {perm_name} must be defined as a list or tuple."
                 )
-            perms[perm_name].extend(constraints)
+            perms.setdefault(perm_name, []).extend(constraints)
 
         # Retrieve all assigned and enabled ObjectPermissions
         object_permissions = ObjectPermission.objects.filter(
@@ -102,7 +119,7 @@ class ObjectPermissionMixin:
             for object_type in obj_perm.object_types.all():
                 for action in obj_perm.actions:
                     perm_name = f"{object_type.app_label}.{action}_{object_type.model}"
-                    perms[perm_name].extend(obj_perm.list_constraints())
+                    perms.setdefault(perm_name, []).extend(obj_perm.list_constraints())
 
         return perms
 
@@ -143,7 +160,7 @@ class ObjectPermissionMixin:
         tokens = {
             CONSTRAINT_TOKEN_USER: user_obj,
         }
-        qs_filter = qs_filter_from_constraints(object_permissions[perm], tokens)
+        qs_filter = object_permissions.get_filter(perm, tokens)
 
         # Permission to perform the requested action on the object depends on whether the specified object matches
         # the specified constraints. Note that this check is made against the *database* record representing the object,
@@ -325,6 +342,16 @@ try:
                 permission_filter = permission_filter | Q(groups__name__in=user_obj.ldap_user.group_names)
             return permission_filter
 
+        def get_permission_cache_key(self, user_obj):
+            key = super().get_permission_cache_key(user_obj)
+            if (self.settings.FIND_GROUP_PERMS and
+                    hasattr(user_obj, "ldap_user") and
+                    hasattr(user_obj.ldap_user, "group_names")):
+                # Distinguish each set of LDAP groups from which permissions are derived
+                group_names = ','.join(sorted(user_obj.ldap_user.group_names))
+                key += f'_{hashlib.md5(group_names.encode()).hexdigest()}'
+            return key
+
     # Patch with our modified _mirror_groups() method to support our custom Group model
     _LDAPUser._mirror_groups = _mirror_groups
 
@@ -0,0 +1,177 @@
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from utilities.caching import VersionedCache
+from utilities.permissions import ObjectPermissionMap
+
+__all__ = (
+    'flush_token_last_used',
+    'get_cached_object_permissions',
+    'get_cached_token',
+    'invalidate_tokens',
+    'object_permissions_cache',
+    'record_token_use',
+)
+
+# Number of seconds for which a compiled permission map is cached
+OBJECT_PERMISSIONS_CACHE_TIMEOUT = 3600
+
+# Maximum number of permission maps to retain in memory within each process
+OBJECT_PERMISSIONS_LOCAL_CACHE_SIZE = 1000
+
+# Permission maps (along with their compiled filters, which are held in memory by each process)
+object_permissions_cache = VersionedCache('object_permissions_version')
+
+# Number of seconds for which an authenticated Token is cached
+TOKEN_CACHE_TIMEOUT = 300
+
+# Token attributes which are cached: only those needed to authenticate a request. Neither the Token's key nor its User
+# (which includes the password hash) is cached.
+TOKEN_CACHE_FIELDS = ('id', 'user_id', 'expires', 'allowed_ips', 'write_enabled')
+
+# Number of seconds for which a Token is retained in memory within each process. Because tokens held in memory
+# cannot be invalidated by other processes, this must be kept short.
+TOKEN_LOCAL_CACHE_TIMEOUT = 5
+
+# Maximum number of Tokens to retain in memory within each process
+TOKEN_LOCAL_CACHE_SIZE = 1000
+
+# Minimum number of seconds between recording successive uses of a Token
+TOKEN_LAST_USED_INTERVAL = 60
+
+# Number of seconds for which the last use of a Token is retained in the cache pending its flush to the database
+TOKEN_LAST_USED_CACHE_TIMEOUT = 7 * 86400
+
+# Cached Token attributes held in memory by this process, keyed by cache key
+_local_token_cache = {}
+
+# Times at which the use of each Token was last recorded by this process, keyed by Token ID
+_token_uses_recorded = {}
+
+
+def get_cached_object_permissions(identity, compile_func):
+    """
+    Return the permission map for the given identity (a string representing a user and the set of groups through
+    which it is granted permissions). The map is retrieved from process memory or from the shared cache if a current
+    version exists in either; otherwise it is compiled by calling `compile_func()` and cached.
+
+    :param identity: A string uniquely identifying the set of ObjectPermissions which apply
+    :param compile_func: A callable which returns an ObjectPermissionMap
+    """
+    if (version := object_permissions_cache.get_version()) is None:
+        return compile_func()
+
+    # Check for a current map held in memory
+    local_cache = object_permissions_cache.get_local_data(version)
+    if identity in local_cache:
+        return local_cache[identity]
+
+    # Check for a current map in the shared cache, or compile a new one
+    cache_key = f'object_permissions_{version}_{identity}'
+    if (perms := cache.get(cache_key)) is not None:
+        perms = ObjectPermissionMap(perms)
+    else:
+        perms = compile_func()
+        # Cache only the constraints; compiled filters are retained in memory
+        cache.set(cache_key, dict(perms), OBJECT_PERMISSIONS_CACHE_TIMEOUT)
+
+    if len(local_cache) >= OBJECT_PERMISSIONS_LOCAL_CACHE_SIZE:
+        local_cache.clear()
+    local_cache[identity] = perms
+
+    return perms
+
+
+#
+# API tokens
+#
+
+def get_token_cache_key(key):
+    # Identify each Token by a hash of its key, so that plaintext keys are not exposed in the cache
+    return f'token_{hashlib.sha256(key.encode()).hexdigest()}'
+
+
+def get_token_last_used_cache_key(token_id):
+    return f'token_last_used_{token_id}'
+
+
+def get_cached_token(key, lookup_func):
+    """
+    Return the Token having the specified key. Its attributes listed in TOKEN_CACHE_FIELDS are retrieved from process
+    memory or from the shared cache if available; otherwise the Token is retrieved by calling `lookup_func()` and its
+    attributes are cached. A Token built from cached attributes retrieves its User from the database when accessed.
+    A new instance is returned on each call, so that per-request state is never shared.
+
+    :param key: The Token's plaintext key
+    :param lookup_func: A callable which returns the Token from the database (or raises DoesNotExist)
+    """
+    from users.models import Token
+
+    cache_key = get_token_cache_key(key)
+    now = time.monotonic()
+
+    # Check for the Token in memory
+    if (entry := _local_token_cache.get(cache_key)) and entry[0] > now:
+        return Token(key=key, **entry[1])
+
+    # Check for the Token in the shared cache, or retrieve it from the database
+    if (data := cache.get(cache_key)) is not None:
+        token = Token(key=key, **data)
+    else:
+        token = lookup_func()
+        data = {field: getattr(token, field) for field in TOKEN_CACHE_FIELDS}
+        cache.set(cache_key, data, TOKEN_CACHE_TIMEOUT)
+
+    if len(_local_token_cache) >= TOKEN_LOCAL_CACHE_SIZE:
+        _local_token_cache.clear()
+    _local_token_cache[cache_key] = (now + TOKEN_LOCAL_CACHE_TIMEOUT, data)
+
+    return token
+
+
+def invalidate_tokens(*keys):
+    """
+    Delete the specified Tokens (identified by their plaintext keys) from the cache.
+    """
+    cache_keys = [get_token_cache_key(key) for key in keys]
+    for cache_key in cache_keys:
+        _local_token_cache.pop(cache_key, None)
+    cache.delete_many(cache_keys)
+
+
+def record_token_use(token):
+    """
+    Record the current time as the last use of the given Token. This is written to the cache (at most once per
+    TOKEN_LAST_USED_INTERVAL seconds by each process) rather than to the database; see flush_token_last_used().
+    """
+    now = time.monotonic()
+    if now - _token_uses_recorded.get(token.pk, -TOKEN_LAST_USED_INTERVAL) < TOKEN_LAST_USED_INTERVAL:
+        return
+    if len(_token_uses_recorded) >= TOKEN_LOCAL_CACHE_SIZE:
+        _token_uses_recorded.clear()
+    _token_uses_recorded[token.pk] = now
+    cache.set(get_token_last_used_cache_key(token.pk), timezone.now(), TOKEN_LAST_USED_CACHE_TIMEOUT)
+
+
+def flush_token_last_used():
+    """
+    Update the `last_used` time of all Tokens to reflect their most recent uses recorded in the cache. Returns the
+    number of Tokens updated.
+    """
+    from users.models import Token
+
+    tokens = {
+        get_token_last_used_cache_key(token.pk): token for token in Token.objects.only('pk', 'last_used')
+    }
+    updated_tokens = []
+    for cache_key, last_used in cache.get_many(tokens.keys()).items():
+        token = tokens[cache_key]
+        if token.last_used is None or last_used > token.last_used:
+            token.last_used = last_used
+            updated_tokens.append(token)
+    Token.objects.bulk_update(updated_tokens, ['last_used'], batch_size=1000)
+
+    return len(updated_tokens)
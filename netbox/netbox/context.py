@@ -1,10 +1,18 @@
 from contextvars import ContextVar
 
 __all__ = (
+    'cablepaths_queue',
     'current_request',
     'events_queue',
+    'objectchanges_queue',
+    'prefixes_queue',
+    'search_queue',
 )
 
 
 current_request = ContextVar('current_request', default=None)
 events_queue = ContextVar('events_queue', default=dict())
+objectchanges_queue = ContextVar('objectchanges_queue', default=None)
+cablepaths_queue = ContextVar('cablepaths_queue', default=None)
+prefixes_queue = ContextVar('prefixes_queue', default=None)
+search_queue = ContextVar('search_queue', default=None)
@@ -0,0 +1,138 @@
+import logging
+import time
+
+from django.db import connection
+from graphql import GraphQLError
+from graphql.language import FieldNode, FragmentSpreadNode, InlineFragmentNode, OperationType
+from graphql.type import get_named_type, get_nullable_type, is_abstract_type, is_list_type
+from graphql.validation import ValidationRule
+from prometheus_client import Histogram
+from strawberry.extensions import AddValidationRules, SchemaExtension
+from strawberry.extensions.utils import is_introspection_key
+
+__all__ = (
+    'QueryCostLimiter',
+    'QueryMetrics',
+)
+
+# Factor by which the cost of each field returning a list is multiplied, as an estimate of the number of list items
+LIST_COST_FACTOR = 10
+
+QUERY_DURATION = Histogram(
+    'netbox_graphql_query_duration_seconds',
+    'Time spent executing GraphQL operations',
+)
+QUERY_DB_QUERIES = Histogram(
+    'netbox_graphql_query_db_queries',
+    'Number of database queries executed per GraphQL operation',
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float('inf')),
+)
+
+
+class QueryCostRule(ValidationRule):
+    """
+    Estimate the cost of each operation and report an error if it exceeds the maximum cost. Each field costs one point,
+    plus the cost of its selections; the cost of a field which returns a list is multiplied by LIST_COST_FACTOR.
+    """
+    max_cost = None
+
+    def enter_operation_definition(self, node, *args):
+        schema = self.context.schema
+        root_type = {
+            OperationType.QUERY: schema.query_type,
+            OperationType.MUTATION: schema.mutation_type,
+            OperationType.SUBSCRIPTION: schema.subscription_type,
+        }.get(node.operation)
+        if root_type is None:
+            return
+
+        cost = self.get_cost(node.selection_set, root_type)
+        if cost > self.max_cost:
+            name = node.name.value if node.name else 'anonymous'
+            self.report_error(GraphQLError(
+                f"Operation '{name}' has an estimated cost of {cost}, which exceeds the maximum of {self.max_cost}.",
+                node
+            ))
+
+    def get_cost(self, selection_set, parent_type, fragments=frozenset()):
+        """
+        Return the estimated cost of a selection set on the given type. Fragments which apply only to particular types
+        of an abstract (interface or union) type are mutually exclusive, so only the most expensive is counted.
+        """
+        schema = self.context.schema
+        cost = 0
+        conditional_costs = [0]
+
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                if is_introspection_key(selection.name.value):
+                    continue
+                field = getattr(parent_type, 'fields', {}).get(selection.name.value)
+                if field is None:
+                    # Unknown fields are reported by other validation rules
+                    continue
+                field_type = get_nullable_type(field.type)
+                factor = LIST_COST_FACTOR if is_list_type(field_type) else 1
+                field_cost = 1
+                if selection.selection_set:
+                    field_cost += self.get_cost(selection.selection_set, get_named_type(field_type), fragments)
+                cost += factor * field_cost
+                continue
+
+            # Resolve the selection set and type condition of an inline fragment or fragment spread
+            if isinstance(selection, InlineFragmentNode):
+                fragment = selection
+                seen = fragments
+            elif isinstance(selection, FragmentSpreadNode) and selection.name.value not in fragments:
+                fragment = self.context.get_fragment(selection.name.value)
+                if fragment is None:
+                    continue
+                seen = fragments | {selection.name.value}
+            else:
+                continue
+            fragment_type = schema.get_type(fragment.type_condition.name.value) if fragment.type_condition else None
+
+            if fragment_type is None or fragment_type is parent_type:
+                cost += self.get_cost(fragment.selection_set, parent_type, seen)
+            elif is_abstract_type(parent_type):
+                conditional_costs.append(self.get_cost(fragment.selection_set, fragment_type, seen))
+            else:
+                cost += self.get_cost(fragment.selection_set, fragment_type, seen)
+
+        return cost + max(conditional_costs)
+
+
+class QueryCostLimiter(AddValidationRules):
+    """
+    Reject any GraphQL operation with an estimated cost (see QueryCostRule) greater than the specified maximum.
+    """
+    def __init__(self, max_cost):
+        rule = type('QueryCostRule', (QueryCostRule,), {'max_cost': max_cost})
+        super().__init__([rule])
+
+
+class QueryMetrics(SchemaExtension):
+    """
+    Record the duration of, and the number of database queries executed by, each GraphQL operation.
+    """
+    def on_operation(self):
+        queries = 0
+
+        def count_queries(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        start = time.monotonic()
+        with connection.execute_wrapper(count_queries):
+            yield
+        duration = time.monotonic() - start
+
+        QUERY_DURATION.observe(duration)
+        QUERY_DB_QUERIES.observe(queries)
+
+        logger = logging.getLogger('netbox.graphql')
+        logger.debug(
+            f"Executed GraphQL operation {self.execution_context.operation_name or '(anonymous)'} in "
+            f"{duration:.3f}s with {queries} database queries"
+        )
@@ -1,5 +1,7 @@
 import strawberry
+from django.conf import settings
 from strawberry_django.optimizer import DjangoOptimizerExtension
+from strawberry.extensions import QueryDepthLimiter
 from strawberry.schema.config import StrawberryConfig
 
 from circuits.graphql.schema import CircuitsQuery
@@ -7,6 +9,7 @@ from core.graphql.schema import CoreQuery
 from dcim.graphql.schema import DCIMQuery
 from extras.graphql.schema import ExtrasQuery
 from ipam.graphql.schema import IPAMQuery
+from netbox.graphql.extensions import QueryCostLimiter, QueryMetrics
 from netbox.registry import registry
 from tenancy.graphql.schema import TenancyQuery
 from users.graphql.schema import UsersQuery
@@ -32,10 +35,26 @@ class Query(
     pass
 
 
+def get_extensions():
+    """
+    Return the extensions to be employed by the GraphQL schema, including any configured query limits.
+    """
+    extensions = [
+        QueryMetrics,
+        # Batch the retrieval of related objects, applying each type's get_queryset() (which enforces object
+        # permissions) to the prefetched querysets
+        DjangoOptimizerExtension(prefetch_custom_queryset=True),
+    ]
+    if settings.GRAPHQL_MAX_QUERY_DEPTH:
+        extensions.append(QueryDepthLimiter(max_depth=settings.GRAPHQL_MAX_QUERY_DEPTH))
+    if settings.GRAPHQL_MAX_QUERY_COST:
+        extensions.append(QueryCostLimiter(max_cost=settings.GRAPHQL_MAX_QUERY_COST))
+
+    return extensions
+
+
 schema = strawberry.Schema(
     query=Query,
     config=StrawberryConfig(auto_camel_case=False),
-    extensions=[
-        DjangoOptimizerExtension,
-    ]
+    extensions=get_extensions()
 )
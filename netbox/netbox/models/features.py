@@ -242,11 +242,9 @@ class CustomFieldsMixin(models.Model):
         """
         from extras.models import CustomField
         groups = defaultdict(dict)
-        visible_custom_fields = CustomField.objects.get_for_model(self).exclude(
-            ui_visible=CustomFieldUIVisibleChoices.HIDDEN
-        )
-
-        for cf in visible_custom_fields:
+        for cf in CustomField.objects.get_for_model(self):
+            if cf.ui_visible == CustomFieldUIVisibleChoices.HIDDEN:
+                continue
             value = self.custom_field_data.get(cf.name)
             if value in (None, '', []) and cf.ui_visible == CustomFieldUIVisibleChoices.IF_SET:
                 continue
@@ -89,6 +89,27 @@ class SearchIndex:
     def get_category(cls):
         return cls.category or cls.model._meta.app_config.verbose_name
 
+    @classmethod
+    def get_queryset(cls):
+        """
+        Return a queryset of all objects to be indexed, selecting any related objects referenced by indexed fields
+        (to avoid querying for each object individually when calling to_cache()).
+        """
+        related_fields = []
+        for name, _ in cls.fields:
+            try:
+                field = cls.model._meta.get_field(name)
+            except FieldDoesNotExist:
+                continue
+            if field.many_to_one or field.one_to_one:
+                related_fields.append(name)
+
+        queryset = cls.model.objects.all()
+        if related_fields:
+            queryset = queryset.select_related(*related_fields)
+
+        return queryset
+
     @classmethod
     def to_cache(cls, instance, custom_fields=None):
         """
@@ -1,27 +1,155 @@
 from collections import defaultdict
 
+from django.apps import apps
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ImproperlyConfigured
-from django.db.models import F, Window, Q, prefetch_related_objects
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramSimilarity
+from django.db import connection, transaction
+from django.db.models import F, FloatField, OuterRef, Q, Subquery, Value, Window, prefetch_related_objects
 from django.db.models.fields.related import ForeignKey
 from django.db.models.functions import window
 from django.db.models.signals import post_delete, post_save
+from django.utils.functional import cached_property
 from django.utils.module_loading import import_string
+from django_rq import get_queue
 import netaddr
 from netaddr.core import AddrFormatError
 
 from core.models import ObjectType
 from extras.models import CachedValue, CustomField
+from netbox.constants import RQ_QUEUE_DEFAULT
+from netbox.context import search_queue
 from netbox.registry import registry
+from utilities.counts import is_unfiltered
 from utilities.object_types import object_type_identifier
 from utilities.querysets import RestrictedPrefetch
+from utilities.rqworker import get_rq_retry
 from utilities.string import title
 from . import FieldTypes, LookupTypes, get_indexer
 
 DEFAULT_LOOKUP_TYPE = LookupTypes.PARTIAL
 MAX_RESULTS = 1000
 
+# PostgreSQL text search configuration used to rank results where trigram matching is not available
+SEARCH_CONFIG = 'simple'
+
+# Number of search results to retrieve at a time when iterating over SearchResults
+RESULTS_CHUNK_SIZE = 100
+
+# Maximum number of objects to be cached by each background task when SEARCH_CACHE_ASYNC is enabled
+CACHE_JOB_MAX_OBJECTS = 1000
+
+
+def enqueue_object(queue, instance):
+    """
+    Queue an indexed object to have its cached values updated (or removed, if it has been deleted). Each object is
+    queued only once, regardless of how many times it is changed.
+    """
+    try:
+        get_indexer(instance)
+    except KeyError:
+        return
+    queue[instance._meta.label_lower].add(instance.pk)
+
+
+def flush_search_queue(queue):
+    """
+    Enqueue background tasks to update the cached values of all queued objects. Objects are divided among tasks of no
+    more than CACHE_JOB_MAX_OBJECTS each.
+    """
+    rq_queue = get_queue(RQ_QUEUE_DEFAULT)
+
+    for model_label, object_ids in queue.items():
+        object_ids = sorted(object_ids)
+        for i in range(0, len(object_ids), CACHE_JOB_MAX_OBJECTS):
+            rq_queue.enqueue(
+                "netbox.search.backends.refresh_cache",
+                model_label=model_label,
+                object_ids=object_ids[i:i + CACHE_JOB_MAX_OBJECTS],
+                retry=get_rq_retry()
+            )
+
+
+def prepare_results(results, user=None):
+    """
+    Prefetch the object referenced by each of the given CachedValues (omitting any which the user does not have
+    permission to view), along with any related objects necessary to render the prescribed display attributes
+    (display_attrs) of each result. Return a list of the results with each object's name assigned.
+    """
+    # Construct a Prefetch to pre-fetch only those related objects for which the
+    # user has permission to view.
+    if user:
+        prefetch = (RestrictedPrefetch('object', user, 'view'), 'object_type')
+    else:
+        prefetch = ('object', 'object_type')
+    prefetch_related_objects(results, *prefetch)
+
+    # Iterate through each ObjectType represented in the search results and prefetch any
+    # related objects necessary to render the prescribed display attributes (display_attrs).
+    for object_type in {r.object_type for r in results}:
+        model = object_type.model_class()
+        indexer = registry['search'].get(object_type_identifier(object_type))
+        if not (display_attrs := getattr(indexer, 'display_attrs', None)):
+            continue
+
+        # Add ForeignKey fields to prefetch list
+        prefetch_fields = []
+        for attr in display_attrs:
+            field = model._meta.get_field(attr)
+            if type(field) is ForeignKey:
+                prefetch_fields.append(f'object__{attr}')
+
+        # Compile a list of all CachedValues referencing this object type, and prefetch
+        # any related objects
+        if prefetch_fields:
+            objects = [r for r in results if r.object_type == object_type]
+            prefetch_related_objects(objects, *prefetch_fields)
+
+    # Omit any results pertaining to an object the user does not have permission to view
+    ret = []
+    for r in results:
+        if r.object is not None:
+            r.name = str(r.object)
+            ret.append(r)
+
+    return ret
+
+
+class SearchResults:
+    """
+    An ordered sequence of search results which is evaluated lazily: only the number of results, and the results
+    within a requested slice (e.g. a page of a table), are retrieved from the database.
+
+    :param queryset: A QuerySet of CachedValues, comprising one result per object, in order of relevance
+    :param user: The user performing the search (if any)
+    """
+    def __init__(self, queryset, user=None):
+        self.queryset = queryset
+        self.user = user
+        self._count = None
+
+    def __len__(self):
+        if self._count is None:
+            self._count = self.queryset.count()
+        return self._count
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return prepare_results(list(self.queryset[key]), self.user)
+        if key < 0:
+            key += len(self)
+        if key < 0 or not (results := prepare_results(list(self.queryset[key:key + 1]), self.user)):
+            raise IndexError("Search result index out of range")
+        return results[0]
+
+    def __iter__(self):
+        for offset in range(0, len(self), RESULTS_CHUNK_SIZE):
+            yield from self[offset:offset + RESULTS_CHUNK_SIZE]
+
 
 class SearchBackend:
     """
@@ -59,14 +187,22 @@ class SearchBackend:
 
     def caching_handler(self, sender, instance, created, **kwargs):
         """
-        Receiver for the post_save signal, responsible for caching object creation/changes.
+        Receiver for the post_save signal, responsible for caching object creation/changes. If a search queue is
+        active, the object is queued for caching in the background.
         """
+        if (queue := search_queue.get()) is not None:
+            enqueue_object(queue, instance)
+            return
         self.cache(instance, remove_existing=not created)
 
     def removal_handler(self, sender, instance, **kwargs):
         """
-        Receiver for the post_delete signal, responsible for caching object deletion.
+        Receiver for the post_delete signal, responsible for caching object deletion. If a search queue is active,
+        the object is queued for removal in the background.
         """
+        if (queue := search_queue.get()) is not None:
+            enqueue_object(queue, instance)
+            return
         self.remove(instance)
 
     def cache(self, instances, indexer=None, remove_existing=True):
@@ -81,6 +217,20 @@ class SearchBackend:
         """
         raise NotImplementedError
 
+    def refresh(self, model, object_ids):
+        """
+        Update the cached representations of the specified objects to reflect their current state, removing those of
+        any objects which no longer exist.
+        """
+        raise NotImplementedError
+
+    def get_stale_objects(self, model):
+        """
+        Return the IDs of all objects of the given model whose cached representations are missing or outdated, or
+        which have been cached but no longer exist.
+        """
+        raise NotImplementedError
+
     def clear(self, object_types=None):
         """
         Delete *all* cached data (optionally filtered by object type).
@@ -104,9 +254,10 @@ class SearchBackend:
 
 class CachedValueSearchBackend(SearchBackend):
 
-    def search(self, value, user=None, object_types=None, lookup=DEFAULT_LOOKUP_TYPE):
-
-        # Build the filter used to find relevant CachedValue records
+    def get_query_filter(self, value, object_types=None, lookup=DEFAULT_LOOKUP_TYPE):
+        """
+        Return a Q object matching the CachedValue records relevant to a search.
+        """
         query_filter = Q(**{f'value__{lookup}': value})
         if object_types:
             # Limit results by object type
@@ -122,6 +273,13 @@ class CachedValueSearchBackend(SearchBackend):
             except (AddrFormatError, ValueError):
                 pass
 
+        return query_filter
+
+    def search(self, value, user=None, object_types=None, lookup=DEFAULT_LOOKUP_TYPE):
+
+        # Build the filter used to find relevant CachedValue records
+        query_filter = self.get_query_filter(value, object_types, lookup)
+
         # Construct the base queryset to retrieve matching results
         queryset = CachedValue.objects.filter(query_filter).annotate(
             # Annotate the rank of each result for its object according to its weight
@@ -132,56 +290,15 @@ class CachedValueSearchBackend(SearchBackend):
             )
         )[:MAX_RESULTS]
 
-        # Gather all ObjectTypes present in the search results (used for prefetching related
-        # objects). This must be done before generating the final results list, which returns
-        # a RawQuerySet.
-        object_type_ids = set(queryset.values_list('object_type', flat=True))
-        object_types = ObjectType.objects.filter(pk__in=object_type_ids)
-
-        # Construct a Prefetch to pre-fetch only those related objects for which the
-        # user has permission to view.
-        if user:
-            prefetch = (RestrictedPrefetch('object', user, 'view'), 'object_type')
-        else:
-            prefetch = ('object', 'object_type')
-
         # Wrap the base query to return only the lowest-weight result for each object
         # Hat-tip to https://blog.oyam.dev/django-filter-by-window-function/ for the solution
         sql, params = queryset.query.sql_with_params()
-        results = CachedValue.objects.prefetch_related(*prefetch).raw(
+        results = CachedValue.objects.raw(
             f"SELECT * FROM ({sql}) t WHERE row_number = 1",
             params
         )
 
-        # Iterate through each ObjectType represented in the search results and prefetch any
-        # related objects necessary to render the prescribed display attributes (display_attrs).
-        for object_type in object_types:
-            model = object_type.model_class()
-            indexer = registry['search'].get(object_type_identifier(object_type))
-            if not (display_attrs := getattr(indexer, 'display_attrs', None)):
-                continue
-
-            # Add ForeignKey fields to prefetch list
-            prefetch_fields = []
-            for attr in display_attrs:
-                field = model._meta.get_field(attr)
-                if type(field) is ForeignKey:
-                    prefetch_fields.append(f'object__{attr}')
-
-            # Compile a list of all CachedValues referencing this object type, and prefetch
-            # any related objects
-            if prefetch_fields:
-                objects = [r for r in results if r.object_type == object_type]
-                prefetch_related_objects(objects, *prefetch_fields)
-
-        # Omit any results pertaining to an object the user does not have permission to view
-        ret = []
-        for r in results:
-            if r.object is not None:
-                r.name = str(r.object)
-                ret.append(r)
-
-        return ret
+        return prepare_results(list(results), user)
 
     def cache(self, instances, indexer=None, remove_existing=True):
         object_type = None
@@ -205,9 +322,11 @@ class CachedValueSearchBackend(SearchBackend):
                     except KeyError:
                         break
 
-                # Prefetch any associated custom fields
+                # Retrieve any associated custom fields
                 object_type = ObjectType.objects.get_for_model(indexer.model)
-                custom_fields = CustomField.objects.filter(object_types=object_type).exclude(search_weight=0)
+                custom_fields = [
+                    cf for cf in CustomField.objects.get_for_model(indexer.model) if cf.search_weight
+                ]
 
             # Wipe out any previously cached values for the object
             if remove_existing:
@@ -250,6 +369,37 @@ class CachedValueSearchBackend(SearchBackend):
         # Call _raw_delete() on the queryset to avoid first loading instances into memory
         return qs._raw_delete(using=qs.db)
 
+    def refresh(self, model, object_ids):
+        try:
+            indexer = get_indexer(model)
+        except KeyError:
+            return 0
+
+        ct = ContentType.objects.get_for_model(model)
+        with transaction.atomic():
+            qs = CachedValue.objects.filter(object_type=ct, object_id__in=object_ids)
+            qs._raw_delete(using=qs.db)
+            return self.cache(indexer.get_queryset().filter(pk__in=object_ids), indexer=indexer, remove_existing=False)
+
+    def get_stale_objects(self, model):
+        ct = ContentType.objects.get_for_model(model)
+        cached_values = CachedValue.objects.filter(object_type=ct)
+
+        # Find objects which have not been cached since they were last updated
+        last_cached = cached_values.filter(object_id=OuterRef('pk')).order_by('-timestamp').values('timestamp')[:1]
+        objects = model.objects.annotate(last_cached=Subquery(last_cached))
+        query_filter = Q(last_cached__isnull=True)
+        if any(field.name == 'last_updated' for field in model._meta.concrete_fields):
+            query_filter |= Q(last_updated__gt=F('last_cached'))
+        stale_ids = set(objects.filter(query_filter).values_list('pk', flat=True))
+
+        # Find cached objects which no longer exist
+        stale_ids.update(
+            cached_values.exclude(object_id__in=model.objects.values('pk')).values_list('object_id', flat=True)
+        )
+
+        return sorted(stale_ids)
+
     def clear(self, object_types=None):
         qs = CachedValue.objects.all()
         if object_types:
@@ -269,6 +419,92 @@ class CachedValueSearchBackend(SearchBackend):
         return CachedValue.objects.count()
 
 
+class RankedSearchBackend(CachedValueSearchBackend):
+    """
+    A search backend which ranks results by relevance, and paginates them within the database rather than retrieving
+    a fixed maximum number of results. Objects are matched using the same cached values as CachedValueSearchBackend.
+
+    Results are ordered first by the weight (as assigned by the indexer) of each object's most relevant matching
+    field, and then by the similarity of its value to the query. Similarity is measured using trigrams if the pg_trgm
+    PostgreSQL extension is installed (which also enables the indexing of partial matches); otherwise, using
+    full-text search ranking.
+    """
+    @cached_property
+    def trigrams_enabled(self):
+        """
+        Return True if the pg_trgm PostgreSQL extension has been installed.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT EXISTS(SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')")
+            return cursor.fetchone()[0]
+
+    def get_rank(self, value, lookup=DEFAULT_LOOKUP_TYPE):
+        """
+        Return an expression representing the similarity of each matching CachedValue to the search value.
+        """
+        if lookup == LookupTypes.REGEX:
+            return Value(0.0, output_field=FloatField())
+        if self.trigrams_enabled:
+            return TrigramSimilarity('value', value)
+        return SearchRank(
+            SearchVector('value', config=SEARCH_CONFIG),
+            SearchQuery(value, config=SEARCH_CONFIG)
+        )
+
+    def get_permission_filter(self, user, object_types=None):
+        """
+        Return a Q object limiting CachedValues to those which reference objects the user has permission to view.
+        """
+        if not object_types:
+            models = [indexer.model for indexer in registry['search'].values()]
+            object_types = ContentType.objects.get_for_models(*models).values()
+
+        permitted_types = []
+        query_filter = Q(pk__in=[])
+        for object_type in object_types:
+            if (model := object_type.model_class()) is None:
+                continue
+            queryset = model.objects.restrict(user, 'view')
+            if queryset.query.is_empty():
+                continue
+            if is_unfiltered(queryset):
+                permitted_types.append(object_type.pk)
+            else:
+                # Permission constraints apply; match only the permitted objects
+                query_filter |= Q(object_type=object_type, object_id__in=queryset.values('pk'))
+
+        if permitted_types:
+            query_filter |= Q(object_type__in=permitted_types)
+
+        return query_filter
+
+    def search(self, value, user=None, object_types=None, lookup=DEFAULT_LOOKUP_TYPE):
+
+        # Build the filter used to find relevant CachedValue records
+        query_filter = self.get_query_filter(value, object_types, lookup)
+        if user:
+            query_filter &= self.get_permission_filter(user, object_types)
+        rank = self.get_rank(value, lookup)
+
+        # Select the most relevant match for each object
+        matches = CachedValue.objects.filter(query_filter).annotate(rank=rank).order_by(
+            'object_type', 'object_id', 'weight', '-rank'
+        ).distinct(
+            'object_type', 'object_id'
+        )
+
+        # Order the results by relevance
+        queryset = CachedValue.objects.filter(
+            pk__in=matches.values('pk')
+        ).annotate(
+            rank=rank
+        ).order_by(
+            'weight', '-rank', 'object_type', 'object_id'
+        )
+
+        return SearchResults(queryset, user)
+
+
 def get_backend():
     """
     Initializes and returns the configured search backend.
@@ -284,6 +520,14 @@ def get_backend():
 
 search_backend = get_backend()
 
+
+def refresh_cache(model_label, object_ids):
+    """
+    Background task to update the cached values of the specified objects.
+    """
+    return search_backend.refresh(apps.get_model(model_label), object_ids)
+
+
 # Connect handlers to the appropriate model signals
 post_save.connect(search_backend.caching_handler)
 post_delete.connect(search_backend.removal_handler)
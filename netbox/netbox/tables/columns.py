@@ -489,7 +489,26 @@ class CustomFieldColumn(tables.Column):
             return f'<a href="{item.get_absolute_url()}">{escape(item)}</a>'
         return escape(item)
 
-    def render(self, value):
+    def _prefetch_related_objects(self, table):
+        """
+        Retrieve the objects referenced by all object and multi-object custom field columns for the entire page of
+        records being rendered at once (rather than for each record individually).
+        """
+        columns = [
+            bound_column.column for bound_column in table.columns.iterall()
+            if isinstance(bound_column.column, CustomFieldColumn)
+        ]
+        for column in columns:
+            column._related_objects_prefetched = True
+        if page := getattr(table, 'page', None):
+            self.customfield.prefetch_related_objects(
+                [column.customfield for column in columns],
+                [getattr(record, 'custom_field_data', None) or {} for record in page.object_list]
+            )
+
+    def render(self, value, table):
+        if not getattr(self, '_related_objects_prefetched', False):
+            self._prefetch_related_objects(table)
         if self.customfield.type == CustomFieldTypeChoices.TYPE_BOOLEAN and value is True:
             return mark_safe('<i class="mdi mdi-check-bold text-success"></i>')
         if self.customfield.type == CustomFieldTypeChoices.TYPE_BOOLEAN and value is False:
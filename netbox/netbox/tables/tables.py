@@ -8,9 +8,11 @@ from django.core.exceptions import FieldDoesNotExist
 from django.db.models.fields.related import RelatedField
 from django.urls import reverse
 from django.urls.exceptions import NoReverseMatch
+from django.utils.encoding import force_str
 from django.utils.safestring import mark_safe
 from django.utils.translation import gettext_lazy as _
-from django_tables2.data import TableQuerysetData
+from django_tables2.data import TableListData, TableQuerysetData
+from django_tables2.rows import BoundRow
 
 from core.models import ObjectType
 from extras.choices import *
@@ -18,8 +20,10 @@ from extras.models import CustomField, CustomLink
 from netbox.constants import EMPTY_TABLE_TEXT
 from netbox.registry import registry
 from netbox.tables import columns
+from utilities.counts import get_count
 from utilities.paginator import EnhancedPaginator, get_paginate_count
 from utilities.html import highlight
+from utilities.streaming import EXPORT_CHUNK_SIZE
 from utilities.string import title
 from utilities.views import get_viewname
 from .template_code import *
@@ -140,9 +144,39 @@ class BaseTable(tables.Table):
         prefixes/IP addresses/etc., where some table rows may represent available address space.
         """
         if not hasattr(self, '_objects_count'):
-            self._objects_count = sum(1 for obj in self.data if hasattr(obj, 'pk'))
+            if isinstance(self.data, TableQuerysetData):
+                # Every row of a QuerySet-backed table represents an object, so count them in the database
+                self._objects_count, _ = get_count(self.data.data)
+            else:
+                self._objects_count = sum(1 for obj in self.data if hasattr(obj, 'pk'))
         return self._objects_count
 
+    def iter_values(self, exclude_columns=None, chunk_size=EXPORT_CHUNK_SIZE):
+        """
+        Return a row iterator of the table's data, with the first row containing the column headers. Equivalent to
+        as_values(), except that if the table is backed by a QuerySet, its objects are streamed from the database
+        in chunks rather than all being loaded into memory at once.
+
+        :param exclude_columns: An iterable of column names to exclude
+        :param chunk_size: The number of objects to retrieve from the database at a time
+        """
+        exclude_columns = exclude_columns or ()
+        columns = [
+            column for column in self.columns.iterall()
+            if not (column.column.exclude_from_export or column.name in exclude_columns)
+        ]
+        yield [force_str(column.header, strings_only=True) for column in columns]
+
+        if isinstance(self.data, TableQuerysetData):
+            records = self.data.data.iterator(chunk_size=chunk_size)
+        else:
+            records = self.data
+        for record in records:
+            row = BoundRow(record, table=self)
+            yield [
+                force_str(row.get_cell_value(column.name), strings_only=True) for column in columns
+            ]
+
     def configure(self, request):
         """
         Configure the table for a specific request context. This performs pagination and records
@@ -207,11 +241,10 @@ class NetBoxTable(BaseTable):
 
         # Add custom field & custom link columns
         object_type = ObjectType.objects.get_for_model(self._meta.model)
-        custom_fields = CustomField.objects.filter(
-            object_types=object_type
-        ).exclude(ui_visible=CustomFieldUIVisibleChoices.HIDDEN)
+        custom_fields = CustomField.objects.get_for_model(self._meta.model)
         extra_columns.extend([
-            (f'cf_{cf.name}', columns.CustomFieldColumn(cf)) for cf in custom_fields
+            (f'cf_{cf.name}', columns.CustomFieldColumn(cf))
+            for cf in custom_fields if cf.ui_visible != CustomFieldUIVisibleChoices.HIDDEN
         ])
         custom_links = CustomLink.objects.filter(object_types=object_type, enabled=True)
         extra_columns.extend([
@@ -265,6 +298,11 @@ class SearchTable(tables.Table):
 
     def __init__(self, data, highlight=None, **kwargs):
         self.highlight = highlight
+        # Results which are evaluated lazily (e.g. by RankedSearchBackend) are retrieved one page at a time, and
+        # retain the order in which they were ranked
+        if not isinstance(data, list):
+            data = TableListData(data)
+            kwargs.setdefault('orderable', False)
         super().__init__(data, **kwargs)
 
     def render_field(self, value, record):
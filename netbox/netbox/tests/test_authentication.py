@@ -2,6 +2,7 @@ import datetime
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import Client
 from django.test.utils import override_settings
 from django.urls import reverse
@@ -11,6 +12,7 @@ from rest_framework.test import APIClient
 from core.models import ObjectType
 from dcim.models import Site
 from ipam.models import Prefix
+from netbox.authentication.cache import flush_token_last_used, get_cached_token, get_token_cache_key
 from users.models import Group, ObjectPermission, Token
 from utilities.testing import TestCase
 from utilities.testing.api import APITestCase
@@ -34,10 +36,71 @@ class TokenAuthenticationTestCase(APITestCase):
         response = self.client.get(url, HTTP_AUTHORIZATION=f'Token {token.key}')
         self.assertEqual(response.status_code, 200)
 
-        # Check that the token's last_used time has been updated
+        # Check that the token's last_used time has been updated once flushed to the database
+        token.refresh_from_db()
+        self.assertIsNone(token.last_used)
+        flush_token_last_used()
         token.refresh_from_db()
         self.assertIsNotNone(token.last_used)
 
+    @override_settings(LOGIN_REQUIRED=True, EXEMPT_VIEW_PERMISSIONS=['*'])
+    def test_token_cache_invalidation(self):
+        url = reverse('dcim-api:site-list')
+        token = Token.objects.create(user=self.user)
+        response = self.client.get(url, HTTP_AUTHORIZATION=f'Token {token.key}')
+        self.assertEqual(response.status_code, 200)
+
+        # Deactivating the user should invalidate its cached tokens
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(url, HTTP_AUTHORIZATION=f'Token {token.key}')
+        self.assertEqual(response.status_code, 403)
+
+        # A deleted token should no longer be accepted
+        self.user.is_active = True
+        self.user.save()
+        token.delete()
+        response = self.client.get(url, HTTP_AUTHORIZATION=f'Token {token.key}')
+        self.assertEqual(response.status_code, 403)
+
+    @override_settings(LOGIN_REQUIRED=True, EXEMPT_VIEW_PERMISSIONS=['*'])
+    def test_token_cache_contents(self):
+        url = reverse('dcim-api:site-list')
+        token = Token.objects.create(user=self.user, write_enabled=False)
+        response = self.client.get(url, HTTP_AUTHORIZATION=f'Token {token.key}')
+        self.assertEqual(response.status_code, 200)
+
+        # Neither the Token's key nor its User should be cached
+        data = cache.get(get_token_cache_key(token.key))
+        self.assertEqual(set(data), {'id', 'user_id', 'expires', 'allowed_ips', 'write_enabled'})
+        self.assertEqual(data['id'], token.pk)
+        self.assertEqual(data['user_id'], self.user.pk)
+        self.assertFalse(data['write_enabled'])
+
+        # A Token built from the cached attributes should retrieve its User
+        cached_token = get_cached_token(token.key, Token.objects.none().get)
+        self.assertEqual(cached_token.key, token.key)
+        self.assertEqual(cached_token.user, self.user)
+
+    @override_settings(LOGIN_REQUIRED=True, EXEMPT_VIEW_PERMISSIONS=['*'])
+    def test_token_cache_invalidation_on_commit(self):
+        url = reverse('dcim-api:site-list')
+        token = Token.objects.create(user=self.user)
+        stale_token = Token.objects.prefetch_related('user').get(pk=token.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            token.delete()
+
+            # Simulate a concurrent request caching the Token before its deletion has been committed
+            get_cached_token(token.key, lambda: stale_token)
+
+            # The stale Token is now served from the cache, without a database lookup
+            self.assertEqual(get_cached_token(token.key, Token.objects.none().get).pk, stale_token.pk)
+
+        # The deleted Token should be rejected once the transaction has been committed
+        response = self.client.get(url, HTTP_AUTHORIZATION=f'Token {token.key}')
+        self.assertEqual(response.status_code, 403)
+
     @override_settings(LOGIN_REQUIRED=True, EXEMPT_VIEW_PERMISSIONS=['*'])
     def test_token_expiration(self):
         url = reverse('dcim-api:site-list')
@@ -594,3 +657,32 @@ class ObjectPermissionAPIViewTestCase(TestCase):
                       kwargs={'pk': self.prefixes[0].pk})
         response = self.client.delete(url, format='json', **self.header)
         self.assertEqual(response.status_code, 204)
+
+    @override_settings(EXEMPT_VIEW_PERMISSIONS=[])
+    def test_cached_permissions_invalidated(self):
+        url = reverse('ipam-api:prefix-list')
+        obj_perm = ObjectPermission(
+            name='Test permission',
+            constraints={'site__name': 'Site 1'},
+            actions=['view']
+        )
+        obj_perm.save()
+        obj_perm.object_types.add(ObjectType.objects.get_for_model(Prefix))
+
+        # Assign the permission via a group
+        group = Group.objects.create(name='Group 1')
+        group.object_permissions.add(obj_perm)
+        self.user.groups.add(group)
+        response = self.client.get(url, **self.header)
+        self.assertEqual(response.data['count'], 3)
+
+        # Modify the permission's constraints
+        obj_perm.constraints = {'site__name__in': ['Site 1', 'Site 2']}
+        obj_perm.save()
+        response = self.client.get(url, **self.header)
+        self.assertEqual(response.data['count'], 6)
+
+        # Remove the user from the group
+        self.user.groups.remove(group)
+        response = self.client.get(url, **self.header)
+        self.assertEqual(response.status_code, 403)
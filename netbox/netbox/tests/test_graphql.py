@@ -34,3 +34,18 @@ class GraphQLTestCase(TestCase):
         response = self.client.get(url, **header)
         with disable_warnings('django.request'):
             self.assertHttpStatus(response, 302)  # Redirect to login page
+
+    def test_query_cost(self):
+        """
+        Test the estimation of GraphQL query costs by QueryCostRule
+        """
+        from graphql import parse, validate
+        from netbox.graphql.extensions import QueryCostRule
+        from netbox.graphql.schema import schema
+
+        query = parse('{ site_list { id devices { id name } } }')
+        # site_list: (1 + id + devices: (1 + id + name) * 10) * 10 = 320
+        for max_cost, error_count in ((320, 0), (319, 1)):
+            rule = type('QueryCostRule', (QueryCostRule,), {'max_cost': max_cost})
+            errors = validate(schema._schema, query, [rule])
+            self.assertEqual(len(errors), error_count)
@@ -1,10 +1,16 @@
-from django.test import override_settings
+import uuid
 
-from core.models import ObjectType
+from django.test import RequestFactory, override_settings
+
+from core.choices import JobStatusChoices
+from core.models import Job, ObjectType
 from dcim.models import *
+from dcim.views import RegionBulkImportView
 from netbox.choices import CSVDelimiterChoices, ImportFormatChoices
+from netbox.views.generic.bulk_views import import_objects
 from users.models import ObjectPermission
-from utilities.testing import ModelViewTestCase, create_tags
+from utilities.request import copy_safe_request
+from utilities.testing import ModelViewTestCase, TestCase, create_tags
 
 
 class CSVImportTestCase(ModelViewTestCase):
@@ -116,3 +122,59 @@ class CSVImportTestCase(ModelViewTestCase):
         # Test POST with permission
         self.assertHttpStatus(self.client.post(self._get_url('import'), data), 200)
         self.assertEqual(Region.objects.count(), 0)
+
+
+class BackgroundImportTestCase(TestCase):
+    csv_data = '\n'.join((
+        'name,slug',
+        'Region 1,region-1',
+        'Region 2,region-2',
+        'Region 3,region-3',
+    ))
+
+    def _run_import(self, data):
+        job = Job.objects.create(
+            object_type=ObjectType.objects.get_for_model(Region),
+            name='Import regions',
+            user=self.user,
+            job_id=uuid.uuid4()
+        )
+        request = RequestFactory().post('/')
+        request.user = self.user
+        request.id = uuid.uuid4()
+
+        import_objects(
+            job,
+            view=RegionBulkImportView,
+            data=data,
+            format=ImportFormatChoices.CSV,
+            csv_delimiter=CSVDelimiterChoices.AUTO,
+            request=copy_safe_request(request)
+        )
+        job.refresh_from_db()
+
+        return job
+
+    def test_import_without_permission(self):
+        job = self._run_import(self.csv_data)
+
+        self.assertEqual(job.status, JobStatusChoices.STATUS_FAILED)
+        self.assertEqual(Region.objects.count(), 0)
+
+    def test_import_invalid_data(self):
+        self.add_permissions('dcim.add_region')
+
+        job = self._run_import(self.csv_data.replace('name,slug', 'name,slug,INVALIDHEADER'))
+
+        self.assertEqual(job.status, JobStatusChoices.STATUS_FAILED)
+        self.assertTrue(job.data['errors'])
+        self.assertEqual(Region.objects.count(), 0)
+
+    def test_import(self):
+        self.add_permissions('dcim.add_region')
+
+        job = self._run_import(self.csv_data)
+
+        self.assertEqual(job.status, JobStatusChoices.STATUS_COMPLETED)
+        self.assertEqual(job.data, {'imported': 3})
+        self.assertEqual(Region.objects.count(), 3)
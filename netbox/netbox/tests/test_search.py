@@ -1,10 +1,15 @@
+from collections import defaultdict
+from datetime import timedelta
+
 from django.contrib.contenttypes.models import ContentType
 from django.test import TestCase
+from django.utils import timezone
 
 from dcim.models import Site
 from dcim.search import SiteIndex
 from extras.models import CachedValue
-from netbox.search.backends import search_backend
+from netbox.context import search_queue
+from netbox.search.backends import RankedSearchBackend, refresh_cache, search_backend
 
 
 class SearchBackendTestCase(TestCase):
@@ -138,6 +143,44 @@ class SearchBackendTestCase(TestCase):
             CachedValue.objects.exists()
         )
 
+    def test_queued_caching(self):
+        """
+        Test that changes to objects are queued while a search queue is active, and cached upon refresh.
+        """
+        site = Site.objects.first()
+        ct = ContentType.objects.get_for_model(Site)
+
+        token = search_queue.set(defaultdict(set))
+        try:
+            site.description = 'Foo'
+            site.save()
+            site.description = 'Bar'
+            site.save()
+            Site.objects.last().delete()
+            queue = search_queue.get()
+        finally:
+            search_queue.reset(token)
+
+        # Each changed object should have been queued once, and nothing cached
+        self.assertEqual(len(queue['dcim.site']), 2)
+        self.assertFalse(CachedValue.objects.filter(object_type=ct).exists())
+
+        refresh_cache('dcim.site', list(queue['dcim.site']))
+        self.assertEqual(CachedValue.objects.filter(object_type=ct).values('object_id').distinct().count(), 1)
+        self.assertEqual(CachedValue.objects.get(object_type=ct, field='description').value, 'Bar')
+
+    def test_get_stale_objects(self):
+        """
+        Test the identification of objects which are not cached, or which have been updated since being cached.
+        """
+        sites = list(Site.objects.order_by('pk'))
+        search_backend.cache(sites[:2])
+        self.assertEqual(search_backend.get_stale_objects(Site), [sites[2].pk])
+
+        # Update a Site without triggering signals
+        Site.objects.filter(pk=sites[0].pk).update(last_updated=timezone.now() + timedelta(minutes=1))
+        self.assertEqual(search_backend.get_stale_objects(Site), [sites[0].pk, sites[2].pk])
+
     def test_search(self):
         """
         Test various searches.
@@ -151,3 +194,49 @@ class SearchBackendTestCase(TestCase):
         self.assertEqual(len(results), 1)
         results = search_backend.search('xxxxx')
         self.assertEqual(len(results), 0)
+
+
+class RankedSearchBackendTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        sites = (
+            Site(name='Site 1', slug='site-1', description='First test site'),
+            Site(name='Site 2', slug='site-2', description='Second test site'),
+            Site(name='Site 3', slug='site-3', description='Third test site'),
+        )
+        Site.objects.bulk_create(sites)
+
+    def test_search(self):
+        """
+        Test that each matching object is returned once, represented by its most relevant field.
+        """
+        backend = RankedSearchBackend()
+        backend.cache(Site.objects.all())
+
+        results = backend.search('site')
+        self.assertEqual(len(results), 3)
+        self.assertEqual(sorted(r.object.name for r in results), ['Site 1', 'Site 2', 'Site 3'])
+        for result in results:
+            self.assertEqual(result.field, 'name')
+
+        results = backend.search('first')
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0].field, 'description')
+
+        results = backend.search('xxxxx')
+        self.assertEqual(len(results), 0)
+        self.assertFalse(results)
+
+    def test_search_slicing(self):
+        """
+        Test the retrieval of a subset of results.
+        """
+        backend = RankedSearchBackend()
+        backend.cache(Site.objects.all())
+
+        results = backend.search('site')
+        self.assertEqual(len(results[1:3]), 2)
+        self.assertEqual(len(results[3:]), 0)
+        with self.assertRaises(IndexError):
+            results[3]
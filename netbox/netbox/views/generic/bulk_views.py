@@ -2,6 +2,7 @@ import logging
 import re
 from copy import deepcopy
 
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.contenttypes.fields import GenericRel
 from django.core.exceptions import FieldDoesNotExist, ObjectDoesNotExist, ValidationError
@@ -9,22 +10,31 @@ from django.db import transaction, IntegrityError
 from django.db.models import ManyToManyField, ProtectedError, RestrictedError
 from django.db.models.fields.reverse_related import ManyToManyRel
 from django.forms import HiddenInput, ModelMultipleChoiceField, MultipleHiddenInput
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.utils.safestring import mark_safe
 from django.utils.translation import gettext as _
-from django_tables2.export import TableExport
+from rq import get_current_job
 
-from core.models import ObjectType
+from core.choices import JobStatusChoices
+from core.models import Job, ObjectType
+from dcim.utils import deferred_path_tracing
+from extras.context_managers import event_tracking
 from extras.models import ExportTemplate
 from extras.signals import clear_events
+from ipam.utils import deferred_prefix_hierarchy
+from netbox.choices import ImportMethodChoices
 from utilities.error_handlers import handle_protectederror
 from utilities.exceptions import AbortRequest, AbortTransaction, PermissionsViolation
 from utilities.forms import BulkRenameForm, ConfirmationForm, restrict_form_fields
 from utilities.forms.bulk_import import BulkImportForm
+from utilities.forms.fields import CSVModelChoiceField
 from utilities.htmx import htmx_partial
 from utilities.permissions import get_permission_for_model
+from utilities.request import copy_safe_request
+from utilities.rqworker import get_queue_for_model, get_workers_for_queue
+from utilities.streaming import EXPORT_CHUNK_SIZE, coalesce_chunks, iter_csv
 from utilities.views import GetReturnURLMixin, get_viewname
 from .base import BaseMultiObjectView
 from .mixins import ActionsMixin, TableMixin
@@ -38,8 +48,12 @@ __all__ = (
     'BulkImportView',
     'BulkRenameView',
     'ObjectListView',
+    'import_objects',
 )
 
+# Number of records to validate and save at a time when importing objects
+IMPORT_CHUNK_SIZE = 1000
+
 
 class ObjectListView(BaseMultiObjectView, ActionsMixin, TableMixin):
     """
@@ -64,11 +78,13 @@ class ObjectListView(BaseMultiObjectView, ActionsMixin, TableMixin):
 
     def export_yaml(self):
         """
-        Export the queryset of objects as concatenated YAML documents.
+        Export the queryset of objects as concatenated YAML documents. Returns a generator which streams objects
+        from the database in chunks.
         """
-        yaml_data = [obj.to_yaml() for obj in self.queryset]
-
-        return '---\n'.join(yaml_data)
+        for i, obj in enumerate(self.queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE)):
+            if i:
+                yield '---\n'
+            yield obj.to_yaml()
 
     def export_table(self, table, columns=None, filename=None):
         """
@@ -86,14 +102,14 @@ class ObjectListView(BaseMultiObjectView, ActionsMixin, TableMixin):
             exclude_columns.update({
                 col for col in all_columns if col not in columns
             })
-        exporter = TableExport(
-            export_format=TableExport.CSV,
-            table=table,
-            exclude_columns=exclude_columns
-        )
-        return exporter.response(
-            filename=filename or f'netbox_{self.queryset.model._meta.verbose_name_plural}.csv'
+        rows = table.iter_values(exclude_columns=exclude_columns, chunk_size=EXPORT_CHUNK_SIZE)
+        response = StreamingHttpResponse(
+            coalesce_chunks(iter_csv(rows)),
+            content_type='text/csv; charset=utf-8'
         )
+        filename = filename or f'netbox_{self.queryset.model._meta.verbose_name_plural}.csv'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
 
     def export_template(self, template, request):
         """
@@ -148,7 +164,7 @@ class ObjectListView(BaseMultiObjectView, ActionsMixin, TableMixin):
 
             # Check for YAML export support on the model
             elif hasattr(model, 'to_yaml'):
-                response = HttpResponse(self.export_yaml(), content_type='text/yaml')
+                response = StreamingHttpResponse(coalesce_chunks(self.export_yaml()), content_type='text/yaml')
                 filename = 'netbox_{}.yaml'.format(self.queryset.model._meta.verbose_name_plural)
                 response['Content-Disposition'] = 'attachment; filename="{}"'.format(filename)
                 return response
@@ -256,7 +272,7 @@ class BulkCreateView(GetReturnURLMixin, BaseMultiObjectView):
             logger.debug("Form validation was successful")
 
             try:
-                with transaction.atomic():
+                with transaction.atomic(), deferred_path_tracing(), deferred_prefix_hierarchy():
                     new_objs = self._create_objects(form, request)
 
                     # Enforce object-level permissions
@@ -273,7 +289,7 @@ class BulkCreateView(GetReturnURLMixin, BaseMultiObjectView):
                 return redirect(self.get_return_url(request))
 
             except IntegrityError:
-                pass
+                clear_events.send(sender=self)
 
             except (AbortRequest, PermissionsViolation) as e:
                 logger.debug(e.message)
@@ -298,10 +314,12 @@ class BulkImportView(GetReturnURLMixin, BaseMultiObjectView):
 
     Attributes:
         model_form: The form used to create each imported object
+        chunk_size: The number of records to validate and save at a time
     """
     template_name = 'generic/bulk_import.html'
     model_form = None
     related_object_forms = dict()
+    chunk_size = IMPORT_CHUNK_SIZE
 
     def get_required_permission(self):
         return get_permission_for_model(self.queryset.model, 'add')
@@ -381,10 +399,50 @@ class BulkImportView(GetReturnURLMixin, BaseMultiObjectView):
         """
         return object_form.save()
 
+    def _prefetch_related_objects(self, records, headers, request):
+        """
+        Resolve the values of each related object field across all the given records (e.g. an entire CSV column) at
+        once. Returns a mapping of field names to the resolved objects, along with the field's to_field_name and query
+        filter, which must match those of each record's field for the resolved objects to be employed.
+        """
+        form = self.model_form(headers=headers) if headers is not None else self.model_form()
+        restrict_form_fields(form, request.user)
+
+        related_objects = {}
+        for field_name, field in form.fields.items():
+            if not isinstance(field, CSVModelChoiceField):
+                continue
+            values = [record[field_name] for record in records if field_name in record]
+            if objects := field.prefetch_objects(values):
+                related_objects[field_name] = (field.to_field_name, field.queryset.query.where, objects)
+
+        return related_objects
+
     def create_and_update_objects(self, form, request):
         saved_objects = []
 
         records = list(form.cleaned_data['data'])
+        headers = getattr(form, '_csv_headers', None)
+
+        # Validate and save records in chunks
+        for offset in range(0, len(records), self.chunk_size):
+            chunk = records[offset:offset + self.chunk_size]
+            saved_objects.extend(
+                self._create_and_update_chunk(form, request, chunk, headers, start=offset + 1)
+            )
+
+            # Report progress if running as a background job
+            if rq_job := get_current_job():
+                rq_job.meta['progress'] = {
+                    'processed': offset + len(chunk),
+                    'total': len(records),
+                }
+                rq_job.save_meta()
+
+        return saved_objects
+
+    def _create_and_update_chunk(self, form, request, records, headers, start=1):
+        saved_objects = []
 
         # Prefetch objects to be updated, if any
         prefetch_ids = [int(record['id']) for record in records if record.get('id')]
@@ -393,7 +451,10 @@ class BulkImportView(GetReturnURLMixin, BaseMultiObjectView):
             for obj in self.queryset.model.objects.filter(id__in=prefetch_ids)
         } if prefetch_ids else {}
 
-        for i, record in enumerate(records, start=1):
+        # Resolve related objects for all records
+        related_objects = self._prefetch_related_objects(records, headers, request)
+
+        for i, record in enumerate(records, start=start):
             instance = None
             object_id = int(record.pop('id')) if record.get('id') else None
 
@@ -414,8 +475,8 @@ class BulkImportView(GetReturnURLMixin, BaseMultiObjectView):
                 'data': record,
                 'instance': instance,
             }
-            if hasattr(form, '_csv_headers'):
-                model_form_kwargs['headers'] = form._csv_headers  # Add CSV headers
+            if headers is not None:
+                model_form_kwargs['headers'] = headers  # Add CSV headers
             model_form = self.model_form(**model_form_kwargs)
 
             # When updating, omit all form fields other than those specified in the record. (No
@@ -427,6 +488,12 @@ class BulkImportView(GetReturnURLMixin, BaseMultiObjectView):
 
             restrict_form_fields(model_form, request.user)
 
+            # Employ the prefetched related objects for any fields whose querysets have not been altered
+            for field_name, (to_field_name, where, objects) in related_objects.items():
+                field = model_form.fields.get(field_name)
+                if field and field.to_field_name == to_field_name and field.queryset.query.where == where:
+                    field.prefetched_objects = objects
+
             if model_form.is_valid():
                 obj = self._save_object(form, model_form, request)
                 saved_objects.append(obj)
@@ -458,22 +525,67 @@ class BulkImportView(GetReturnURLMixin, BaseMultiObjectView):
             **self.get_extra_context(request),
         })
 
+    def import_objects(self, form, request):
+        """
+        Create and update all objects from the validated import form within a single transaction.
+
+        Args:
+            form: The bound and validated BulkImportForm
+            request: The current request
+        """
+        # Iterate through data and bind each record to a new model form instance.
+        with transaction.atomic(), deferred_path_tracing(), deferred_prefix_hierarchy():
+            new_objs = self.create_and_update_objects(form, request)
+
+            # Enforce object-level permissions
+            if self.queryset.filter(pk__in=[obj.pk for obj in new_objs]).count() != len(new_objs):
+                raise PermissionsViolation
+
+        return new_objs
+
+    def enqueue_import(self, form, request):
+        """
+        Enqueue a background job to import the data from the validated import form.
+        """
+        model = self.model_form._meta.model
+
+        # Uploaded files have already been read and need not be passed to the job
+        request_copy = copy_safe_request(request)
+        request_copy.FILES = {}
+
+        return Job.enqueue(
+            import_objects,
+            instance=model,
+            name=_("Import {model}").format(model=model._meta.verbose_name_plural),
+            user=request.user,
+            job_timeout=settings.IMPORT_JOB_TIMEOUT,
+            view=self.__class__,
+            data=form.raw_data,
+            format=form.data_format,
+            csv_delimiter=form.cleaned_data.get('csv_delimiter'),
+            request=request_copy
+        )
+
     def post(self, request):
         logger = logging.getLogger('netbox.views.BulkImportView')
         model = self.model_form._meta.model
         form = BulkImportForm(request.POST, request.FILES)
 
-        if form.is_valid():
+        if form.is_valid() and form.cleaned_data['background_job']:
+            logger.debug("Import form validation was successful; enqueuing background job")
+
+            if not get_workers_for_queue(get_queue_for_model(model._meta.model_name)):
+                form.add_error(None, _("Unable to enqueue import job: RQ worker process not running."))
+            else:
+                job = self.enqueue_import(form, request)
+                messages.info(request, _("Enqueued import job {job}").format(job=job))
+                return redirect(job.get_absolute_url())
+
+        elif form.is_valid():
             logger.debug("Import form validation was successful")
 
             try:
-                # Iterate through data and bind each record to a new model form instance.
-                with transaction.atomic():
-                    new_objs = self.create_and_update_objects(form, request)
-
-                    # Enforce object-level permissions
-                    if self.queryset.filter(pk__in=[obj.pk for obj in new_objs]).count() != len(new_objs):
-                        raise PermissionsViolation
+                new_objs = self.import_objects(form, request)
 
                 if new_objs:
                     msg = f"Imported {len(new_objs)} {model._meta.verbose_name_plural}"
@@ -504,6 +616,60 @@ class BulkImportView(GetReturnURLMixin, BaseMultiObjectView):
         })
 
 
+def import_objects(job, view, data, format, csv_delimiter=None, request=None, **kwargs):
+    """
+    Import objects in bulk using the given BulkImportView class within a background job. The progress of the import
+    is reported in the metadata of the background task (see Job.progress), and the number of objects imported or any
+    errors encountered are recorded as the job's data.
+
+    Args:
+        job: The Job associated with this import
+        view: The BulkImportView class with which to import the data
+        data: The raw data to be imported
+        format: The format of the data (CSV, JSON, or YAML)
+        csv_delimiter: The CSV delimiter (if applicable)
+        request: The request which enqueued the import
+    """
+    job.start()
+
+    view = view()
+    view.setup(request)
+    view.queryset = view.get_queryset(request)
+    form = BulkImportForm({
+        'import_method': ImportMethodChoices.DIRECT,
+        'data': data,
+        'format': format,
+        'csv_delimiter': csv_delimiter,
+    })
+
+    try:
+        with event_tracking(request):
+            if not view.has_permission():
+                raise PermissionsViolation
+            if not form.is_valid():
+                raise ValidationError('')
+            new_objs = view.import_objects(form, request)
+
+        job.data = {
+            'imported': len(new_objs),
+        }
+        job.terminate()
+
+    except (AbortTransaction, ValidationError, AbortRequest, PermissionsViolation) as e:
+        if getattr(e, 'message', None):
+            form.add_error(None, e.message)
+        job.data = {
+            'errors': [str(err) for errors in form.errors.values() for err in errors],
+        }
+        job.terminate(status=JobStatusChoices.STATUS_FAILED)
+        clear_events.send(sender=view)
+
+    except Exception as e:
+        job.terminate(status=JobStatusChoices.STATUS_ERRORED, error=repr(e))
+        clear_events.send(sender=view)
+        raise e
+
+
 class BulkEditView(GetReturnURLMixin, BaseMultiObjectView):
     """
     Edit objects in bulk.
@@ -634,7 +800,7 @@ class BulkEditView(GetReturnURLMixin, BaseMultiObjectView):
 
                 try:
 
-                    with transaction.atomic():
+                    with transaction.atomic(), deferred_path_tracing(), deferred_prefix_hierarchy():
                         updated_objects = self._update_objects(form, request)
 
                         # Enforce object-level permissions
@@ -821,7 +987,7 @@ class BulkDeleteView(GetReturnURLMixin, BaseMultiObjectView):
                 queryset = self.queryset.filter(pk__in=pk_list)
                 deleted_count = queryset.count()
                 try:
-                    with transaction.atomic():
+                    with transaction.atomic(), deferred_path_tracing(), deferred_prefix_hierarchy():
                         for obj in queryset:
                             # Take a snapshot of change-logged models
                             if hasattr(obj, 'snapshot'):
@@ -831,11 +997,13 @@ class BulkDeleteView(GetReturnURLMixin, BaseMultiObjectView):
                 except (ProtectedError, RestrictedError) as e:
                     logger.info(f"Caught {type(e)} while attempting to delete objects")
                     handle_protectederror(queryset, request, e)
+                    clear_events.send(sender=self)
                     return redirect(self.get_return_url(request))
 
                 except AbortRequest as e:
                     logger.debug(e.message)
                     messages.error(request, mark_safe(e.message))
+                    clear_events.send(sender=self)
                     return redirect(self.get_return_url(request))
 
                 msg = f"Deleted {deleted_count} {model._meta.verbose_name_plural}"
@@ -917,7 +1085,7 @@ class BulkComponentCreateView(GetReturnURLMixin, BaseMultiObjectView):
                 }
 
                 try:
-                    with transaction.atomic():
+                    with transaction.atomic(), deferred_path_tracing(), deferred_prefix_hierarchy():
 
                         for obj in data['pk']:
 
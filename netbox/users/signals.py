@@ -1,11 +1,14 @@
 import logging
+from functools import partial
 
 from django.contrib.auth.signals import user_login_failed
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 
+from netbox.authentication.cache import invalidate_tokens, object_permissions_cache
 from netbox.config import get_config
-from users.models import User, UserConfig
+from users.models import Group, ObjectPermission, Token, User, UserConfig
 from utilities.request import get_client_ip
 
 
@@ -31,3 +34,37 @@ def create_userconfig(instance, created, raw=False, **kwargs):
     if created and not raw:
         config = get_config()
         UserConfig(user=instance, data=config.DEFAULT_USER_PREFERENCES).save()
+
+
+# Invalidate all cached permission maps when an ObjectPermission or its assignment to users, groups, or object types
+# is modified
+post_save.connect(object_permissions_cache.handle_change, sender=ObjectPermission)
+post_delete.connect(object_permissions_cache.handle_change, sender=ObjectPermission)
+post_save.connect(object_permissions_cache.handle_change, sender=Group)
+post_delete.connect(object_permissions_cache.handle_change, sender=Group)
+m2m_changed.connect(object_permissions_cache.handle_change, sender=ObjectPermission.object_types.through)
+m2m_changed.connect(object_permissions_cache.handle_change, sender=Group.object_permissions.through)
+m2m_changed.connect(object_permissions_cache.handle_change, sender=User.object_permissions.through)
+m2m_changed.connect(object_permissions_cache.handle_change, sender=User.groups.through)
+
+
+@receiver((post_save, post_delete), sender=Token)
+def clear_token_cache(instance, **kwargs):
+    """
+    Remove a Token from the cache when it is modified or deleted. The Token is removed both immediately and once the
+    current transaction has been committed (to discard the Token if cached by a concurrent request prior to the commit).
+    """
+    invalidate_tokens(instance.key)
+    transaction.on_commit(partial(invalidate_tokens, instance.key))
+
+
+@receiver(post_save, sender=User)
+def clear_user_tokens_cache(instance, created, raw=False, **kwargs):
+    """
+    Remove all of a User's Tokens from the cache when the User is modified (e.g. deactivated), both immediately and
+    once the current transaction has been committed.
+    """
+    if not created and not raw:
+        keys = list(instance.tokens.values_list('key', flat=True))
+        invalidate_tokens(*keys)
+        transaction.on_commit(partial(invalidate_tokens, *keys))
@@ -1,12 +1,17 @@
+import copy
+from collections import defaultdict
+
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.core.exceptions import (
     FieldDoesNotExist, FieldError, MultipleObjectsReturned, ObjectDoesNotExist, ValidationError,
 )
+from django.db import DatabaseError, transaction
+from django.db.models import Q
 from django.db.models.fields.related import ManyToOneRel, RelatedField
 from django.urls import reverse
 from django.utils.module_loading import import_string
 from django.utils.translation import gettext_lazy as _
-from rest_framework.serializers import Serializer
+from rest_framework.serializers import ListSerializer, Serializer
 from rest_framework.views import get_view_name as drf_get_view_name
 
 from extras.constants import HTTP_CONTENT_TYPE_JSON
@@ -16,6 +21,7 @@ from .query import count_related, dict_to_filter_params
 from .string import title
 
 __all__ = (
+    'RelatedObjectResolver',
     'get_annotations_for_serializer',
     'get_graphql_type_for_model',
     'get_prefetches_for_serializer',
@@ -135,14 +141,19 @@ def get_annotations_for_serializer(serializer_class, fields_to_include=None):
     return annotations
 
 
-def get_related_object_by_attrs(queryset, attrs):
+def get_related_object_by_attrs(queryset, attrs, resolver=None):
     """
     Return an object identified by either a dictionary of attributes or its numeric primary key (ID). This is used
     for referencing related objects when creating/updating objects via the REST API.
+
+    If a RelatedObjectResolver is provided, the object is returned from among those it has resolved (if present).
     """
     if attrs is None:
         return None
 
+    if resolver is not None and (obj := resolver.get(queryset.model, attrs)) is not None:
+        return obj
+
     # Dictionary of related object attributes
     if isinstance(attrs, dict):
         params = dict_to_filter_params(attrs)
@@ -175,3 +186,123 @@ def get_related_object_by_attrs(queryset, attrs):
         return queryset.get(pk=pk)
     except ObjectDoesNotExist:
         raise ValidationError(_("Related object not found using the provided numeric ID: {id}").format(id=pk))
+
+
+class RelatedObjectResolver:
+    """
+    Resolve the related objects referenced by a list of objects being created or updated via the REST API in bulk.
+    Rather than retrieving each referenced object individually, all references to a model are resolved using a single
+    query for references by numeric ID, and one for each set of attributes used to reference it.
+
+    Only references which identify exactly one object are resolved. Any others are left to be resolved individually
+    by get_related_object_by_attrs(), which raises the appropriate error.
+    """
+    def __init__(self):
+        self._objects = {}
+
+    @staticmethod
+    def _get_key(attrs):
+        """
+        Return a hashable key identifying a reference (either a numeric ID or a tuple of filter parameters), or None
+        if the reference cannot be resolved in bulk.
+        """
+        if isinstance(attrs, dict):
+            key = tuple(sorted(dict_to_filter_params(attrs).items()))
+            try:
+                hash(key)
+            except TypeError:
+                return None
+            return key
+        try:
+            return int(attrs)
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def _get_nested_fields(serializer):
+        """
+        Return a list of (field name, model, many) for each writable field of the serializer which accepts references
+        to related objects.
+        """
+        from netbox.api.serializers import BaseModelSerializer, WritableNestedSerializer
+
+        def is_nested(field):
+            return isinstance(field, WritableNestedSerializer) or (
+                isinstance(field, BaseModelSerializer) and field.nested
+            )
+
+        nested_fields = []
+        for name, field in serializer.fields.items():
+            if field.read_only:
+                continue
+            if isinstance(field, ListSerializer) and is_nested(field.child):
+                nested_fields.append((name, field.child.Meta.model, True))
+            elif is_nested(field):
+                nested_fields.append((name, field.Meta.model, False))
+
+        return nested_fields
+
+    def prefetch(self, serializer, data):
+        """
+        Resolve all related objects referenced within a list of data to be validated by the given serializer.
+
+        Args:
+            serializer: An instance of the serializer used to validate each item in the list
+            data: A list of dictionaries representing the objects being created or updated
+        """
+        references = defaultdict(set)
+        for name, model, many in self._get_nested_fields(serializer):
+            for item in data:
+                if not isinstance(item, dict) or (value := item.get(name)) is None:
+                    continue
+                if many and not isinstance(value, list):
+                    continue
+                for attrs in (value if many else [value]):
+                    if (key := self._get_key(attrs)) is not None:
+                        references[model].add(key)
+
+        for model, keys in references.items():
+            self._resolve(model, keys)
+
+    def _resolve(self, model, keys):
+        queryset = model.objects.all()
+        pks = {key: key for key in keys if isinstance(key, int)}
+
+        # Group references by attribute names
+        references = defaultdict(list)
+        for key in keys:
+            if isinstance(key, tuple) and key:
+                references[tuple(name for name, _ in key)].append(key)
+
+        # Find the object(s) matching each reference to the model by the same attribute names
+        for names, names_keys in references.items():
+            query = Q()
+            for key in names_keys:
+                query |= Q(**dict(key))
+            matches = defaultdict(set)
+            try:
+                with transaction.atomic(using=queryset.db):
+                    for pk, *values in queryset.filter(query).values_list('pk', *names):
+                        matches[tuple(zip(names, values))].add(pk)
+            except (DatabaseError, FieldError, TypeError, ValueError, ValidationError):
+                # The attributes cannot be resolved in bulk; leave them to be resolved individually
+                continue
+            for key, key_pks in matches.items():
+                if len(key_pks) == 1:
+                    pks[key] = key_pks.pop()
+
+        objects = queryset.in_bulk(set(pks.values()))
+        for key, pk in pks.items():
+            if pk in objects:
+                self._objects[(model, key)] = objects[pk]
+
+    def get(self, model, attrs):
+        """
+        Return a copy of the resolved object of the given model identified by attrs (a dictionary of attributes or
+        numeric ID), or None if it has not been resolved.
+        """
+        if (key := self._get_key(attrs)) is None:
+            return None
+        if (obj := self._objects.get((model, key))) is not None:
+            # Return a copy, so that an object referenced by multiple items is not shared among them
+            return copy.copy(obj)
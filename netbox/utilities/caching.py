@@ -0,0 +1,76 @@
+import threading
+import uuid
+
+from django.core.cache import cache
+from django.db import connection, transaction
+
+__all__ = (
+    'VersionedCache',
+)
+
+
+class VersionedCache:
+    """
+    Track the version of a body of data which is cached by all processes, either in the shared cache or in the memory
+    of each process. Data cached under any version other than the current one is disregarded, so assigning a new
+    version invalidates it everywhere. (A random version is employed rather than an incrementing counter, so that a
+    version cannot be reused should its key be evicted from the cache.)
+
+    A thread which has modified the underlying data within a transaction bypasses the cache until that transaction
+    ends, as the change may yet be rolled back.
+
+    :param key: The key under which the current version is stored in the shared cache
+    """
+    def __init__(self, key):
+        self.key = key
+        self._local_version = None
+        self._local_data = {}
+        self._pending = threading.local()
+
+    def get_version(self):
+        """
+        Return the current version, initializing it if necessary. Returns None if the cache is to be bypassed by the
+        current thread, in which case no data should be retrieved from or written to the cache.
+        """
+        if getattr(self._pending, 'value', False):
+            if connection.in_atomic_block:
+                return None
+            self._pending.value = False
+
+        if version := cache.get(self.key):
+            return version
+        cache.add(self.key, uuid.uuid4().hex, timeout=None)
+        return cache.get(self.key)
+
+    def get_local_data(self, version):
+        """
+        Return a dictionary of the data held in memory by this process for the given (current) version, discarding any
+        data held for a previous version.
+        """
+        if self._local_version != version:
+            self._local_data = {}
+            self._local_version = version
+
+        return self._local_data
+
+    def invalidate(self):
+        """
+        Invalidate all cached data by assigning a new version.
+        """
+        cache.set(self.key, uuid.uuid4().hex, timeout=None)
+        self._local_version = None
+        self._pending.value = False
+
+    def handle_change(self, sender, **kwargs):
+        """
+        Signal receiver which invalidates all cached data when the underlying data is modified. The cache is invalidated
+        both immediately and once the current transaction has been committed (to discard any data cached by a
+        concurrent request prior to the commit). Pre-change m2m_changed signals are ignored.
+        """
+        if kwargs.get('action') in ('pre_add', 'pre_remove', 'pre_clear'):
+            return
+
+        self.invalidate()
+        if connection.in_atomic_block:
+            self._pending.value = True
+        transaction.on_commit(self.invalidate)
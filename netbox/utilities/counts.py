@@ -0,0 +1,83 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db import connections
+
+__all__ = (
+    'get_count',
+    'get_estimated_count',
+    'is_unfiltered',
+)
+
+
+def is_unfiltered(queryset):
+    """
+    Return True if the QuerySet would return every row of its model's table (i.e. it has no filters, including those
+    applied for permission enforcement, and is not distinct, grouped, combined, or sliced).
+    """
+    query = queryset.query
+    return not any((
+        query.where,
+        query.distinct,
+        query.combinator,
+        query.group_by,
+        query.low_mark,
+        query.high_mark is not None,
+    ))
+
+
+def get_estimated_count(queryset):
+    """
+    Return the PostgreSQL query planner's estimate of the number of rows in the QuerySet's underlying table (from
+    pg_class.reltuples). Returns None if no estimate is available (e.g. the table has not yet been analyzed).
+    """
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples FROM pg_class WHERE oid = to_regclass(%s)",
+            [queryset.model._meta.db_table]
+        )
+        row = cursor.fetchone()
+    if row is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+def get_count_cache_key(queryset):
+    """
+    Return the cache key for the count of a QuerySet. The key is derived from the compiled SQL query and its
+    parameters, which reflect all filters (including permission constraints) applied to the QuerySet.
+    """
+    try:
+        sql, params = queryset.query.sql_with_params()
+    except EmptyResultSet:
+        return None
+    digest = hashlib.sha256(f'{queryset.db}:{sql}:{params!r}'.encode()).hexdigest()
+    return f'count_{digest}'
+
+
+def get_count(queryset):
+    """
+    Return a two-tuple of the number of objects in a QuerySet, and a boolean indicating whether that number is an
+    estimate. The count is determined using the following strategies in order:
+
+        1. If COUNT_ESTIMATE_THRESHOLD is set and the QuerySet is unfiltered, use the query planner's estimate of the
+           table's size, provided it meets the threshold.
+        2. If COUNT_CACHE_TIMEOUT is set, return a recently cached exact count for the same query, or count the
+           objects and cache the result.
+        3. Count the objects.
+    """
+    if settings.COUNT_ESTIMATE_THRESHOLD and is_unfiltered(queryset):
+        estimate = get_estimated_count(queryset)
+        if estimate is not None and estimate >= settings.COUNT_ESTIMATE_THRESHOLD:
+            return estimate, True
+
+    if settings.COUNT_CACHE_TIMEOUT and (cache_key := get_count_cache_key(queryset)):
+        count = cache.get(cache_key)
+        if count is None:
+            count = queryset.count()
+            cache.set(cache_key, count, settings.COUNT_CACHE_TIMEOUT)
+        return count, False
+
+    return queryset.count(), False
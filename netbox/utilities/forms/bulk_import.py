@@ -37,6 +37,11 @@ class BulkImportForm(SyncedDataMixin, forms.Form):
         help_text=_("The character which delimits CSV fields. Applies only to CSV format."),
         required=False
     )
+    background_job = forms.BooleanField(
+        label=_("Background job"),
+        help_text=_("Import the data using a background job, and report its progress"),
+        required=False
+    )
 
     data_field = 'data'
 
@@ -68,6 +73,10 @@ class BulkImportForm(SyncedDataMixin, forms.Form):
         else:
             format = self.cleaned_data['format']
 
+        # Retain the raw data and its format (e.g. to be passed to a background job)
+        self.raw_data = data
+        self.data_format = format
+
         # Process data according to the selected format
         if format == ImportFormatChoices.CSV:
             delimiter = self.cleaned_data.get('csv_delimiter', CSVDelimiterChoices.AUTO)
@@ -1,7 +1,9 @@
+import copy
+
 from django import forms
 from django.utils.translation import gettext_lazy as _
 from django.contrib.contenttypes.models import ContentType
-from django.core.exceptions import MultipleObjectsReturned, ObjectDoesNotExist
+from django.core.exceptions import FieldDoesNotExist, MultipleObjectsReturned, ObjectDoesNotExist, ValidationError
 from django.db.models import Q
 
 from utilities.choices import unpack_grouped_choices
@@ -56,8 +58,48 @@ class CSVModelChoiceField(forms.ModelChoiceField):
     default_error_messages = {
         'invalid_choice': _('Object not found: %(value)s'),
     }
+    # Mapping of string values to objects which have been resolved in advance (see prefetch_objects())
+    prefetched_objects = None
+
+    def prefetch_objects(self, values):
+        """
+        Resolve all the given values (e.g. an entire CSV column) using a single query, and return a mapping of each
+        value to the object it uniquely identifies. Values which match no object or multiple objects are omitted, such
+        that they are validated individually (and the appropriate error raised) when cleaned.
+        """
+        key = self.to_field_name or 'pk'
+        try:
+            model_field = self.queryset.model._meta.pk if key == 'pk' else self.queryset.model._meta.get_field(key)
+        except FieldDoesNotExist:
+            return {}
+
+        lookup_values = set()
+        for value in values:
+            if value in self.empty_values or type(value) not in (str, int):
+                continue
+            try:
+                lookup_values.add(model_field.to_python(value))
+            except ValidationError:
+                continue
+        if not lookup_values:
+            return {}
+
+        objects = {}
+        duplicates = set()
+        for obj in self.queryset.filter(**{f'{key}__in': lookup_values}):
+            value = str(getattr(obj, key))
+            if value in objects:
+                duplicates.add(value)
+            objects[value] = obj
+
+        return {
+            value: obj for value, obj in objects.items() if value not in duplicates
+        }
 
     def to_python(self, value):
+        if self.prefetched_objects and value not in self.empty_values:
+            if (obj := self.prefetched_objects.get(str(value))) is not None:
+                return copy.copy(obj)
         try:
             return super().to_python(value)
         except MultipleObjectsReturned:
@@ -88,6 +130,10 @@ class CSVContentTypeField(CSVModelChoiceField):
     def prepare_value(self, value):
         return object_type_identifier(value)
 
+    def prefetch_objects(self, values):
+        # Object types are resolved by app label and model name
+        return {}
+
     def to_python(self, value):
         if not value:
             return None
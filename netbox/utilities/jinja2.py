@@ -51,3 +51,13 @@ def render_jinja2(template_code, context):
     environment = SandboxedEnvironment()
     environment.filters.update(get_config().JINJA2_FILTERS)
     return environment.from_string(source=template_code).render(**context)
+
+
+def render_jinja2_stream(template_code, context):
+    """
+    Render a Jinja2 template with the provided context. Return a generator which yields the rendered content
+    incrementally.
+    """
+    environment = SandboxedEnvironment()
+    environment.filters.update(get_config().JINJA2_FILTERS)
+    return environment.from_string(source=template_code).generate(**context)
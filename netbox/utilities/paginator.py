@@ -1,6 +1,9 @@
 from django.core.paginator import Paginator, Page
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
 
 from netbox.config import get_config
+from utilities.counts import get_count
 
 __all__ = (
     'EnhancedPage',
@@ -13,6 +16,7 @@ class EnhancedPaginator(Paginator):
     default_page_lengths = (
         25, 50, 100, 250, 500, 1000
     )
+    count_estimated = False
 
     def __init__(self, object_list, per_page, orphans=None, **kwargs):
 
@@ -32,6 +36,26 @@ class EnhancedPaginator(Paginator):
 
         super().__init__(object_list, per_page, orphans=orphans, **kwargs)
 
+    @cached_property
+    def count(self):
+        """
+        Return the total number of objects. For a QuerySet, this may be an estimate (see COUNT_ESTIMATE_THRESHOLD) or
+        a cached value (see COUNT_CACHE_TIMEOUT).
+        """
+        if isinstance(self.object_list, QuerySet):
+            count, self.count_estimated = get_count(self.object_list)
+            return count
+        return super().count
+
+    def page(self, number):
+        # Evaluate the count first to determine whether it is an estimate
+        if not self.count or not self.count_estimated:
+            return super().page(number)
+        # Don't truncate the final page to an estimated count
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        return self._get_page(self.object_list[bottom:bottom + self.per_page], number, self)
+
     def _get_page(self, *args, **kwargs):
         return EnhancedPage(*args, **kwargs)
 
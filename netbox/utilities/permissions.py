@@ -1,8 +1,14 @@
+from functools import lru_cache
+
 from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
 from django.db.models import Q
+from django.db.models.constants import LOOKUP_SEP
 from django.utils.translation import gettext_lazy as _
 
 __all__ = (
+    'ObjectPermissionMap',
+    'constraints_span_multivalued_relations',
     'get_permission_for_model',
     'permission_is_exempt',
     'qs_filter_from_constraints',
@@ -11,6 +17,30 @@ __all__ = (
 )
 
 
+class ObjectPermissionMap(dict):
+    """
+    A mapping of permission names to the lists of constraints granted to a user by ObjectPermissions. The QuerySet
+    filter compiled from each permission's constraints is memoized, so that the map (and its compiled filters) may be
+    reused across requests by the same user.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._filters = {}
+
+    def get_filter(self, perm, tokens=None):
+        """
+        Return a Q object matching all objects to which the specified permission's constraints apply.
+
+        Args:
+            perm: Permission name in the format <app_label>.<action>_<model>
+            tokens: A dictionary mapping string tokens to be replaced with a value. These must not vary for a given
+                map (e.g. the user to whom the permissions have been granted).
+        """
+        if perm not in self._filters:
+            self._filters[perm] = qs_filter_from_constraints(self.get(perm, []), tokens)
+        return self._filters[perm]
+
+
 def get_permission_for_model(model, action):
     """
     Resolve the named permission for a given model (or instance) and action (e.g. view or add).
@@ -104,3 +134,51 @@ def qs_filter_from_constraints(constraints, tokens=None):
             return Q()
 
     return params
+
+
+@lru_cache(maxsize=None)
+def _lookup_spans_multivalued_relation(model, lookup):
+    """
+    Determine whether a constraint lookup (e.g. "site__region__name__in") traverses any relationship which may return
+    multiple objects (i.e. a one-to-many or many-to-many relationship). Returns None if the lookup cannot be resolved.
+    """
+    opts = model._meta
+    field = None
+    for part in lookup.split(LOOKUP_SEP):
+        try:
+            field = opts.pk if part == 'pk' else opts.get_field(part)
+        except FieldDoesNotExist:
+            # Any part following a relation must be either another field or a lookup/transform on the relation
+            if field is not None and (field.get_lookup(part) or field.get_transform(part)):
+                return False
+            return None
+        if not field.is_relation:
+            # Any remaining parts are lookups or transforms (e.g. JSON keys) on a concrete field
+            return False
+        if field.many_to_many or field.one_to_many:
+            return True
+        if field.related_model is None:
+            # Generic foreign keys cannot be traversed
+            return None
+        opts = field.related_model._meta
+    return False
+
+
+def constraints_span_multivalued_relations(model, constraints):
+    """
+    Determine whether any of the lookups within the given ObjectPermission constraints traverse a multi-valued (one-
+    to-many or many-to-many) relationship, such that filtering a model's QuerySet directly may yield duplicate rows.
+    Returns None if this cannot be determined for any lookup.
+
+    Args:
+        model: The model to which the constraints apply
+        constraints: An iterable of ObjectPermission constraint sets
+    """
+    result = False
+    for constraint in constraints:
+        for lookup in (constraint or {}):
+            spans_multivalued = _lookup_spans_multivalued_relation(model, lookup)
+            if spans_multivalued is None:
+                return None
+            result = result or spans_multivalued
+    return result
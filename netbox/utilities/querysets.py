@@ -1,7 +1,9 @@
-from django.db.models import Prefetch, QuerySet
+from django.db.models import Exists, OuterRef, Prefetch, QuerySet
 
 from users.constants import CONSTRAINT_TOKEN_USER
-from utilities.permissions import get_permission_for_model, permission_is_exempt, qs_filter_from_constraints
+from utilities.permissions import (
+    constraints_span_multivalued_relations, get_permission_for_model, permission_is_exempt,
+)
 
 __all__ = (
     'RestrictedPrefetch',
@@ -61,10 +63,27 @@ class RestrictedQuerySet(QuerySet):
             tokens = {
                 CONSTRAINT_TOKEN_USER: user,
             }
-            attrs = qs_filter_from_constraints(user._object_perm_cache[permission_required], tokens)
-            # #8715: Avoid duplicates when JOIN on many-to-many fields without using DISTINCT.
-            # DISTINCT acts globally on the entire request, which may not be desirable.
-            allowed_objects = self.model.objects.filter(attrs)
-            qs = self.filter(pk__in=allowed_objects)
+            attrs = user._object_perm_cache.get_filter(permission_required, tokens)
+            spans_multivalued = constraints_span_multivalued_relations(
+                self.model,
+                user._object_perm_cache.get(permission_required, [])
+            )
+
+            # If the constraints don't traverse any one-to-many or many-to-many relationships, they can be applied
+            # directly to the QuerySet
+            if spans_multivalued is False:
+                qs = self.filter(attrs)
+
+            # #8715: Avoid duplicates when JOIN on many-to-many fields without using DISTINCT. (DISTINCT acts
+            # globally on the entire request, which may not be desirable.) Instead, test for the existence of a
+            # matching object using a correlated subquery (a semi-join).
+            elif spans_multivalued:
+                allowed_objects = self.model.objects.filter(attrs, pk=OuterRef('pk'))
+                qs = self.filter(Exists(allowed_objects))
+
+            # Fall back to matching the primary keys of all permitted objects
+            else:
+                allowed_objects = self.model.objects.filter(attrs)
+                qs = self.filter(pk__in=allowed_objects)
 
         return qs
@@ -0,0 +1,103 @@
+import csv
+
+__all__ = (
+    'EXPORT_CHUNK_SIZE',
+    'StreamingQuerySet',
+    'coalesce_chunks',
+    'iter_csv',
+    'normalize_line_endings',
+)
+
+# Number of rows to retrieve from the database at a time when streaming an export
+EXPORT_CHUNK_SIZE = 2000
+
+# Minimum length of each chunk of content yielded to a streaming response
+STREAMING_BUFFER_SIZE = 65536
+
+
+class StreamingQuerySet:
+    """
+    Wrap a QuerySet such that iterating over it streams objects from the database in chunks (using a server-side
+    cursor where supported) rather than loading and caching the entire result set in memory. Indexing, slicing, and
+    all other attributes are proxied to the underlying QuerySet, so the wrapper can be passed to templates in its
+    place.
+
+    :param queryset: The QuerySet to be wrapped
+    :param chunk_size: The number of objects to retrieve from the database at a time
+    """
+    def __init__(self, queryset, chunk_size=EXPORT_CHUNK_SIZE):
+        self.queryset = queryset
+        self.chunk_size = chunk_size
+
+    def __iter__(self):
+        return self.queryset.iterator(chunk_size=self.chunk_size)
+
+    def __reversed__(self):
+        if self.queryset.ordered:
+            return self.queryset.reverse().iterator(chunk_size=self.chunk_size)
+        return reversed(list(self.queryset))
+
+    def __getitem__(self, key):
+        return self.queryset[key]
+
+    def __len__(self):
+        return self.queryset.count()
+
+    def __bool__(self):
+        return self.queryset.exists()
+
+    def __getattr__(self, name):
+        return getattr(self.queryset, name)
+
+
+class Echo:
+    """
+    A file-like object which simply returns each value written to it.
+    """
+    def write(self, value):
+        return value
+
+
+def iter_csv(rows):
+    """
+    Yield each of the given rows (iterables of values) as a line of CSV-formatted text.
+    """
+    writer = csv.writer(Echo())
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def normalize_line_endings(chunks):
+    """
+    Replace CRLF-style line terminators within a stream of text chunks, accounting for terminators which span
+    two chunks.
+    """
+    pending_cr = False
+    for chunk in chunks:
+        if pending_cr:
+            chunk = '\r' + chunk
+        pending_cr = chunk.endswith('\r')
+        if pending_cr:
+            chunk = chunk[:-1]
+        if chunk := chunk.replace('\r\n', '\n'):
+            yield chunk
+    if pending_cr:
+        yield '\r'
+
+
+def coalesce_chunks(chunks, size=STREAMING_BUFFER_SIZE):
+    """
+    Combine a stream of (typically small) text chunks into chunks of at least the specified length, to avoid
+    writing many tiny fragments to a streaming response.
+    """
+    buffer = []
+    length = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield ''.join(buffer)
+            buffer = []
+            length = 0
+    if buffer:
+        yield ''.join(buffer)
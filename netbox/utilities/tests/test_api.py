@@ -1,3 +1,4 @@
+from django.db import connection
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 from rest_framework import status
@@ -106,6 +107,38 @@ class WritableNestedSerializerTest(APITestCase):
         self.assertEqual(VLAN.objects.count(), 0)
         self.assertTrue(response.data['site'][0].startswith("Multiple objects match"))
 
+    def test_bulk_related_by_attributes(self):
+        data = [
+            {'vid': 100, 'name': 'Test VLAN 100', 'site': {'name': 'Site 1'}},
+            {'vid': 101, 'name': 'Test VLAN 101', 'site': {'name': 'Site 2'}},
+            {'vid': 102, 'name': 'Test VLAN 102', 'site': {'name': 'Site 1'}},
+            {'vid': 103, 'name': 'Test VLAN 103', 'site': self.site2.pk},
+        ]
+        url = reverse('ipam-api:vlan-list')
+        self.add_permissions('ipam.add_vlan')
+
+        response = self.client.post(url, data, format='json', **self.header)
+        self.assertHttpStatus(response, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [vlan['site']['id'] for vlan in response.data],
+            [self.site1.pk, self.site2.pk, self.site1.pk, self.site2.pk]
+        )
+        self.assertEqual(VLAN.objects.filter(site=self.site1).count(), 2)
+
+    def test_bulk_related_by_attributes_multiple_matches(self):
+        data = [
+            {'vid': 100, 'name': 'Test VLAN 100', 'site': {'name': 'Site 1'}},
+            {'vid': 101, 'name': 'Test VLAN 101', 'site': {'region': {'name': 'Region A'}}},
+        ]
+        url = reverse('ipam-api:vlan-list')
+        self.add_permissions('ipam.add_vlan')
+
+        with disable_warnings('django.request'):
+            response = self.client.post(url, data, format='json', **self.header)
+        self.assertHttpStatus(response, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(VLAN.objects.count(), 0)
+        self.assertTrue(response.data[1]['site'][0].startswith("Multiple objects match"))
+
     def test_related_by_invalid(self):
         data = {
             'vid': 100,
@@ -173,6 +206,49 @@ class APIPaginationTestCase(APITestCase):
         self.assertIsNone(response.data['previous'])
         self.assertEqual(len(response.data['results']), 100)
 
+    def test_omit_count(self):
+        response = self.client.get(f'{self.url}?limit=10&offset=90&omit_count=true', format='json', **self.header)
+
+        self.assertHttpStatus(response, status.HTTP_200_OK)
+        self.assertIsNone(response.data['count'])
+        self.assertIsNone(response.data['next'])
+        self.assertTrue(response.data['previous'].endswith('?limit=10&offset=80&omit_count=true'))
+        self.assertEqual(len(response.data['results']), 10)
+
+        response = self.client.get(f'{self.url}?limit=10&offset=80&omit_count=true', format='json', **self.header)
+        self.assertTrue(response.data['next'].endswith('?limit=10&offset=90&omit_count=true'))
+
+    def test_cursor_pagination(self):
+        site_ids = list(Site.objects.order_by('pk').values_list('pk', flat=True))
+        url = f'{self.url}?limit=30&cursor='
+
+        # Follow the next links until all pages have been retrieved
+        results = []
+        while url:
+            response = self.client.get(url, format='json', **self.header)
+            self.assertHttpStatus(response, status.HTTP_200_OK)
+            self.assertEqual(response.data['count'], 100)
+            self.assertIsNone(response.data['previous'])
+            results.extend(response.data['results'])
+            url = response.data['next']
+        self.assertEqual([result['id'] for result in results], site_ids)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(f'{self.url}?cursor=invalid', format='json', **self.header)
+
+        self.assertHttpStatus(response, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(COUNT_ESTIMATE_THRESHOLD=1, EXEMPT_VIEW_PERMISSIONS=['*'])
+    def test_estimated_count(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {Site._meta.db_table}')
+        response = self.client.get(f'{self.url}?limit=10&offset=90', format='json', **self.header)
+
+        self.assertHttpStatus(response, status.HTTP_200_OK)
+        self.assertEqual(response['X-Count-Estimated'], 'true')
+        self.assertIsNone(response.data['next'])
+        self.assertEqual(len(response.data['results']), 10)
+
 
 class APIOrderingTestCase(APITestCase):
     user_permissions = ('dcim.view_site',)
@@ -0,0 +1,37 @@
+from django.test import TestCase
+
+from utilities.caching import VersionedCache
+
+
+class VersionedCacheTest(TestCase):
+
+    def setUp(self):
+        self.cache = VersionedCache('test_version')
+        self.cache.invalidate()
+
+    def test_invalidate(self):
+        version = self.cache.get_version()
+        self.assertEqual(self.cache.get_version(), version)
+
+        local_data = self.cache.get_local_data(version)
+        local_data['foo'] = 'bar'
+        self.assertEqual(self.cache.get_local_data(version), {'foo': 'bar'})
+
+        # Invalidating the cache should assign a new version and discard local data
+        self.cache.invalidate()
+        new_version = self.cache.get_version()
+        self.assertNotEqual(new_version, version)
+        self.assertEqual(self.cache.get_local_data(new_version), {})
+
+    def test_handle_change(self):
+        version = self.cache.get_version()
+
+        # Pre-change m2m_changed signals should be ignored
+        self.cache.handle_change(sender=None, action='pre_add')
+        self.assertEqual(self.cache.get_version(), version)
+
+        # The cache should be bypassed until the change has been committed
+        self.cache.handle_change(sender=None)
+        self.assertIsNone(self.cache.get_version())
+        self.cache.invalidate()
+        self.assertIsNotNone(self.cache.get_version())
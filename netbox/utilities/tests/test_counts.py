@@ -0,0 +1,61 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from dcim.models import Site
+from utilities.counts import get_count, is_unfiltered
+
+
+class CountTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        Site.objects.bulk_create([
+            Site(name=f'Site {i}', slug=f'site-{i}') for i in range(1, 11)
+        ])
+
+    def setUp(self):
+        cache.clear()
+
+    def test_is_unfiltered(self):
+        self.assertTrue(is_unfiltered(Site.objects.all()))
+        self.assertTrue(is_unfiltered(Site.objects.order_by('name')))
+        self.assertFalse(is_unfiltered(Site.objects.filter(name='Site 1')))
+        self.assertFalse(is_unfiltered(Site.objects.distinct()))
+        self.assertFalse(is_unfiltered(Site.objects.all()[:5]))
+
+    def test_exact_count(self):
+        self.assertEqual(get_count(Site.objects.all()), (10, False))
+        self.assertEqual(get_count(Site.objects.filter(name='Site 1')), (1, False))
+        self.assertEqual(get_count(Site.objects.none()), (0, False))
+
+    @override_settings(COUNT_ESTIMATE_THRESHOLD=1)
+    def test_estimated_count(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {Site._meta.db_table}')
+
+        count, estimated = get_count(Site.objects.all())
+        self.assertTrue(estimated)
+        self.assertEqual(count, 10)
+
+        # Filtered QuerySets are always counted exactly
+        self.assertEqual(get_count(Site.objects.filter(name='Site 1')), (1, False))
+
+    @override_settings(COUNT_ESTIMATE_THRESHOLD=1000)
+    def test_estimated_count_below_threshold(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {Site._meta.db_table}')
+
+        self.assertEqual(get_count(Site.objects.all()), (10, False))
+
+    @override_settings(COUNT_CACHE_TIMEOUT=60)
+    def test_cached_count(self):
+        self.assertEqual(get_count(Site.objects.filter(name__startswith='Site')), (10, False))
+        Site.objects.create(name='Site 11', slug='site-11')
+
+        # The cached count is returned for the same query
+        self.assertEqual(get_count(Site.objects.filter(name__startswith='Site')), (10, False))
+
+        # A different query is counted anew
+        self.assertEqual(get_count(Site.objects.filter(name__startswith='Site 1')), (3, False))
+        self.assertEqual(get_count(Site.objects.none()), (0, False))
@@ -1,8 +1,10 @@
 from django import forms
 from django.test import TestCase
 
+from dcim.models import Site
 from netbox.choices import ImportFormatChoices
 from utilities.forms.bulk_import import BulkImportForm
+from utilities.forms.fields import CSVModelChoiceField
 from utilities.forms.forms import BulkRenameForm
 from utilities.forms.utils import expand_alphanumeric_pattern, expand_ipaddress_pattern
 
@@ -376,6 +378,40 @@ class ImportFormTest(TestCase):
         ])
 
 
+class CSVModelChoiceFieldTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        sites = (
+            Site(name='Site 1', slug='site-1', description='A'),
+            Site(name='Site 2', slug='site-2', description='B'),
+            Site(name='Site 3', slug='site-3', description='B'),
+        )
+        Site.objects.bulk_create(sites)
+
+    def test_prefetch_objects(self):
+        sites = Site.objects.order_by('pk')
+        field = CSVModelChoiceField(queryset=Site.objects.all(), to_field_name='description')
+
+        # Values matching multiple objects or no objects should be omitted
+        with self.assertNumQueries(1):
+            field.prefetched_objects = field.prefetch_objects(['A', 'B', 'C', ''])
+        self.assertEqual(field.prefetched_objects, {'A': sites[0]})
+
+        with self.assertNumQueries(0):
+            self.assertEqual(field.clean('A'), sites[0])
+        with self.assertRaises(forms.ValidationError):
+            field.clean('B')
+        with self.assertRaises(forms.ValidationError):
+            field.clean('C')
+
+    def test_prefetch_objects_by_pk(self):
+        site = Site.objects.first()
+        field = CSVModelChoiceField(queryset=Site.objects.all())
+
+        self.assertEqual(field.prefetch_objects([str(site.pk), 'invalid']), {str(site.pk): site})
+
+
 class BulkRenameFormTest(TestCase):
     def test_no_strip_whitespace(self):
         # Tests to make sure Bulk Rename Form isn't stripping whitespaces
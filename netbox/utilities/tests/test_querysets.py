@@ -0,0 +1,88 @@
+from django.test import TestCase
+
+from core.models import ObjectType
+from dcim.models import Device, DeviceRole, DeviceType, Manufacturer, Site
+from extras.models import Tag
+from users.models import ObjectPermission, User
+from utilities.permissions import constraints_span_multivalued_relations
+
+
+class ConstraintAnalysisTest(TestCase):
+
+    def test_single_valued_lookups(self):
+        for constraints in (
+            [None],
+            [{}],
+            [{'name': 'Device 1'}],
+            [{'name__istartswith': 'device'}, {'pk__in': [1, 2, 3]}],
+            [{'site': 1}, {'site__in': [1, 2]}, {'site__isnull': True}],
+            [{'site__region__slug': 'region-1'}],
+            [{'custom_field_data__foo': 'bar'}],
+        ):
+            self.assertIs(constraints_span_multivalued_relations(Device, constraints), False, constraints)
+
+    def test_multivalued_lookups(self):
+        for constraints in (
+            [{'tags__slug': 'tag-1'}],
+            [{'name': 'Device 1'}, {'interfaces__name': 'eth0'}],
+            [{'site__devices__name': 'Device 1'}],
+        ):
+            self.assertIs(constraints_span_multivalued_relations(Device, constraints), True, constraints)
+
+    def test_unresolvable_lookups(self):
+        for constraints in (
+            [{'invalid_field': 1}],
+            [{'site__invalid_field': 1}],
+        ):
+            self.assertIsNone(constraints_span_multivalued_relations(Device, constraints), constraints)
+
+
+class RestrictedQuerySetTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        sites = (
+            Site(name='Site 1', slug='site-1'),
+            Site(name='Site 2', slug='site-2'),
+        )
+        Site.objects.bulk_create(sites)
+        manufacturer = Manufacturer.objects.create(name='Manufacturer 1', slug='manufacturer-1')
+        device_type = DeviceType.objects.create(manufacturer=manufacturer, model='Device Type 1', slug='device-type-1')
+        role = DeviceRole.objects.create(name='Device Role 1', slug='device-role-1')
+        devices = (
+            Device(name='Device 1', site=sites[0], device_type=device_type, role=role),
+            Device(name='Device 2', site=sites[0], device_type=device_type, role=role),
+            Device(name='Device 3', site=sites[1], device_type=device_type, role=role),
+        )
+        Device.objects.bulk_create(devices)
+
+        tags = (
+            Tag(name='Tag 1', slug='tag-1'),
+            Tag(name='Tag 2', slug='tag-2'),
+        )
+        Tag.objects.bulk_create(tags)
+        devices[0].tags.set(tags)
+        devices[2].tags.set(tags[1:])
+
+        cls.user = User.objects.create(username='testuser')
+
+    def restrict(self, constraints):
+        obj_perm = ObjectPermission.objects.create(name='Test permission', actions=['view'], constraints=constraints)
+        obj_perm.object_types.add(ObjectType.objects.get_for_model(Device))
+        obj_perm.users.add(self.user)
+        user = User.objects.get(pk=self.user.pk)
+        return Device.objects.restrict(user, 'view')
+
+    def test_direct_filter(self):
+        queryset = self.restrict({'site__name': 'Site 1'})
+
+        self.assertNotIn('SELECT', str(queryset.query).split('WHERE', 1)[1])
+        self.assertEqual(sorted(queryset.values_list('name', flat=True)), ['Device 1', 'Device 2'])
+
+    def test_exists_filter(self):
+        queryset = self.restrict({'tags__slug__in': ['tag-1', 'tag-2']})
+
+        # Devices with multiple matching tags must not be duplicated
+        self.assertIn('EXISTS', str(queryset.query))
+        self.assertEqual(sorted(queryset.values_list('name', flat=True)), ['Device 1', 'Device 3'])
+        self.assertEqual(queryset.count(), 2)
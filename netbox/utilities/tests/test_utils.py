@@ -1,9 +1,12 @@
 from django.http import QueryDict
 from django.test import TestCase
 
+from extras.models import Tag
 from utilities.data import deepmerge
+from utilities.jinja2 import render_jinja2_stream
 from utilities.query import dict_to_filter_params
 from utilities.querydict import normalize_querydict
+from utilities.streaming import StreamingQuerySet, coalesce_chunks, iter_csv, normalize_line_endings
 
 
 class DictToFilterParamsTest(TestCase):
@@ -130,3 +133,58 @@ class DeepMergeTest(TestCase):
             deepmerge(dict1, dict2),
             merged
         )
+
+
+class StreamingTest(TestCase):
+    """
+    Validate the utility functions used to stream exported data.
+    """
+    def test_iter_csv(self):
+        rows = [
+            ['name', 'description'],
+            ['Object 1', 'Foo, bar'],
+            ['Object 2', None],
+        ]
+        self.assertEqual(
+            ''.join(iter_csv(rows)),
+            'name,description\r\nObject 1,"Foo, bar"\r\nObject 2,\r\n'
+        )
+
+    def test_normalize_line_endings(self):
+        chunks = ['line 1\r\nline 2\r', '\nline 3\r', '\n']
+        self.assertEqual(
+            ''.join(normalize_line_endings(chunks)),
+            'line 1\nline 2\nline 3\n'
+        )
+
+    def test_coalesce_chunks(self):
+        chunks = ['a' * 3, 'b' * 3, 'c' * 3, 'd']
+        self.assertEqual(list(coalesce_chunks(chunks, size=5)), ['aaabbb', 'cccd'])
+
+    def test_streaming_queryset(self):
+        Tag.objects.bulk_create([
+            Tag(name=f'Tag {i}', slug=f'tag-{i}') for i in range(1, 4)
+        ])
+        queryset = StreamingQuerySet(Tag.objects.all(), chunk_size=2)
+
+        self.assertEqual([tag.name for tag in queryset], ['Tag 1', 'Tag 2', 'Tag 3'])
+        self.assertEqual([tag.name for tag in reversed(queryset)], ['Tag 3', 'Tag 2', 'Tag 1'])
+        self.assertEqual(queryset[0].name, 'Tag 1')
+        self.assertEqual([tag.name for tag in queryset[1:]], ['Tag 2', 'Tag 3'])
+        self.assertEqual(len(queryset), 3)
+        self.assertTrue(queryset)
+        self.assertFalse(StreamingQuerySet(Tag.objects.none()))
+        self.assertEqual(queryset.filter(name='Tag 2').get().slug, 'tag-2')
+
+    def test_streaming_queryset_template(self):
+        Tag.objects.bulk_create([
+            Tag(name=f'Tag {i}', slug=f'tag-{i}') for i in range(1, 4)
+        ])
+        template_code = (
+            '{{ queryset[0].name }};'
+            '{% for tag in queryset[:2] %}{{ tag.name }},{% endfor %};'
+            '{{ (queryset|last).name }};'
+            '{{ queryset|length }}'
+        )
+        output = render_jinja2_stream(template_code, {'queryset': StreamingQuerySet(Tag.objects.all())})
+        self.assertEqual(''.join(output), 'Tag 1;Tag 1,Tag 2,;Tag 3;3')
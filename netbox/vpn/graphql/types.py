@@ -131,7 +131,7 @@ class L2VPNType(ContactsMixin, NetBoxObjectType):
 class L2VPNTerminationType(NetBoxObjectType):
     l2vpn: Annotated["L2VPNType", strawberry.lazy('vpn.graphql.types')]
 
-    @strawberry_django.field
+    @strawberry_django.field(only=['assigned_object_type', 'assigned_object_id'], prefetch_related=['assigned_object'])
     def assigned_object(self) -> Annotated[Union[
         Annotated["InterfaceType", strawberry.lazy('dcim.graphql.types')],
         Annotated["VLANType", strawberry.lazy('ipam.graphql.types')],